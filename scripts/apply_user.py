@@ -1,33 +1,9 @@
 from config import *
 
-#Schema Method - list all tables in a schema
+session = open_session()
 
-# Endpoint for retrieving tables filtered by database schema, set a high limit to get them all
-endpoint1 = f"/tables?databaseSchema={database_schema}&limit=9999"
-
-# Full URL
-url = base_url + endpoint1
-
-# Make the GET request to retrieve all tables in the given schema
-response = requests.get(url, headers=headers_get)
-
-# Check the response status
-if response.status_code == 200:
-    print("Raw Response Content:", response.text)  # Print the raw content of the response
-    try:
-        tables = response.json().get('data', [])  # Attempt to parse JSON response
-        print("Tables retrieved successfully!")
-        for table in tables:
-            print(f"Table Name: {table['name']}, ID: {table['id']}")
-    except ValueError as e:
-        print("Failed to parse JSON response:", e)
-else:
-    print(f"Failed to retrieve tables: {response.status_code}")
-    print(response.text)
-
-table_id_list = []
-for table in tables:
-    table_id_list.append(table['id'])
+#Schema Method - list all tables in a schema, with their current owners
+tables = list_schema_tables(fields='owners')
 
 
 
@@ -40,20 +16,22 @@ def apply_user_to_table(table_id):
     # Full URL
     table_url = base_url + table_endpoint
 
-    # Data payload for applying the user
+    # Data payload for applying the user; the owners list is replaced as a whole
     data = [
         {
-            "op": "replace",
-            "path": "/owner",
-            "value": {
-                "id": selected_user_id,
-                "type": "user"
-            }
+            "op": "add",
+            "path": "/owners",
+            "value": [
+                {
+                    "id": selected_user_id,
+                    "type": "user"
+                }
+            ]
         }
     ]
 
     # Make the PATCH request
-    response = requests.patch(table_url, headers=headers_patch, json=data)
+    response = session.patch(table_url, headers=headers_patch, json=data)
 
     # Check the response status
     if response.status_code == 200:
@@ -62,7 +40,9 @@ def apply_user_to_table(table_id):
         print(f"Failed to apply user to table {table_id}: {response.status_code}")
         print(response.text)
 
-# Apply user to all tables in the schema
+# Apply user to all tables in the schema that are not already owned by the user alone
 for table in tables:
+    if [owner.get('id') for owner in table.get('owners') or []] == [selected_user_id]:
+        print(f"Table {table['id']} is already owned by the user")
+        continue
     apply_user_to_table(table['id'])
-    time.sleep(1)
\ No newline at end of file
@@ -1,5 +1,7 @@
 from config import *
 
+session = open_session()
+
 # Load your data that contains all the information needed to generate a tag
 df = pd.read_csv('reference_csvs/irs.csv')
 
@@ -17,7 +19,7 @@ for i, row in df.iterrows():
     }
 
     # Make the POST request to create the tag based on the info provided in the CSV
-    response = requests.post(url, headers=headers_get, json=data)
+    response = session.post(url, headers=headers_get, json=data)
 
     # Check the response status for each request
     if response.status_code == 200 or response.status_code == 201:
@@ -25,6 +27,3 @@ for i, row in df.iterrows():
     else:
         print(f"Failed to create tag for row {i} with status code {response.status_code}")
         print(response.text)
-
-    # Optional: Add a small pause between requests to avoid overwhelming the server
-    time.sleep(1)
\ No newline at end of file
@@ -5,11 +5,20 @@ import os
 import requests
 import time
 import logging
+import sys
 from datetime import datetime
 
+# Shared pooled HTTP client lives with the tagging project
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openmetadata-tagging-project', 'src'))
+from omd_client import configure_session
+from table_iterator import iter_tables
+
 # API base URL TEST ENV
 base_url = "https://nr-data-catalogue-test.apps.emerald.devops.gov.bc.ca/api/v1"
 
+# API root without the version, as expected by the shared table iterator
+api_url = base_url.rsplit('/v1', 1)[0]
+
 # Database schema to filter by
 database_schema = "ODS.odsdev.ats_replication"
 
@@ -29,4 +38,25 @@ headers_get = {
 headers_patch = {
     "Content-Type": "application/json-patch+json",
     "Authorization": f"Bearer {api_key}"  
-}
\ No newline at end of file
+}
+
+# Target request rate for the shared rate limiter; 429 responses (and 503 for
+# GET requests) are retried after the server's Retry-After
+requests_per_second = 5
+
+# Set up the pooled keep-alive, rate-limited session; each script calls this once before its first request
+def open_session():
+    return configure_session({'requests_per_second': requests_per_second}, headers_get)
+
+# List every table in the schema (all pages), printing each one; fields such as
+# 'tags' or 'owners' are only requested when a script needs them
+def list_schema_tables(fields=None):
+    try:
+        tables = list(iter_tables(api_url, headers_get, database_schema=database_schema, fields=fields))
+    except requests.RequestException as e:
+        print(f"Failed to retrieve tables: {e}")
+        return []
+    print("Tables retrieved successfully!")
+    for table in tables:
+        print(f"Table Name: {table['name']}, ID: {table['id']}")
+    return tables
@@ -0,0 +1,492 @@
+"""
+Local stand-in for the OpenMetadata endpoints used by the tagging scripts.
+
+Serves an in-memory catalogue over HTTP so flows can be load-tested without
+touching the shared test instance:
+
+    GET   /api/v1/tables?databaseSchema=&fields=&limit=&after=
+    GET   /api/v1/tables/name/{fqn}
+    GET   /api/v1/tables/{id}
+    PATCH /api/v1/tables/name/{fqn}    (JSON Patch, including test)
+    PATCH /api/v1/tables/{id}          (JSON Patch)
+    GET   /api/v1/databaseSchemas?database=&limit=&after=
+    GET   /api/v1/tags?parent=&limit=&after=
+    GET   /api/v1/tags/name/{fqn}
+    POST  /api/v1/tags
+    GET   /api/v1/events?entityCreated=&entityUpdated=&entityDeleted=&timestamp=
+
+Latency and error injection are configurable, and every request is counted
+per method, endpoint and status code. With fail_once, error_rate picks
+distinct requests (method and URL) by a stable hash of the seed, and each
+fails on its first attempt only, so a run is repeatable however the worker
+threads are scheduled.
+
+Usage:
+    server = FakeOpenMetadataServer(latency=0.005, error_rate=0.01)
+    server.add_tag('Application System', 'FTA')
+    server.add_tables([f"svc.db.schema.T{i}" for i in range(1000)])
+    base_url = server.start()      # e.g. http://127.0.0.1:54321/api
+    ...
+    server.stop()
+
+Run standalone with:
+    python benchmarks/fake_openmetadata_server.py --tables 1000 --port 8585
+"""
+
+import argparse
+import base64
+import copy
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse, parse_qs, unquote
+
+MAX_LIMIT = 1000000
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.b64encode(str(offset).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    return int(base64.b64decode(cursor.encode()).decode())
+
+
+class PatchTestFailed(Exception):
+    """A JSON Patch "test" operation did not match; the whole patch is rejected."""
+
+
+def apply_json_patch(entity: Dict, operations: List[Dict]):
+    """Apply the subset of RFC 6902 used by the scripts to a table entity."""
+    for operation in operations:
+        op = operation['op']
+        parts = operation['path'].strip('/').split('/')
+        field = parts[0]
+        index = parts[1] if len(parts) > 1 else None
+
+        if op == 'test':
+            value = entity.get(field)
+            for part in parts[1:]:
+                if isinstance(value, list):
+                    value = value[int(part)] if int(part) < len(value) else None
+                elif isinstance(value, dict):
+                    value = value.get(part)
+            if value != operation['value']:
+                raise PatchTestFailed(f"test failed at {operation['path']}")
+        elif op in ('add', 'replace') and index is None:
+            entity[field] = operation['value']
+        elif op == 'add':
+            # A label already on the table is added again, so duplicate-label bugs show up
+            values = entity.setdefault(field, [])
+            value = operation['value']
+            if index == '-':
+                values.append(value)
+            else:
+                values.insert(int(index), value)
+        elif op == 'replace':
+            entity[field][int(index)] = operation['value']
+        elif op == 'remove':
+            if index is None:
+                entity[field] = [] if isinstance(entity.get(field), list) else None
+            else:
+                del entity[field][int(index)]
+        else:
+            raise ValueError(f"Unsupported patch operation: {op}")
+
+
+class FakeOpenMetadataServer:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 retry_after: int = 0, host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None,
+                 bulk_assets: bool = True, fail_once: bool = False):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fail_once = fail_once
+        self.seed = seed
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.host = host
+        self.port = port
+        self.random = random.Random(seed)
+        self.bulk_assets = bulk_assets  # False serves no bulk tag-to-assets endpoint, like older servers
+        self.lock = threading.Lock()
+        self.tables = {}            # fqn -> entity
+        self.table_ids = {}         # id -> fqn
+        self.schema_tables = {}     # schema fqn -> [fqn, ...] in insertion order
+        self.tags = {}              # fqn -> tag entity
+        self.events = []            # change events in the order they happened
+        self.request_counts = Counter()
+        self.attempts = Counter()  # (method, URL) -> requests seen, for fail_once
+        self._httpd = None
+        self._thread = None
+
+    # ---- data setup -------------------------------------------------------
+
+    def add_tables(self, fqns: Iterable[str], tags: Optional[List[str]] = None):
+        with self.lock:
+            for fqn in fqns:
+                if fqn in self.tables:
+                    continue
+                table_id = str(uuid.uuid4())
+                schema_fqn, name = fqn.rsplit('.', 1)
+                self.tables[fqn] = {
+                    'id': table_id,
+                    'name': name,
+                    'fullyQualifiedName': fqn,
+                    'tags': [{'tagFQN': tag} for tag in tags or []],
+                    'owners': [],
+                    'columns': [],
+                    'version': 0.1,
+                    'updatedAt': int(time.time() * 1000)
+                }
+                self.table_ids[table_id] = fqn
+                self.schema_tables.setdefault(schema_fqn, []).append(fqn)
+                self._record_event('entityCreated', self.tables[fqn])
+
+    def delete_table(self, fqn: str):
+        with self.lock:
+            entity = self.tables.pop(fqn, None)
+            if entity is None:
+                return
+            del self.table_ids[entity['id']]
+            self.schema_tables[fqn.rsplit('.', 1)[0]].remove(fqn)
+            self._record_event('entityDeleted', entity)
+
+    def _record_event(self, event_type: str, entity: Dict):
+        # Called with self.lock held
+        self.events.append({
+            'eventType': event_type,
+            'entityType': 'table',
+            'entityId': entity['id'],
+            'entityFullyQualifiedName': entity['fullyQualifiedName'],
+            'timestamp': int(time.time() * 1000)
+        })
+
+    def add_tag(self, classification: str, name: str):
+        fqn = f"{classification}.{name}"
+        with self.lock:
+            self.tags[fqn] = {
+                'id': str(uuid.uuid4()),
+                'name': name,
+                'fullyQualifiedName': fqn,
+                'classification': {'name': classification, 'type': 'classification'}
+            }
+
+    def reset(self):
+        with self.lock:
+            self.tables.clear()
+            self.table_ids.clear()
+            self.schema_tables.clear()
+            self.tags.clear()
+            self.events.clear()
+            self.request_counts.clear()
+
+    def reset_counts(self):
+        with self.lock:
+            self.request_counts.clear()
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.request_counts.values())
+
+    # ---- lifecycle --------------------------------------------------------
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the API base URL."""
+        handler = type('BoundHandler', (FakeOpenMetadataHandler,), {'fake': self})
+        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self._httpd.request_queue_size = 256
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    # ---- request handling -------------------------------------------------
+
+    def record(self, method: str, endpoint: str, status: int):
+        with self.lock:
+            self.request_counts[(method, endpoint, status)] += 1
+
+    def inject_fault(self, method: str, url: str) -> bool:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate <= 0:
+            return False
+        if not self.fail_once:
+            return self.random.random() < self.error_rate
+        with self.lock:
+            self.attempts[(method, url)] += 1
+            if self.attempts[(method, url)] > 1:
+                return False
+        return zlib.crc32(f"{self.seed}:{method}:{url}".encode()) / 2 ** 32 < self.error_rate
+
+    @staticmethod
+    def project(entity: Dict, fields: Optional[str]) -> Dict:
+        """Mimic OpenMetadata's fields parameter for the optional fields."""
+        requested = set((fields or '').split(','))
+        optional = ('tags', 'owners', 'columns')
+        return {key: value for key, value in entity.items() if key not in optional or key in requested}
+
+    def list_tables(self, params: Dict) -> Dict:
+        limit = min(int(params.get('limit', 10)), MAX_LIMIT)
+        offset = decode_cursor(params.get('after'))
+        with self.lock:
+            if 'databaseSchema' in params:
+                fqns = self.schema_tables.get(params['databaseSchema'], [])
+            else:
+                fqns = list(self.tables)
+            page = [self.project(self.tables[fqn], params.get('fields')) for fqn in fqns[offset:offset + limit]]
+            total = len(fqns)
+        paging = {'total': total}
+        if offset + limit < total:
+            paging['after'] = encode_cursor(offset + limit)
+        return {'data': page, 'paging': paging}
+
+    def list_schemas(self, params: Dict) -> Dict:
+        limit = min(int(params.get('limit', 10)), MAX_LIMIT)
+        offset = decode_cursor(params.get('after'))
+        database = params.get('database')
+        with self.lock:
+            schemas = sorted(fqn for fqn in self.schema_tables
+                             if self.schema_tables[fqn] and (not database or fqn.rsplit('.', 1)[0] == database))
+        page = [{'name': fqn.rsplit('.', 1)[1], 'fullyQualifiedName': fqn} for fqn in schemas[offset:offset + limit]]
+        paging = {'total': len(schemas)}
+        if offset + limit < len(schemas):
+            paging['after'] = encode_cursor(offset + limit)
+        return {'data': page, 'paging': paging}
+
+    def list_tags(self, params: Dict) -> Dict:
+        limit = min(int(params.get('limit', 10)), MAX_LIMIT)
+        offset = decode_cursor(params.get('after'))
+        parent = params.get('parent')
+        with self.lock:
+            tags = [tag for tag in self.tags.values()
+                    if parent is None or tag['classification']['name'] == parent]
+        paging = {'total': len(tags)}
+        if offset + limit < len(tags):
+            paging['after'] = encode_cursor(offset + limit)
+        return {'data': tags[offset:offset + limit], 'paging': paging}
+
+    def list_events(self, params: Dict) -> Dict:
+        since = int(params.get('timestamp', 0))
+        wanted = {event_type for event_type in ('entityCreated', 'entityUpdated', 'entityDeleted')
+                  if 'table' in params.get(event_type, '').split(',')}
+        with self.lock:
+            events = [event for event in self.events if event['timestamp'] >= since and event['eventType'] in wanted]
+        return {'data': events}
+
+    def patch_table(self, fqn: str, operations: List[Dict]) -> Optional[Dict]:
+        with self.lock:
+            entity = self.tables.get(fqn)
+            if entity is None:
+                return None
+            # Patches are atomic: apply to a copy and keep it only if every operation succeeds
+            patched = copy.deepcopy(entity)
+            apply_json_patch(patched, operations)
+            entity.clear()
+            entity.update(patched)
+            entity['version'] = round(entity['version'] + 0.1, 1)
+            entity['updatedAt'] = int(time.time() * 1000)
+            self._record_event('entityUpdated', entity)
+            return dict(entity)
+
+
+    def add_tag_to_assets(self, tag_id: str, assets: List[Dict]) -> Optional[Dict]:
+        """PUT /v1/tags/{id}/assets/add: a BulkOperationResult with one entry per asset."""
+        with self.lock:
+            tag = next((tag for tag in self.tags.values() if tag['id'] == tag_id), None)
+            if tag is None:
+                return None
+            passed = []
+            failed = []
+            for asset in assets:
+                entity = self.tables.get(self.table_ids.get(asset.get('id')))
+                if entity is None:
+                    failed.append({'request': asset, 'message': 'table instance not found'})
+                    continue
+                if not any(label['tagFQN'] == tag['fullyQualifiedName'] for label in entity['tags']):
+                    entity['tags'].append({'tagFQN': tag['fullyQualifiedName']})
+                    entity['version'] = round(entity['version'] + 0.1, 1)
+                    entity['updatedAt'] = int(time.time() * 1000)
+                    self._record_event('entityUpdated', entity)
+                passed.append({'request': asset, 'message': 'success'})
+        status = 'success' if not failed else ('failure' if not passed else 'partialSuccess')
+        return {
+            'dryRun': False,
+            'status': status,
+            'numberOfRowsProcessed': len(assets),
+            'numberOfRowsPassed': len(passed),
+            'numberOfRowsFailed': len(failed),
+            'successRequest': passed,
+            'failedRequest': failed,
+        }
+
+
+class FakeOpenMetadataHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    fake = None  # bound to a FakeOpenMetadataServer by FakeOpenMetadataServer.start
+
+    ROUTES = [
+        ('GET', re.compile(r'^/api/v1/tables$'), 'tables.list'),
+        ('GET', re.compile(r'^/api/v1/tables/name/(?P<fqn>.+)$'), 'tables.get'),
+        ('GET', re.compile(r'^/api/v1/tables/(?P<id>[0-9a-f-]{36})$'), 'tables.get'),
+        ('PATCH', re.compile(r'^/api/v1/tables/name/(?P<fqn>.+)$'), 'tables.patch'),
+        ('PATCH', re.compile(r'^/api/v1/tables/(?P<id>[0-9a-f-]{36})$'), 'tables.patch'),
+        ('GET', re.compile(r'^/api/v1/databaseSchemas$'), 'schemas.list'),
+        ('GET', re.compile(r'^/api/v1/tags$'), 'tags.list'),
+        ('GET', re.compile(r'^/api/v1/tags/name/(?P<fqn>.+)$'), 'tags.get'),
+        ('POST', re.compile(r'^/api/v1/tags$'), 'tags.create'),
+        ('PUT', re.compile(r'^/api/v1/tags/(?P<id>[0-9a-f-]{36})/assets/add$'), 'tags.assets.add'),
+        ('GET', re.compile(r'^/api/v1/events$'), 'events.list'),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_PATCH(self):
+        self.dispatch('PATCH')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_PUT(self):
+        self.dispatch('PUT')
+
+    def send_json(self, status: int, body: Dict, headers: Optional[Dict] = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def dispatch(self, method: str):
+        parsed = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        body = self.read_body()
+
+        for route_method, pattern, endpoint in self.ROUTES:
+            match = pattern.match(parsed.path)
+            if route_method == method and match:
+                break
+        else:
+            self.fake.record(method, 'unknown', 404)
+            return self.send_json(404, {'code': 404, 'message': f'No route for {method} {parsed.path}'})
+
+        if self.fake.inject_fault(method, self.path):
+            self.fake.record(method, endpoint, self.fake.error_status)
+            return self.send_json(self.fake.error_status, {'code': self.fake.error_status, 'message': 'Injected error'},
+                                  {'Retry-After': self.fake.retry_after})
+
+        status, response = self.handle_endpoint(endpoint, match.groupdict(), params, body)
+        self.fake.record(method, endpoint, status)
+        self.send_json(status, response)
+
+    def handle_endpoint(self, endpoint: str, path_params: Dict, params: Dict, body):
+        fake = self.fake
+        if endpoint == 'tables.list':
+            return 200, fake.list_tables(params)
+
+        if endpoint == 'tables.get':
+            fqn = unquote(path_params['fqn']) if 'fqn' in path_params else fake.table_ids.get(path_params['id'])
+            entity = fake.tables.get(fqn) if fqn else None
+            if entity is None:
+                return 404, {'code': 404, 'message': 'table instance not found'}
+            return 200, fake.project(entity, params.get('fields'))
+
+        if endpoint == 'tables.patch':
+            fqn = unquote(path_params['fqn']) if 'fqn' in path_params else fake.table_ids.get(path_params['id'])
+            for operation in body or []:
+                value = operation.get('value')
+                labels = value if isinstance(value, list) else [value]
+                if operation['path'].startswith('/tags') and operation['op'] == 'add':
+                    missing = [label['tagFQN'] for label in labels if label['tagFQN'] not in fake.tags]
+                    if missing:
+                        return 404, {'code': 404, 'message': f'tag instance for {missing[0]} not found'}
+            try:
+                entity = fake.patch_table(fqn, body or []) if fqn else None
+            except PatchTestFailed as e:
+                return 400, {'code': 400, 'message': str(e)}
+            if entity is None:
+                return 404, {'code': 404, 'message': 'table instance not found'}
+            return 200, entity
+
+        if endpoint == 'schemas.list':
+            return 200, fake.list_schemas(params)
+
+        if endpoint == 'events.list':
+            return 200, fake.list_events(params)
+
+        if endpoint == 'tags.list':
+            return 200, fake.list_tags(params)
+
+        if endpoint == 'tags.get':
+            tag = fake.tags.get(unquote(path_params['fqn']))
+            if tag is None:
+                return 404, {'code': 404, 'message': 'tag instance not found'}
+            return 200, tag
+
+        if endpoint == 'tags.assets.add':
+            if not fake.bulk_assets:
+                return 404, {'code': 404, 'message': 'HTTP 404 Not Found'}
+            result = fake.add_tag_to_assets(path_params['id'], (body or {}).get('assets', []))
+            if result is None:
+                return 404, {'code': 404, 'message': 'tag instance not found'}
+            return 200, result
+
+        if endpoint == 'tags.create':
+            fake.add_tag(body['classification'], body['name'])
+            return 201, fake.tags[f"{body['classification']}.{body['name']}"]
+
+        return 404, {'code': 404, 'message': 'not found'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local fake OpenMetadata server')
+    parser.add_argument('--port', type=int, default=8585)
+    parser.add_argument('--tables', type=int, default=1000, help='Number of synthetic tables to serve')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of latency added to each request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args()
+
+    server = FakeOpenMetadataServer(latency=args.latency, error_rate=args.error_rate,
+                                    error_status=args.error_status, port=args.port)
+    server.add_tag('Application System', 'BENCH')
+    server.add_tables(f"BENCH.BENCHDB.bench.TABLE_{i}" for i in range(args.tables))
+    base_url = server.start()
+    print(f"Fake OpenMetadata serving {args.tables} tables at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+End-to-end throughput benchmarks for the tagging flows.
+
+Runs the tagging paths of main.py, schema_based_omd_tagger.py and
+fta_tagger_csv.py against the local fake OpenMetadata server with synthetic
+catalogues and reports, per flow and size:
+
+    wall time, requests per table, requests per second and the run counters
+
+Results can be written to JSON and compared against a saved baseline; the
+script exits non-zero when requests per table or wall time regress beyond
+the given tolerance.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --flows main fta --latency 0.002
+    python benchmarks/run_benchmarks.py --output data/benchmark.json
+    python benchmarks/run_benchmarks.py --baseline data/benchmark.json --time-tolerance 0.25
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Callable, Dict
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCHMARK_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+sys.path[:0] = [SRC_DIR, os.path.join(SRC_DIR, 'schema_tagging'), os.path.join(SRC_DIR, 'schema_tagging', 'fta_tagging')]
+
+from fake_openmetadata_server import FakeOpenMetadataServer
+from omd_client import configure_session, build_headers
+from tag_catalog import TagCatalog
+
+APPLICATION = 'BENCH'
+TAG_FQN = f"Application System.{APPLICATION}"
+SCHEMA_SIZE = 1000  # tables per synthetic application schema
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def run_main_flow(base_url: str, headers: Dict, server: FakeOpenMetadataServer, size: int, max_workers: int) -> Dict:
+    """main.py: ER/Studio table names matched to FQNs, then one check/tag per table."""
+    import main
+
+    fqns = [f"BENCH.BENCHDB.bench.TABLE_{i}" for i in range(size)]
+    server.add_tables(fqns)
+    tables = [(fqn.rsplit('.', 1)[1], {'fqn': fqn}) for fqn in fqns]
+
+    start = time.perf_counter()
+    tag_catalog = TagCatalog(base_url, headers).load()
+    tag_exists = main.check_tag_exists(base_url, headers, TAG_FQN, tag_catalog)
+    existing, missing, applied, failed = main.process_table_batch(
+        base_url, headers, tables, TAG_FQN, tag_exists, False, max_workers
+    )
+    elapsed = time.perf_counter() - start
+    return {'wall_time': elapsed, 'existing': existing, 'missing': missing, 'applied': applied, 'failed': failed}
+
+
+def run_schema_based_flow(base_url: str, headers: Dict, server: FakeOpenMetadataServer, size: int, max_workers: int) -> Dict:
+    """schema_based_omd_tagger.py: list each mapped schema, then tag what is missing."""
+    import schema_based_omd_tagger as tagger
+
+    schemas = [f"app_{i}" for i in range((size + SCHEMA_SIZE - 1) // SCHEMA_SIZE)]
+    for index, schema in enumerate(schemas):
+        count = min(SCHEMA_SIZE, size - index * SCHEMA_SIZE)
+        server.add_tables(f"BENCH.BENCHDB.{schema}.TABLE_{i}" for i in range(count))
+
+    start = time.perf_counter()
+    tag_catalog = TagCatalog(base_url, headers).load()
+    totals = {'total_tables': 0, 'already_tagged': 0, 'newly_tagged': 0, 'failed_tagging': 0}
+    for schema in schemas:
+        app_mapping = {'service': 'BENCH', 'database': 'BENCHDB', 'schema': schema, 'tag_name': APPLICATION}
+        if not tagger.check_tag_exists(base_url, headers, TAG_FQN, False, tag_catalog):
+            continue
+        tables = tagger.get_tables_for_application(base_url, headers, app_mapping)
+        stats = tagger.process_tables(tables, base_url, headers, TAG_FQN, False, max_workers)
+        for key in totals:
+            totals[key] += stats[key]
+    elapsed = time.perf_counter() - start
+    return {'wall_time': elapsed, **totals}
+
+
+def run_fta_flow(base_url: str, headers: Dict, server: FakeOpenMetadataServer, size: int, max_workers: int) -> Dict:
+    """fta_tagger_csv.py: CSV rows of (table, application) in the THE schema."""
+    import fta_tagger_csv
+
+    names = [f"TABLE_{i}" for i in range(size)]
+    server.add_tables(f"DBQ01.DBQ01.the.{name}" for name in names)
+    tables = [{'name': name, 'fqn': f"DBQ01.DBQ01.the.{name}", 'application': APPLICATION} for name in names]
+
+    start = time.perf_counter()
+    tag_catalog = TagCatalog(base_url, headers).load()
+    existing, missing, applied, failed = fta_tagger_csv.process_tables(
+        base_url, headers, tables, False, max_workers, False, tag_catalog
+    )
+    elapsed = time.perf_counter() - start
+    return {'wall_time': elapsed, 'existing': existing, 'missing': missing, 'applied': applied, 'failed': failed}
+
+
+FLOWS: Dict[str, Callable] = {
+    'main': run_main_flow,
+    'schema_based': run_schema_based_flow,
+    'fta': run_fta_flow,
+}
+
+
+def run_benchmark(flow: str, size: int, max_workers: int, latency: float, error_rate: float) -> Dict:
+    server = FakeOpenMetadataServer(latency=latency, error_rate=error_rate, seed=size, fail_once=True)
+    server.add_tag('Application System', APPLICATION)
+    base_url = server.start()
+    try:
+        headers = build_headers('benchmark')
+        result = FLOWS[flow](base_url, headers, server, size, max_workers)
+        requests_made = server.total_requests
+        errors = sum(count for (method, endpoint, status), count in server.request_counts.items() if status >= 400)
+    finally:
+        server.stop()
+
+    result.update({
+        'flow': flow,
+        'size': size,
+        'requests': requests_made,
+        'errors': errors,
+        'requests_per_table': requests_made / size if size else 0,
+        'requests_per_sec': requests_made / result['wall_time'] if result['wall_time'] else 0,
+    })
+    return result
+
+
+def compare_to_baseline(results, baseline, time_tolerance: float, request_tolerance: float):
+    """Return a list of human readable regressions against the baseline results."""
+    previous = {(r['flow'], r['size']): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result['flow'], result['size']))
+        if not before:
+            continue
+        if result['requests_per_table'] > before['requests_per_table'] * (1 + request_tolerance):
+            regressions.append(f"{result['flow']}/{result['size']}: requests per table "
+                               f"{before['requests_per_table']:.2f} -> {result['requests_per_table']:.2f}")
+        if result['wall_time'] > before['wall_time'] * (1 + time_tolerance):
+            regressions.append(f"{result['flow']}/{result['size']}: wall time "
+                               f"{before['wall_time']:.2f}s -> {result['wall_time']:.2f}s")
+    return regressions
+
+
+def print_report(results):
+    print(f"\n{'flow':<14}{'tables':>9}{'wall (s)':>11}{'requests':>11}{'req/table':>11}{'req/s':>10}{'errors':>8}")
+    print('-' * 74)
+    for r in results:
+        print(f"{r['flow']:<14}{r['size']:>9}{r['wall_time']:>11.2f}{r['requests']:>11}"
+              f"{r['requests_per_table']:>11.2f}{r['requests_per_sec']:>10.0f}{r['errors']:>8}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark tagging flows against a local fake OpenMetadata')
+    parser.add_argument('--flows', nargs='+', choices=list(FLOWS), default=list(FLOWS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='Synthetic table counts')
+    parser.add_argument('--max-workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of server latency per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503 on their first attempt')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results previously written with --output')
+    parser.add_argument('--time-tolerance', type=float, default=0.5, help='Allowed wall time increase (fraction)')
+    parser.add_argument('--request-tolerance', type=float, default=0.05, help='Allowed requests/table increase (fraction)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    configure_session({'requests_per_second': 0, 'pool_size': args.max_workers * 2})
+
+    results = []
+    for flow in args.flows:
+        for size in args.sizes:
+            print(f"Running {flow} with {size} tables...")
+            results.append(run_benchmark(flow, size, args.max_workers, args.latency, args.error_rate))
+
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.time_tolerance, args.request_tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == '__main__':
+    main()
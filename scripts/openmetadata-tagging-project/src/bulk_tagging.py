@@ -0,0 +1,165 @@
+"""
+Bulk application of one tag to many tables.
+
+Tagging a schema one JSON Patch per table costs one request per table. When
+the server has OpenMetadata's bulk tag-to-assets endpoint
+(PUT /v1/tags/{id}/assets/add), the tag is added to up to batch_size tables
+per request instead, so a 2,000 table schema takes a handful of calls. The
+endpoint reports the assets it could not tag, which are returned per table.
+
+Servers without the endpoint (404, 405 or 501) are remembered per base URL
+and tagged with concurrent per-table PATCHes, as are tables whose id is not
+known and batches the bulk call fails for.
+
+Callers pass tables listed without the tag. When a bulk request fails with a
+connection or 5xx error, and so may have tagged the batch anyway, each table
+of the batch is re-read before its PATCH.
+
+Usage:
+    from bulk_tagging import add_tag_to_assets
+
+    results = add_tag_to_assets(base_url, headers, "Application System.FTA",
+                                {table['fullyQualifiedName']: table['id'] for table in tables})
+    failed = [fqn for fqn, result in results.items() if result['status'] == 'failed']
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from omd_client import get_session
+from tagging_engine import run_concurrently, DEFAULT_MAX_WORKERS
+
+BULK_BATCH_SIZE = 500
+UNSUPPORTED_STATUSES = (404, 405, 501)
+
+# base_url -> False once the server has shown it has no bulk endpoint
+_bulk_supported = {}
+_lock = threading.Lock()
+
+
+def bulk_supported(base_url: str) -> bool:
+    with _lock:
+        return _bulk_supported.get(base_url, True)
+
+
+def _mark_unsupported(base_url: str):
+    with _lock:
+        _bulk_supported[base_url] = False
+    logging.warning(f"{base_url} has no bulk tag-to-assets endpoint; tagging one table at a time")
+
+
+def get_tag_id(base_url: str, headers: Dict, tag_fqn: str) -> Optional[str]:
+    encoded_fqn = requests.utils.quote(tag_fqn)
+    response = get_session().get(f"{base_url}/v1/tags/name/{encoded_fqn}", headers=headers)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json().get('id')
+
+
+def patch_tag(base_url: str, headers: Dict, table_fqn: str, tag_fqn: str, recheck: bool = False) -> Tuple[bool, str]:
+    """
+    Add the tag to one table with a JSON Patch. With recheck the table is
+    read first and left alone if it already has the tag. Returns (success, message).
+    """
+    patch_headers = headers.copy()
+    patch_headers['Content-Type'] = 'application/json-patch+json'
+    encoded_fqn = requests.utils.quote(table_fqn)
+    try:
+        if recheck:
+            response = get_session().get(f"{base_url}/v1/tables/name/{encoded_fqn}", headers=headers,
+                                         params={'fields': 'tags'})
+            if response.status_code >= 400:
+                return False, f"{response.status_code} {response.text[:200]}"
+            if any(tag.get('tagFQN') == tag_fqn for tag in response.json().get('tags') or []):
+                return True, 'already tagged'
+        response = get_session().patch(f"{base_url}/v1/tables/name/{encoded_fqn}", headers=patch_headers,
+                                       json=[{"op": "add", "path": "/tags/-", "value": {"tagFQN": tag_fqn}}])
+    except requests.RequestException as e:
+        return False, str(e)
+    if response.status_code >= 400:
+        return False, f"{response.status_code} {response.text[:200]}"
+    return True, 'patched'
+
+
+def _bulk_add(base_url: str, headers: Dict, tag_id: str,
+              batch: List[Tuple[str, str]]) -> Tuple[Optional[Dict[str, Dict]], bool]:
+    """
+    Tag one batch of (fqn, id) pairs with a single bulk request. Returns
+    (per-table results, False), or (None, recheck) if the batch has to be
+    patched table by table; recheck is True when the bulk request may have
+    tagged the batch before it failed.
+    """
+    by_id = {table_id: fqn for fqn, table_id in batch}
+    body = {'assets': [{'id': table_id, 'type': 'table'} for _, table_id in batch], 'dryRun': False}
+    try:
+        response = get_session().put(f"{base_url}/v1/tags/{tag_id}/assets/add", headers=headers, json=body)
+    except requests.RequestException as e:
+        logging.error(f"Bulk tagging request failed ({e}); patching {len(batch)} tables one at a time")
+        return None, True
+    if response.status_code in UNSUPPORTED_STATUSES:
+        _mark_unsupported(base_url)
+        return None, False
+    if response.status_code >= 400:
+        logging.error(f"Bulk tagging request failed with {response.status_code}; "
+                      f"patching {len(batch)} tables one at a time")
+        return None, response.status_code >= 500
+
+    results = {fqn: {'status': 'applied', 'via': 'bulk', 'message': 'success'} for fqn, _ in batch}
+    for failure in response.json().get('failedRequest') or []:
+        fqn = by_id.get((failure.get('request') or {}).get('id'))
+        if fqn is not None:
+            results[fqn] = {'status': 'failed', 'via': 'bulk', 'message': failure.get('message', '')}
+    return results, False
+
+
+def add_tag_to_assets(base_url: str, headers: Dict, tag_fqn: str, assets: Dict[str, Optional[str]],
+                      max_workers: int = DEFAULT_MAX_WORKERS, batch_size: int = BULK_BATCH_SIZE) -> Dict[str, Dict]:
+    """
+    Add tag_fqn to every table in assets (table FQN -> table id, or None when
+    the id is unknown). Returns table FQN -> {'status': 'applied' | 'failed',
+    'via': 'bulk' | 'patch', 'message': ...}.
+    """
+    results = {}
+    fallback = [fqn for fqn, table_id in assets.items() if not table_id]
+    with_ids = [(fqn, table_id) for fqn, table_id in assets.items() if table_id]
+
+    tag_id = None
+    if with_ids and bulk_supported(base_url):
+        try:
+            tag_id = get_tag_id(base_url, headers, tag_fqn)
+        except requests.RequestException as e:
+            logging.error(f"Could not look up tag '{tag_fqn}': {str(e)}")
+        if tag_id is None:
+            logging.warning(f"No id for tag '{tag_fqn}'; patching tables one at a time")
+
+    bulk_requests = 0
+    recheck = set()  # tables a failed bulk request may have tagged anyway
+    for start in range(0, len(with_ids), batch_size):
+        batch = with_ids[start:start + batch_size]
+        batch_results, uncertain = None, False
+        if tag_id is not None and bulk_supported(base_url):
+            batch_results, uncertain = _bulk_add(base_url, headers, tag_id, batch)
+            bulk_requests += 1
+        if batch_results is None:
+            fallback.extend(fqn for fqn, _ in batch)
+            if uncertain:
+                recheck.update(fqn for fqn, _ in batch)
+        else:
+            results.update(batch_results)
+
+    for fqn, outcome in run_concurrently(
+            lambda fqn: patch_tag(base_url, headers, fqn, tag_fqn, fqn in recheck), fallback, max_workers):
+        success, message = (False, str(outcome)) if isinstance(outcome, Exception) else outcome
+        results[fqn] = {'status': 'applied' if success else 'failed', 'via': 'patch', 'message': message}
+
+    failed = sum(1 for result in results.values() if result['status'] == 'failed')
+    logging.info(f"Tagged {len(results) - failed} of {len(results)} tables with {tag_fqn} "
+                 f"({bulk_requests} bulk request(s), {len(fallback)} PATCH(es)); {failed} failed")
+    for fqn, result in results.items():
+        if result['status'] == 'failed':
+            logging.error(f"Failed to tag table {fqn} with {tag_fqn}: {result['message']}")
+    return results
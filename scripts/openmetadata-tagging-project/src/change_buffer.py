@@ -0,0 +1,155 @@
+"""
+Per-entity buffer of pending OpenMetadata changes.
+
+The scripts used to send a PATCH for every change as soon as they decided
+on it: one for a table's tag, another for its owner, and one per
+application when a table belongs to several. The buffer instead gathers
+every pending change for an entity during a run (tags to add or remove,
+owner, description) and flush() sends one combined JSON Patch per entity,
+concurrently. Tags are added at most once per entity, and a later owner or
+description change replaces an earlier one.
+
+Entities are keyed by id (PATCH /v1/tables/{id}) or FQN
+(PATCH /v1/tables/name/{fqn}).
+
+Usage:
+    from change_buffer import ChangeBuffer
+
+    buffer = ChangeBuffer(base_url, headers)
+    buffer.add_tag(table['id'], "Application System.FTA")
+    buffer.set_owner(table['id'], {"id": user_id, "type": "user"})
+    results = buffer.flush(max_workers=8)   # key -> True/False, one PATCH per table
+"""
+
+import logging
+import re
+import threading
+from typing import Dict, List, Optional
+
+import requests
+
+from omd_client import get_session
+from tag_planner import build_patch
+from tagging_engine import run_concurrently, DEFAULT_MAX_WORKERS
+
+UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+_UNSET = object()
+
+
+class ChangeBuffer:
+    def __init__(self, base_url: str, headers: Optional[Dict] = None, entity_type: str = 'tables'):
+        self.base_url = base_url
+        self.headers = headers or {}
+        self.entity_type = entity_type
+        self._pending = {}  # key -> {'add': [...], 'remove': [[index, tag], ...], 'owner': ..., 'description': ...}
+        self._lock = threading.Lock()
+
+    def _entry(self, key: str) -> Dict:
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._pending[key] = {'add': [], 'remove': [], 'owner': _UNSET, 'description': _UNSET}
+        return entry
+
+    def add_tag(self, key: str, tag_fqn: str):
+        with self._lock:
+            entry = self._entry(key)
+            if tag_fqn not in entry['add']:
+                entry['add'].append(tag_fqn)
+
+    def remove_tag(self, key: str, tag_fqn: str, current_tags: List[str]):
+        """Queue the removal of tag_fqn, located by its position in current_tags (the entity's tagFQNs)."""
+        if tag_fqn not in current_tags:
+            return
+        with self._lock:
+            entry = self._entry(key)
+            if tag_fqn in entry['add']:
+                entry['add'].remove(tag_fqn)
+            if not any(tag == tag_fqn for _, tag in entry['remove']):
+                entry['remove'].append([current_tags.index(tag_fqn), tag_fqn])
+
+    def set_owner(self, key: str, owner: Dict):
+        """Queue an owner reference such as {'id': user_id, 'type': 'user'}; it becomes the only entry of owners."""
+        with self._lock:
+            self._entry(key)['owner'] = owner
+
+    def remove_owner(self, key: str):
+        with self._lock:
+            self._entry(key)['owner'] = None
+
+    def set_description(self, key: str, description: str):
+        with self._lock:
+            self._entry(key)['description'] = description
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pending
+
+    @property
+    def operations(self) -> int:
+        """Number of queued changes, i.e. the PATCHes the scripts would have sent one at a time."""
+        count = 0
+        for entry in self._pending.values():
+            count += len(entry['add']) + len(entry['remove'])
+            count += entry['owner'] is not _UNSET
+            count += entry['description'] is not _UNSET
+        return count
+
+    def tag_queued(self, key: str, tag_fqn: str) -> bool:
+        with self._lock:
+            entry = self._pending.get(key)
+            return entry is not None and tag_fqn in entry['add']
+
+    def pending_tags(self) -> Dict[str, List[str]]:
+        """Key -> tags queued for addition, e.g. to record them once flush() reports the outcome."""
+        with self._lock:
+            return {key: list(entry['add']) for key, entry in self._pending.items() if entry['add']}
+
+    @staticmethod
+    def build_patch(entry: Dict) -> List[Dict]:
+        """One JSON Patch with every queued change of an entity."""
+        operations = build_patch(entry)
+        if entry['owner'] is not _UNSET:
+            # The owners list is replaced as a whole; an empty list clears it without failing when unset
+            owners = [] if entry['owner'] is None else [entry['owner']]
+            operations.append({"op": "add", "path": "/owners", "value": owners})
+        if entry['description'] is not _UNSET:
+            operations.append({"op": "add", "path": "/description", "value": entry['description']})
+        return operations
+
+    def _url(self, key: str) -> str:
+        if UUID_PATTERN.match(key):
+            return f"{self.base_url}/v1/{self.entity_type}/{key}"
+        return f"{self.base_url}/v1/{self.entity_type}/name/{requests.utils.quote(key)}"
+
+    def _send(self, key: str, operations: List[Dict]) -> bool:
+        patch_headers = self.headers.copy()
+        patch_headers['Content-Type'] = 'application/json-patch+json'
+        response = get_session().patch(self._url(key), headers=patch_headers, json=operations)
+        if response.status_code >= 400:
+            logging.error(f"Failed to update {key}: {response.status_code} {response.text[:200]}")
+            return False
+        logging.info(f"Updated {key} with {len(operations)} operation(s) in one PATCH")
+        return True
+
+    def flush(self, max_workers: int = DEFAULT_MAX_WORKERS, dry_run: bool = False) -> Dict[str, bool]:
+        """
+        Send one PATCH per pending entity and empty the buffer.
+        Returns key -> True if the entity was updated.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        items = [(key, self.build_patch(entry)) for key, entry in pending.items()]
+        items = [(key, patch) for key, patch in items if patch]
+        operations = sum(len(patch) for _, patch in items)
+        if dry_run:
+            logging.info(f"DRY RUN: Would send {len(items)} PATCH request(s) with {operations} operation(s)")
+            return {key: True for key, _ in items}
+
+        results = {}
+        for (key, patch), result in run_concurrently(lambda item: self._send(*item), items, max_workers):
+            results[key] = result is True
+        failed = sum(1 for success in results.values() if not success)
+        logging.info(f"Flushed {operations} change(s) as {len(results)} PATCH request(s); {failed} failed")
+        return results
@@ -0,0 +1,205 @@
+"""
+Client-side metrics for the tagging scripts, in Prometheus text format.
+
+The shared session in omd_client records every OpenMetadata request here:
+a counter and a latency histogram per method, endpoint and status code,
+throttle retries (429/503), and the time spent waiting on the rate
+limiter. The scripts add the tables processed per application and the
+tables/sec rate.
+
+At the end of a run (close_session) the metrics are written to a textfile
+for the node exporter's textfile collector and/or pushed to a Pushgateway,
+so client load can be put next to the server metrics OpenMetadata's
+ServiceMonitor already scrapes. Both are off unless configured:
+
+    metrics_textfile - path of the .prom file to write, e.g. "logs/omd_tagging.prom"
+    metrics_push_url - Pushgateway base URL, e.g. "http://localhost:9091"
+
+Endpoints are recorded as URL templates (/v1/tables/name/{fqn},
+/v1/tags/{id}/assets/add) so table names do not become label values.
+
+Usage:
+    from client_metrics import metrics
+
+    metrics.observe_request('GET', url, 200, 0.12)
+    metrics.record_tables('FTA', 2000, 35.0)
+    print(metrics.render())
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+PREFIX = 'omd_client'
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ID_SEGMENT = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+
+def endpoint_label(url: str) -> str:
+    """URL template of an API call, e.g. .../api/v1/tables/name/A.B.C.T -> /v1/tables/name/{fqn}."""
+    path = urlparse(url).path
+    if '/v1/' in path:
+        path = path[path.index('/v1/'):]
+    segments = []
+    for segment in path.strip('/').split('/'):
+        if segments and segments[-1] == 'name':
+            segments.append('{fqn}')
+            break
+        segments.append('{id}' if ID_SEGMENT.match(segment) else segment)
+    return '/' + '/'.join(segments)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _key(name: str, labels: Dict) -> Tuple:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class ClientMetrics:
+    """Thread-safe counters, gauges and histograms rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+        self.textfile = None
+        self.push_url = None
+
+    def reset(self):
+        with self._lock:
+            self._counters = defaultdict(float)    # (name, labels) -> value
+            self._gauges = {}                      # (name, labels) -> value
+            self._histograms = {}                  # (name, labels) -> [bucket counts..., sum, count]
+            self._help = {}
+
+    def configure(self, config: Optional[Dict] = None):
+        config = config or {}
+        if config.get('metrics_textfile'):
+            # Relative paths are taken from the project root, like the other data files
+            self.textfile = os.path.join(PROJECT_ROOT, config['metrics_textfile'])
+        self.push_url = config.get('metrics_push_url', self.push_url)
+
+    # ---- primitives -------------------------------------------------------
+
+    def inc(self, name: str, value: float = 1.0, help: str = '', **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._help.setdefault(name, ('counter', help))
+            self._counters[key] += value
+
+    def set(self, name: str, value: float, help: str = '', **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._help.setdefault(name, ('gauge', help))
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, help: str = '', **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._help.setdefault(name, ('histogram', help))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * len(LATENCY_BUCKETS) + [0.0, 0]
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def value(self, name: str, **labels) -> float:
+        """Current value of a counter or gauge (0 if never set); mainly for tests."""
+        key = _key(name, labels)
+        with self._lock:
+            return self._gauges.get(key, self._counters.get(key, 0.0))
+
+    # ---- recorders used by the shared client and scripts ------------------
+
+    def observe_request(self, method: str, url: str, status, elapsed: float):
+        endpoint = endpoint_label(url)
+        self.inc(f'{PREFIX}_requests_total', help='OpenMetadata API requests sent',
+                 method=method, endpoint=endpoint, status=status)
+        self.observe(f'{PREFIX}_request_duration_seconds', elapsed, help='OpenMetadata API request latency',
+                     method=method, endpoint=endpoint, status=status)
+
+    def record_retry(self, method: str, url: str, status):
+        self.inc(f'{PREFIX}_retries_total', help='Requests retried after a 429/503 response',
+                 method=method, endpoint=endpoint_label(url), status=status)
+
+    def record_throttle_wait(self, seconds: float):
+        self.inc(f'{PREFIX}_throttle_wait_seconds_total', seconds, help='Time spent waiting on the rate limiter')
+        self.inc(f'{PREFIX}_throttle_waits_total', help='Requests that waited on the rate limiter')
+
+    def record_tables(self, application: str, tables: int, elapsed: float):
+        self.inc('omd_tagging_tables_total', tables, help='Tables processed per application',
+                 application=application)
+        self.set('omd_tagging_tables_per_second', tables / elapsed if elapsed > 0 else 0.0,
+                 help='Tables processed per second for the last run of an application', application=application)
+
+    # ---- export -----------------------------------------------------------
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = []
+            for name in sorted(self._help):
+                kind, help_text = self._help[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == 'histogram':
+                    for (metric, labels), histogram in sorted(self._histograms.items()):
+                        if metric != name:
+                            continue
+                        for bound, count in zip(LATENCY_BUCKETS, histogram):
+                            lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram[-1]}")
+                        lines.append(f"{name}_sum{_format_labels(labels)} {histogram[-2]}")
+                        lines.append(f"{name}_count{_format_labels(labels)} {histogram[-1]}")
+                else:
+                    values = self._counters if kind == 'counter' else self._gauges
+                    for (metric, labels), value in sorted(values.items()):
+                        if metric == name:
+                            lines.append(f"{name}{_format_labels(labels)} {value}")
+            return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Write atomically, so the textfile collector never reads a partial file."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w') as f:
+            f.write(self.render())
+        os.replace(temporary, path)
+        logging.info(f"Metrics written to {path}")
+
+    def push(self, url: str, job: str):
+        """PUT the metrics to a Pushgateway, replacing the previous push of this job."""
+        response = requests.put(f"{url.rstrip('/')}/metrics/job/{job}", data=self.render().encode(),
+                                headers={'Content-Type': 'text/plain; version=0.0.4'}, timeout=10)
+        response.raise_for_status()
+        logging.info(f"Metrics pushed to {url} as job {job}")
+
+    def export(self, job: str):
+        """Write and/or push the metrics as configured; failures are logged, never raised."""
+        try:
+            if self.textfile:
+                self.write_textfile(self.textfile)
+            if self.push_url:
+                self.push(self.push_url, job)
+        except (OSError, requests.RequestException) as e:
+            logging.warning(f"Could not export metrics: {str(e)}")
+
+
+metrics = ClientMetrics()
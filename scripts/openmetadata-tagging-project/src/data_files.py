@@ -0,0 +1,150 @@
+"""
+Columnar working files for data/.
+
+The pipeline's intermediate files (openmetadata_table_fqns, THE_schema_dump,
+er_studio_fta_tables_views, matched_records_fta) are written as Parquet. The
+columns are typed, and low-cardinality ones such as APPLICATION or
+OBJECT_TYPE are stored dictionary-encoded and read back as pandas
+categoricals. Readers only load the columns they ask for, and large files are
+read in row batches, so nothing re-parses text.
+
+CSV stays supported on both sides:
+- Every reader accepts a .csv path.
+- data_file() falls back to an existing .csv when no .parquet has been produced yet.
+- Every writer can also export a .csv copy.
+
+Usage:
+    from data_files import data_file, read_table, iter_chunks, write_table
+
+    path = data_file(DATA_DIR, 'openmetadata_table_fqns')   # .parquet, or the .csv if that is all there is
+    for chunk in iter_chunks(path, columns=['fqn']):
+        ...
+    write_table(df, os.path.join(DATA_DIR, 'matched_records_fta.parquet'), categorical=['APPLICATION'], csv_export=True)
+"""
+
+import logging
+import os
+from typing import Iterable, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PARQUET_SUFFIX = '.parquet'
+CSV_SUFFIX = '.csv'
+DEFAULT_CHUNK_SIZE = 200000
+
+
+def is_parquet(path: str) -> bool:
+    return path.lower().endswith(PARQUET_SUFFIX)
+
+
+def data_file(data_dir: str, name: str) -> str:
+    """Path of a working file: the .parquet if present, else an existing .csv, else where the .parquet goes."""
+    parquet_path = os.path.join(data_dir, name + PARQUET_SUFFIX)
+    csv_path = os.path.join(data_dir, name + CSV_SUFFIX)
+    if not os.path.exists(parquet_path) and os.path.exists(csv_path):
+        return csv_path
+    return parquet_path
+
+
+def csv_path_for(path: str) -> str:
+    return os.path.splitext(path)[0] + CSV_SUFFIX
+
+
+def columns_of(path: str) -> List[str]:
+    """Column names, without reading any rows."""
+    if is_parquet(path):
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_table(path: str, columns: Optional[List[str]] = None, categorical: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    Read a working file. Parquet columns are read as stored (dictionary
+    columns as categoricals); CSV columns are read as strings.
+    """
+    if is_parquet(path):
+        return pq.read_table(path, columns=columns).to_pandas()
+    df = pd.read_csv(path, usecols=columns, dtype=str)
+    for column in categorical:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def iter_chunks(path: str, columns: Optional[List[str]] = None,
+                chunksize: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Read a working file in chunks of up to chunksize rows, with only the given columns."""
+    if is_parquet(path):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+        return
+    yield from pd.read_csv(path, usecols=columns, dtype=str, chunksize=chunksize)
+
+
+def _to_arrow(df: pd.DataFrame, categorical: Iterable[str] = (), schema: Optional[pa.Schema] = None) -> pa.Table:
+    df = df.copy(deep=False)
+    for column in categorical:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def write_table(df: pd.DataFrame, path: str, categorical: Iterable[str] = (), csv_export: bool = False) -> str:
+    """
+    Write df to path as Parquet (or CSV if path ends in .csv), atomically.
+    categorical columns are stored dictionary-encoded. With csv_export a
+    .csv copy is written next to the Parquet file. Returns path.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f"{path}.tmp"
+    if is_parquet(path):
+        pq.write_table(_to_arrow(df, categorical), temporary)
+    else:
+        df.to_csv(temporary, index=False)
+    os.replace(temporary, path)
+    logging.info(f"Wrote {len(df)} rows to {path}")
+    if csv_export and is_parquet(path):
+        write_table(df, csv_path_for(path))
+    return path
+
+
+def write_chunks(chunks: Iterable[pd.DataFrame], path: str, categorical: Iterable[str] = (),
+                 csv_export: bool = False) -> int:
+    """
+    Stream DataFrame chunks (e.g. db_connection_cx.stream_query) into one
+    Parquet or CSV file without holding them all; returns the row count.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f"{path}.tmp"
+    csv_copy = csv_path_for(path) if csv_export and is_parquet(path) else None
+    rows = 0
+    writer = None
+    csv_file = None
+    try:
+        for index, chunk in enumerate(chunks):
+            if is_parquet(path):
+                table = _to_arrow(chunk, categorical, writer.schema if writer else None)
+                if writer is None:
+                    writer = pq.ParquetWriter(temporary, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(temporary, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+            if csv_copy:
+                if csv_file is None:
+                    csv_file = open(f"{csv_copy}.tmp", 'w', newline='')
+                chunk.to_csv(csv_file, header=index == 0, index=False)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+        if csv_file is not None:
+            csv_file.close()
+    if not os.path.exists(temporary):
+        raise ValueError(f"No data to write to {path}")
+    os.replace(temporary, path)
+    if csv_copy:
+        os.replace(f"{csv_copy}.tmp", csv_copy)
+    logging.info(f"Wrote {rows} rows to {path}")
+    return rows
@@ -1,38 +1,217 @@
 # Filename: db_connection_cx.py
-from sqlalchemy import create_engine
-from dotenv import load_dotenv, dotenv_values
-import os
+"""
+Pooled, streaming access to the Oracle databases (ER/Studio, DBP01/DBQ01).
+
+get_db_connection() builds one engine per process from .env and returns the
+same engine on later calls. Its connection pool is pre-pinged, so dead
+connections are replaced before use, and cx_Oracle fetches rows in batches
+of ORACLE_ARRAYSIZE. Queries can be streamed as DataFrame chunks or rows
+instead of being materialised in one go, and several queries can run at
+once over the pool.
+
+Optional .env settings (defaults in brackets):
+    ORACLE_POOL_SIZE [4], ORACLE_MAX_OVERFLOW [2], ORACLE_POOL_RECYCLE [1800 seconds],
+    ORACLE_ARRAYSIZE [5000], ORACLE_PREFETCHROWS [ORACLE_ARRAYSIZE + 1]
+
+Usage:
+    from db_connection_cx import get_db_connection, stream_query, run_queries
+
+    engine = get_db_connection()
+    for chunk in stream_query(engine, sql, {"application": "FTA"}):
+        ...
+    for application, df in run_queries(engine, {app: (sql, {"application": app}) for app in apps}):
+        ...
+
+Export a large extract to Parquet (or CSV) without holding it in memory:
+    python src/db_connection_cx.py config/THE_schema_dump.sql data/THE_schema_dump.parquet
+"""
+import argparse
 import logging
+import os
+import sys
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+from dotenv import load_dotenv, dotenv_values
+from sqlalchemy import create_engine, event, text
+
+from data_files import write_chunks
+from tagging_engine import run_concurrently
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_OVERFLOW = 2
+DEFAULT_POOL_RECYCLE = 1800
+DEFAULT_ARRAYSIZE = 5000
+DEFAULT_CHUNK_SIZE = 50000
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _setting(env_vars: Dict, name: str, default: int) -> int:
+    value = env_vars.get(name) or os.environ.get(name)
+    return int(value) if value else default
+
+
+def create_db_engine(connection_string: str, pool_size: int = DEFAULT_POOL_SIZE,
+                     max_overflow: int = DEFAULT_MAX_OVERFLOW, pool_recycle: int = DEFAULT_POOL_RECYCLE,
+                     arraysize: Optional[int] = DEFAULT_ARRAYSIZE, prefetchrows: Optional[int] = None):
+    """
+    Engine with a pre-pinged pool of pool_size connections (plus max_overflow).
+    arraysize and prefetchrows are applied to every cursor that supports them.
+    """
+    options = {'pool_pre_ping': True, 'pool_recycle': pool_recycle}
+    if not connection_string.startswith('sqlite'):
+        options.update(pool_size=pool_size, max_overflow=max_overflow)
+    engine = create_engine(connection_string, **options)
+
+    if arraysize:
+        prefetchrows = prefetchrows or arraysize + 1
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _tune_cursor(conn, cursor, statement, parameters, context, executemany):
+            if hasattr(cursor, 'arraysize'):
+                cursor.arraysize = arraysize
+            if hasattr(cursor, 'prefetchrows'):
+                cursor.prefetchrows = prefetchrows
+
+    return engine
+
 
 def get_db_connection():
-    # Set up logging
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    """Return the process-wide Oracle engine, creating it from .env on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            return _engine
+
+        # Load environment variables
+        load_dotenv()
+        env_vars = dotenv_values()
+
+        # Log environment variables (except password)
+        logging.info(f"ORACLE_DRIVER: {env_vars.get('ORACLE_DRIVER')}")
+        logging.info(f"ORACLE_DSN: {env_vars.get('ORACLE_DSN')}")
+        logging.info(f"ORACLE_USER: {env_vars.get('ORACLE_USER')}")
+        logging.info(f"TNS_ADMIN: {env_vars.get('TNS_ADMIN')}")
+
+        # Construct the SQLAlchemy connection string
+        connection_string = (
+            f"oracle+cx_oracle://{env_vars.get('ORACLE_USER')}:{env_vars.get('ORACLE_PASSWORD')}@"
+            f"{env_vars.get('ORACLE_DSN')}"
+        )
+
+        try:
+            _engine = create_db_engine(
+                connection_string,
+                pool_size=_setting(env_vars, 'ORACLE_POOL_SIZE', DEFAULT_POOL_SIZE),
+                max_overflow=_setting(env_vars, 'ORACLE_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW),
+                pool_recycle=_setting(env_vars, 'ORACLE_POOL_RECYCLE', DEFAULT_POOL_RECYCLE),
+                arraysize=_setting(env_vars, 'ORACLE_ARRAYSIZE', DEFAULT_ARRAYSIZE),
+                prefetchrows=_setting(env_vars, 'ORACLE_PREFETCHROWS', 0) or None,
+            )
+            logging.info("Connection successful!")
+            return _engine
+        except Exception as e:
+            logging.error(f"Connection failed: {str(e)}")
+            raise
+
+
+def dispose_db_connection():
+    """Close the pooled connections of the process-wide engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+            logging.info("Database connection closed.")
+
+
+def stream_query(engine, query: str, params: Optional[Dict] = None,
+                 chunksize: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Yield the result of query as DataFrames of up to chunksize rows, using a
+    server-side cursor so only one chunk is held at a time. A query without
+    rows yields one empty DataFrame with the result's columns.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=chunksize) \
+                           .execute(text(query), params or {})
+        columns = list(result.keys())
+        empty = True
+        for rows in result.partitions(chunksize):
+            empty = False
+            yield pd.DataFrame(rows, columns=columns)
+        if empty:
+            yield pd.DataFrame(columns=columns)
+
+
+def iter_rows(engine, query: str, params: Optional[Dict] = None,
+              chunksize: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple]:
+    """Yield the result of query one row (tuple) at a time."""
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=chunksize) \
+                           .execute(text(query), params or {})
+        for row in result:
+            yield tuple(row)
 
-    # Load environment variables
-    load_dotenv()
-    env_vars = dotenv_values()
 
-    # Mask password for logging
-    def mask_password(password):
-        return '*' * len(password) if password else None
+def read_query(engine, query: str, params: Optional[Dict] = None,
+               chunksize: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """The whole result of query as one DataFrame, fetched in chunks."""
+    return pd.concat(stream_query(engine, query, params, chunksize), ignore_index=True)
 
-    # Log environment variables (except password)
-    logging.info(f"ORACLE_DRIVER: {env_vars.get('ORACLE_DRIVER')}")
-    logging.info(f"ORACLE_DSN: {env_vars.get('ORACLE_DSN')}")
-    logging.info(f"ORACLE_USER: {env_vars.get('ORACLE_USER')}")
-    logging.info(f"TNS_ADMIN: {env_vars.get('TNS_ADMIN')}")
 
-    # Construct the SQLAlchemy connection string
-    connection_string = (
-        f"oracle+cx_oracle://{env_vars.get('ORACLE_USER')}:{env_vars.get('ORACLE_PASSWORD')}@"
-        f"{env_vars.get('ORACLE_DSN')}"
-    )
+def _pool_size(engine) -> int:
+    pool = engine.pool
+    return pool.size() if hasattr(pool, 'size') else DEFAULT_POOL_SIZE
 
+
+def run_queries(engine, queries: Dict, max_workers: Optional[int] = None,
+                chunksize: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[object, pd.DataFrame]]:
+    """
+    Run several queries at once over the engine's pool.
+    queries maps a key (e.g. an application) to (sql, params); yields
+    (key, DataFrame) in completion order. Failed queries raise.
+    max_workers defaults to the pool size.
+    """
+    def fetch(key):
+        sql, params = queries[key]
+        return read_query(engine, sql, params, chunksize)
+
+    for key, result in run_concurrently(fetch, list(queries), max_workers or _pool_size(engine)):
+        if isinstance(result, Exception):
+            raise result
+        yield key, result
+
+
+def export_query(engine, query: str, path: str, params: Optional[Dict] = None,
+                 chunksize: int = DEFAULT_CHUNK_SIZE, csv_export: bool = False) -> int:
+    """
+    Stream the result of query into path chunk by chunk: Parquet, or CSV if
+    path ends in .csv (csv_export also writes a .csv copy of a Parquet file).
+    Returns the row count.
+    """
+    return write_chunks(stream_query(engine, query, params, chunksize), path, csv_export=csv_export)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream the result of a SQL file into a Parquet or CSV file.')
+    parser.add_argument('sql_file', help='SQL file to run, e.g. config/THE_schema_dump.sql')
+    parser.add_argument('output_file', help='File to write, e.g. data/THE_schema_dump.parquet (or .csv)')
+    parser.add_argument('--csv', action='store_true', help='Also export a CSV copy of a Parquet output file')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows fetched per chunk')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with open(args.sql_file) as f:
+        query = f.read().strip().rstrip(';')
     try:
-        # Use SQLAlchemy to create an engine (connection)
-        engine = create_engine(connection_string)
-        logging.info("Connection successful!")
-        return engine
-    except Exception as e:
-        logging.error(f"Connection failed: {str(e)}")
-        raise
+        export_query(get_db_connection(), query, args.output_file, chunksize=args.chunksize, csv_export=args.csv)
+    finally:
+        dispose_db_connection()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
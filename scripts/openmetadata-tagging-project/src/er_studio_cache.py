@@ -0,0 +1,160 @@
+"""
+Local cache of ER/Studio query results, invalidated by model version.
+
+ER/Studio models change rarely, but main.py used to run
+asset_ownership_er_studio.sql for every application on every run. Results
+are now stored as Parquet files under data/er_studio_cache/, one per query.
+Each file is keyed by a hash of the SQL text and its bind parameters, and is
+stamped with the repository's latest diagram and model version ids at the
+time it was written.
+
+At the start of a run one cheap probe (VERSION_PROBE_SQL) reads the current
+version ids. A cached result is used only if its stamp matches them. When
+every query of a run is cached, Oracle sees nothing but the probe. If the
+probe fails, the cache is bypassed and the queries run as before.
+
+Usage:
+    from er_studio_cache import ErStudioCache, run_cached_queries
+
+    cache = ErStudioCache("data/er_studio_cache", engine)
+    frames = run_cached_queries(engine, {app: (sql, {"application": app}) for app in apps}, cache)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from db_connection_cx import run_queries
+
+DEFAULT_CACHE_DIR = os.path.join('data', 'er_studio_cache')
+
+# Latest version ids across the repository; any check-in of a model or diagram raises one of them
+VERSION_PROBE_SQL = """
+SELECT (SELECT MAX(diagram_ver_id) FROM app_erstudio.diagram_ver) AS diagram_ver
+     , (SELECT MAX(model_ver_id) FROM app_erstudio.model_ver) AS model_ver
+     , (SELECT COUNT(*) FROM app_erstudio.diagram WHERE is_deleted = 0) AS diagrams
+  FROM dual
+"""
+
+
+def query_key(sql: str, params: Optional[Dict] = None) -> str:
+    """SHA-256 of the SQL text and its bind parameters."""
+    payload = json.dumps([sql.strip(), params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ErStudioCache:
+    def __init__(self, cache_dir: str, engine, probe_sql: str = VERSION_PROBE_SQL):
+        self.cache_dir = cache_dir
+        self.engine = engine
+        self.probe_sql = probe_sql
+        self._versions = None
+        self._probed = False
+        self.hits = 0
+        self.misses = 0
+
+    def model_versions(self) -> Optional[Dict]:
+        """Current version ids, probed once per cache; None if the probe failed."""
+        if not self._probed:
+            self._probed = True
+            try:
+                with self.engine.connect() as connection:
+                    row = connection.execute(text(self.probe_sql)).mappings().first()
+                self._versions = {key: str(value) for key, value in dict(row or {}).items()}
+                logging.info(f"ER/Studio model versions: {self._versions}")
+            except Exception as e:
+                logging.warning(f"Could not probe ER/Studio model versions, not using the cache: {str(e)}")
+                self._versions = None
+        return self._versions
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.parquet", f"{base}.json"
+
+    def read(self, sql: str, params: Optional[Dict] = None) -> Optional[pd.DataFrame]:
+        """The cached result of the query if it was stored for the current model versions."""
+        versions = self.model_versions()
+        if versions is None:
+            return None
+        data_path, stamp_path = self._paths(query_key(sql, params))
+        try:
+            with open(stamp_path) as f:
+                stamp = json.load(f)
+            if stamp.get('versions') != versions:
+                self.misses += 1
+                return None
+            df = pd.read_parquet(data_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return df
+
+    def write(self, sql: str, params: Optional[Dict], df: pd.DataFrame):
+        """Store the result stamped with the current model versions."""
+        versions = self.model_versions()
+        if versions is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        key = query_key(sql, params)
+        data_path, stamp_path = self._paths(key)
+        df.to_parquet(f"{data_path}.tmp", index=False)
+        os.replace(f"{data_path}.tmp", data_path)
+        with open(f"{stamp_path}.tmp", 'w') as f:
+            json.dump({'key': key, 'versions': versions, 'rows': len(df), 'cached_at': time.time()}, f)
+        os.replace(f"{stamp_path}.tmp", stamp_path)
+
+    def prune(self) -> int:
+        """Delete results stored for other model versions; returns how many were removed."""
+        versions = self.model_versions()
+        if versions is None or not os.path.isdir(self.cache_dir):
+            return 0
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            data_path, stamp_path = self._paths(name[:-len('.json')])
+            try:
+                with open(stamp_path) as f:
+                    current = json.load(f).get('versions') == versions
+            except (OSError, ValueError):
+                current = False
+            if not current:
+                for path in (data_path, stamp_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                removed += 1
+        return removed
+
+
+def run_cached_queries(engine, queries: Dict, cache: Optional[ErStudioCache] = None) -> Dict:
+    """
+    Like db_connection_cx.run_queries, but answered from cache where valid.
+    Only the queries without a current cached result go to the database.
+    Returns a dict of key -> DataFrame.
+    """
+    results = {}
+    misses = {}
+    for key, (sql, params) in queries.items():
+        df = cache.read(sql, params) if cache is not None else None
+        if df is None:
+            misses[key] = (sql, params)
+        else:
+            results[key] = df
+
+    if cache is not None:
+        logging.info(f"ER/Studio cache: {len(results)} cached, {len(misses)} to query")
+    if misses:
+        for key, df in run_queries(engine, misses):
+            results[key] = df
+            if cache is not None:
+                cache.write(*misses[key], df)
+        if cache is not None:
+            cache.prune()
+    return results
@@ -1,10 +1,13 @@
-import requests
+import argparse
 import logging
-import csv
 import json
-import time
 import os
+import pandas as pd
 from typing import List, Dict
+from omd_client import configure_session, close_session
+from tagging_engine import DEFAULT_MAX_WORKERS
+from metadata_snapshot import MetadataSnapshot, snapshot_path
+from data_files import write_table
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -13,45 +16,25 @@ def load_config(config_path: str) -> Dict:
     with open(config_path, 'r') as config_file:
         return json.load(config_file)
 
-def get_all_table_fqns(base_url: str, headers: Dict, batch_size: int = 100) -> List[str]:
-    all_fqns = []
-    after = None
-    while True:
-        url = f"{base_url}/v1/tables?fields=fullyQualifiedName&limit={batch_size}"
-        if after:
-            url += f"&after={after}"
-        
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            logging.error(f"Failed to fetch tables: {response.status_code}")
-            break
-        
-        data = response.json()
-        fqns = [table.get('fullyQualifiedName') for table in data.get('data', []) if table.get('fullyQualifiedName')]
-        all_fqns.extend(fqns)
-        
-        after = data.get('paging', {}).get('after')
-        if not after:
-            break
-        
-        logging.info(f"Fetched {len(all_fqns)} table FQNs so far. Waiting 2 seconds before next batch...")
-        time.sleep(2)
-    
-    return all_fqns
-
-def save_to_csv(data: List[str], filename: str):
+def save_fqns(data: List[str], filename: str, csv_export: bool = False):
+    """Write the FQNs as a one-column Parquet file (or CSV by suffix), optionally with a CSV copy."""
     if not data:
-        logging.warning("No data to save to CSV.")
+        logging.warning("No data to save.")
         return
-    
-    with open(filename, 'w', newline='') as output_file:
-        writer = csv.writer(output_file)
-        writer.writerow(['fqn'])  # Header
-        for fqn in data:
-            writer.writerow([fqn])
-    logging.info(f"Data saved to {filename}")
+    write_table(pd.DataFrame({'fqn': pd.Series(data, dtype=str)}), filename, csv_export=csv_export)
 
 def main():
+    parser = argparse.ArgumentParser(description='Refresh the local metadata snapshot and export table FQNs to Parquet')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Re-list every table instead of applying changes since the last sync')
+    parser.add_argument('--partitioned', action='store_true',
+                        help='On a full refresh, list database schemas and fetch their tables concurrently')
+    parser.add_argument('--max-workers', type=int,
+                        help=f'Concurrent schema listings with --partitioned (default: max_workers in config or {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--csv', action='store_true',
+                        help='Also export the FQNs to data/openmetadata_table_fqns.csv')
+    args = parser.parse_args()
+
     # Get the root directory of the project
     project_root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
 
@@ -64,14 +47,19 @@ def main():
         "Authorization": f"Bearer {jwt_token}",
         "Content-Type": "application/json"
     }
+    configure_session(config, headers)
 
-    # Fetch all table FQNs from OpenMetadata
-    all_fqns = get_all_table_fqns(base_url, headers)
-    logging.info(f"Total table FQNs fetched: {len(all_fqns)}")
+    # Bring the local snapshot up to date; only tables changed since the last sync are fetched
+    with MetadataSnapshot(snapshot_path(config, project_root)) as snapshot:
+        max_workers = (args.max_workers or config.get('max_workers', DEFAULT_MAX_WORKERS)) if args.partitioned else None
+        snapshot.refresh(base_url, headers, full=args.full_refresh, max_workers=max_workers)
+        all_fqns = snapshot.fqns()
+    logging.info(f"Total table FQNs in snapshot: {len(all_fqns)}")
 
-    # Save results to CSV
-    output_file = os.path.join(project_root, 'data', 'openmetadata_table_fqns2.csv')
-    save_to_csv(all_fqns, output_file)
+    # Save results; readers prefer the Parquet file and fall back to the CSV
+    output_file = os.path.join(project_root, 'data', 'openmetadata_table_fqns.parquet')
+    save_fqns(all_fqns, output_file, csv_export=args.csv)
+    close_session()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,13 +3,13 @@
 # 1. clears the log file at the start of each run and adds a timestamp to each log entry.
 # 2. checks for the existence of tags but does not create missing tags.
 # 3. applies existing tags to tables using the PATCH method.
-# 4. processes tables in batches with a delay between batches to avoid overwhelming the API.
+# 4. processes tables concurrently on a bounded worker pool (--max-workers) instead of serial batches.
 # 5. provides a comprehensive summary at the end of the run.
 #
 # To use this script, you'll need to ensure you have the following in place:
 #
 # 1. A openmetadata_config.json file with your base_url and jwt_token.
-# 2. A openmetadata_table_fqns.csv file with the table FQNs.
+# 2. A openmetadata_table_fqns.parquet (or .csv) file with the table FQNs.
 # 3. An sql file with your SQL query.
 # 4. The db_connection_cx module for database connections.
 # 5. The openmetadata_table_list_processor module with the load_openmetadata_tables function.
@@ -17,20 +17,40 @@
 import os
 import json
 import pandas as pd
-from db_connection_cx import get_db_connection
+from db_connection_cx import get_db_connection, dispose_db_connection
+# ER/Studio results reused while the model versions are unchanged
+from er_studio_cache import ErStudioCache, run_cached_queries, DEFAULT_CACHE_DIR
 import logging
 import requests
 from typing import List, Dict
 import time
 from datetime import datetime
 from requests.exceptions import RequestException
-import sys
 import argparse
+import re
 import socket
 from urllib.parse import urlparse
 
 # Import the function to load OpenMetadata tables
-from openmetadata_table_list_processor import load_openmetadata_tables
+from openmetadata_table_list_processor import load_openmetadata_tables, build_table_index
+from data_files import data_file
+# Shared pooled session for all OpenMetadata requests
+from omd_client import get_session, configure_session, close_session, PATCH_TEST_FAILED_STATUSES
+# Bounded thread pool used to check and tag many tables at once
+from tagging_engine import run_concurrently, sum_counters, DEFAULT_MAX_WORKERS
+# Prefetched Application System tags, so tag existence is answered in memory
+from tag_catalog import TagCatalog, DEFAULT_CLASSIFICATIONS
+from tag_planner import reconcile, schemas_for
+from metadata_snapshot import open_snapshot, snapshot_path
+from run_journal import open_journal, outcome_from_counters
+# Per-table queue of tag changes for --coalesce, flushed as one PATCH per table
+from change_buffer import ChangeBuffer
+# Request, retry and throughput metrics, exported by close_session() when configured
+from client_metrics import metrics
+# Queue-backed JSON logging with size-based rotation and token redaction
+from run_logging import configure_logging
+
+session = get_session()
 
 # List of applications
 APPLICATION_LIST = [
@@ -38,14 +58,11 @@ APPLICATION_LIST = [
     'CBM', 'CCLRMP_WHSE', 'CCSD', 'CEF', 'CFSWEB', 'CI', 'CIRRAS', 'CIRRAS_CCCS', 'CIRRAS_LEGACY', 'CLIENT', 'CMS', 'CONSEP',
     'CORP_PERSON_ORG', 'CRISP', 'CRSRA', 'CSAT', 'CSP', 'CWB_WHSE', 'CWM', 'DISRMS', 'EDAB', 'EIRS', 'ELDS', 'ERA', 'ESF', 'ESRITOOL',
     'EUL', 'FAM_Model', 'FARM', 'FFS', 'FNIRS', 'FPCT', 'FSA_CLIENT', 'FSP', 'FTC', 'GATOR', 'GBA', 'GBMS', 'GEOMARK', 'GWELLS', 'ILCR',
-    'IRS', 'ISDUT', 'ITVR', 'ITVR', 'LEXIS', 'LINKNET', 'LTRACK', 'MALS', 'MPNA', 'MSD', 'MTEC', 'NOTICES', 'NSA2', 'OATS', 'OCERS', 'OSS',
+    'IRS', 'ISDUT', 'ITVR', 'LEXIS', 'LINKNET', 'LTRACK', 'MALS', 'MPNA', 'MSD', 'MTEC', 'NOTICES', 'NSA2', 'OATS', 'OCERS', 'OSS',
     'PAR', 'PASO', 'PEFP', 'PPS', 'PSCIS', 'RDBD', 'REC', 'REFERRAL', 'REPREPO', 'REPT', 'RESPROJ', 'RMS', 'RTM', 'SCS', 'SDR', 'SOSS', 'TR',
     'TSADMRPT', 'TUS', 'VMAD', 'VRIMS', 'WF1_ORG', 'WIMSI'
 ]
 
-BATCH_SIZE = 100
-BATCH_DELAY = 2  # seconds
-
 def check_dns(url, timeout=5):
     """Check if the hostname in the URL can be resolved."""
     try:
@@ -70,13 +87,54 @@ def retry_with_backoff(func, max_retries=5, initial_delay=1, backoff_factor=2):
                 delay *= backoff_factor
     return wrapper
 
-def execute_sql_query(query, engine, params=None):
-    try:
-        df = pd.read_sql(query, engine, params=params)
-        return df
-    except Exception as e:
-        logging.error(f"Error executing SQL query: {str(e)}")
-        raise
+# Oracle allows at most 1000 expressions in an IN list
+MAX_IN_LIST = 1000
+
+def deduplicate_applications(applications):
+    """Drop repeated application names while keeping the original order."""
+    unique = list(dict.fromkeys(applications))
+    if len(unique) != len(applications):
+        duplicates = sorted({app for app in applications if applications.count(app) > 1})
+        logging.warning(f"Ignoring duplicate applications in list: {duplicates}")
+    return unique
+
+def build_bulk_query(base_sql_query, applications):
+    """
+    Rewrite the single-application filter (DiagVer.Name = :application) into an
+    IN list of bind parameters. Returns the query and its parameters.
+    """
+    placeholders = ', '.join(f":app_{i}" for i in range(len(applications)))
+    sql_query, replaced = re.subn(r"=\s*:application\b", f"IN ({placeholders})", base_sql_query)
+    if replaced != 1:
+        raise ValueError("Expected exactly one ':application' filter in the SQL query for bulk mode")
+    params = {f"app_{i}": application for i, application in enumerate(applications)}
+    return sql_query, params
+
+def fetch_application_tables(base_sql_query, engine, applications, cache=None):
+    """
+    Run the ER/Studio query once for the whole application set (in chunks of
+    MAX_IN_LIST, run concurrently over the connection pool) and group the rows
+    by application in memory. Rows are grouped on the query's application
+    column, which matches DiagVer.Name except for 'WASTE(FOR)' (reported as 'WASTE').
+    Returns a dict of application -> DataFrame.
+    """
+    queries = {i: build_bulk_query(base_sql_query, applications[i:i + MAX_IN_LIST])
+               for i in range(0, len(applications), MAX_IN_LIST)}
+    frames = [df for _, df in sorted(run_cached_queries(engine, queries, cache).items())]
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['application', 'table_name'])
+    logging.info(f"Bulk ER/Studio query returned {len(df)} rows for {len(applications)} applications")
+    return {application: group for application, group in df.groupby('application')}
+
+def fetch_tables_per_application(base_sql_query, engine, applications, cache=None):
+    """
+    Run the single-application ER/Studio query for each application,
+    several at once over the connection pool.
+    Returns a dict of application -> DataFrame.
+    """
+    sql_query = base_sql_query.replace("({application})", ":application")
+    queries = {application: (sql_query, {"application": application}) for application in applications}
+    return run_cached_queries(engine, queries, cache)
 
 def load_config(config_name):
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -86,36 +144,32 @@ def load_config(config_name):
         return json.load(config_file)
 
 @retry_with_backoff
-def check_table_exists(base_url, headers, table_fqn):
-    encoded_fqn = requests.utils.quote(table_fqn)
-    response = requests.get(f"{base_url}/v1/tables/name/{encoded_fqn}", headers=headers)
-    return response.status_code == 200
-
-@retry_with_backoff
-def check_tag_exists(base_url, headers, tag_fqn):
+def check_tag_exists(base_url, headers, tag_fqn, tag_catalog=None):
+    """Check the tag against the prefetched tag catalog, or with a GET if none is given."""
+    if tag_catalog is not None:
+        return tag_catalog.exists(tag_fqn)
     encoded_fqn = requests.utils.quote(tag_fqn)
-    response = requests.get(f"{base_url}/v1/tags/name/{encoded_fqn}", headers=headers)
+    response = session.get(f"{base_url}/v1/tags/name/{encoded_fqn}", headers=headers)
     return response.status_code == 200
 
 @retry_with_backoff
-def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=False):
+def get_table(base_url, headers, table_fqn, fields='tags'):
+    """Fetch a table with the requested fields in one GET; returns None if it does not exist."""
     encoded_fqn = requests.utils.quote(table_fqn)
-    url = f"{base_url}/v1/tables/name/{encoded_fqn}"
-    
-    # First, get the current table metadata
-    response = requests.get(url, headers=headers)
+    response = session.get(f"{base_url}/v1/tables/name/{encoded_fqn}", headers=headers, params={'fields': fields})
+    if response.status_code == 404:
+        return None
     response.raise_for_status()
-    table_data = response.json()
-    
-    # Check if the tag is already applied
-    existing_tags = table_data.get('tags', [])
-    if any(tag.get('tagFQN') == tag_fqn for tag in existing_tags):
-        logging.info(f"Tag '{tag_fqn}' is already applied to table '{table_fqn}'")
-        return True
-
-    if dry_run:
-        logging.info(f"DRY RUN: Would apply tag '{tag_fqn}' to table '{table_fqn}'")
-        return True
+    return response.json()
+
+def send_tag_patch(base_url, headers, table_fqn, tag_fqn, untagged_only=False):
+    """
+    Send the JSON Patch that adds tag_fqn to the table and return the response.
+    With untagged_only the patch starts with a "test" that the table has no
+    tags, so the server rejects it for any table that already has some.
+    """
+    encoded_fqn = requests.utils.quote(table_fqn)
+    url = f"{base_url}/v1/tables/name/{encoded_fqn}"
 
     # Prepare the patch operation
     patch_operation = [
@@ -125,79 +179,181 @@ def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=False):
             "value": {"tagFQN": tag_fqn}
         }
     ]
+    if untagged_only:
+        patch_operation.insert(0, {"op": "test", "path": "/tags", "value": []})
 
     # Set the correct Content-Type for JSON Patch
     patch_headers = headers.copy()
     patch_headers['Content-Type'] = 'application/json-patch+json'
 
-    # Log the exact payload and headers we're sending
-    logging.info(f"Sending PATCH request to {url}")
-    logging.info(f"Headers: {patch_headers}")
-    logging.info(f"Payload: {json.dumps(patch_operation)}")
+    # Per-request detail only with --debug; the headers carry the bearer token and are never logged
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"Sending PATCH request to {url}")
+        logging.debug(f"Payload: {json.dumps(patch_operation)}")
 
     # Apply the PATCH operation
-    patch_response = requests.patch(url, headers=patch_headers, json=patch_operation)
+    return session.patch(url, headers=patch_headers, json=patch_operation)
+
+def _apply_tag_once(base_url, headers, table_fqn, tag_fqn, dry_run=False, table_data=None):
+    if table_data is None:
+        # Get the current table metadata
+        encoded_fqn = requests.utils.quote(table_fqn)
+        response = session.get(f"{base_url}/v1/tables/name/{encoded_fqn}", headers=headers, params={'fields': 'tags'})
+        response.raise_for_status()
+        table_data = response.json()
+    
+    # Check if the tag is already applied
+    existing_tags = table_data.get('tags') or []
+    if any(tag.get('tagFQN') == tag_fqn for tag in existing_tags):
+        logging.info(f"Tag '{tag_fqn}' is already applied to table '{table_fqn}'")
+        return True
+
+    if dry_run:
+        logging.info(f"DRY RUN: Would apply tag '{tag_fqn}' to table '{table_fqn}'")
+        return True
+
+    patch_response = send_tag_patch(base_url, headers, table_fqn, tag_fqn)
     patch_response.raise_for_status()
     
     logging.info(f"Successfully applied tag '{tag_fqn}' to table '{table_fqn}'")
     return True
 
-def process_table_batch(base_url, headers, tables, tag_fqn, tag_exists, dry_run=False):
-    existing_tables = 0
-    missing_tables = 0
-    tag_applications = 0
-    failed_tag_applications = 0
-
-    for table_name, table_info in tables:
-        try:
-            if check_table_exists(base_url, headers, table_info['fqn']):
-                existing_tables += 1
-                logging.info(f"Table found in OpenMetadata: {table_info['fqn']}")
-                
-                if tag_exists:
-                    if apply_tag(base_url, headers, table_info['fqn'], tag_fqn, dry_run):
-                        tag_applications += 1
-                    else:
-                        failed_tag_applications += 1
-            else:
+def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=False, table_data=None):
+    """
+    Apply tag_fqn to the table unless it is already there.
+    Pass table_data (with tags) when the table has already been fetched to skip the extra GET.
+    Retries re-read the table rather than reuse table_data, since a failed
+    PATCH may still have landed and must not be sent again.
+    """
+    try:
+        return _apply_tag_once(base_url, headers, table_fqn, tag_fqn, dry_run, table_data)
+    except RequestException as e:
+        logging.warning(f"Tagging '{table_fqn}' failed: {str(e)}. Retrying after re-reading the table...")
+        return retry_with_backoff(_apply_tag_once)(base_url, headers, table_fqn, tag_fqn, dry_run)
+
+def write_tag(base_url, headers, table_fqn, tag_fqn):
+    """
+    Write-only mode: PATCH the tag without reading the table first, guarded
+    so it only applies to a table with no tags. A table that already has tags,
+    or a PATCH that failed, is re-read and only patched if the tag is still
+    missing. Returns False if the table does not exist.
+    """
+    try:
+        patch_response = send_tag_patch(base_url, headers, table_fqn, tag_fqn, untagged_only=True)
+        if patch_response.status_code == 404:
+            return False
+        if patch_response.status_code not in PATCH_TEST_FAILED_STATUSES:
+            patch_response.raise_for_status()
+            logging.info(f"Successfully applied tag '{tag_fqn}' to table '{table_fqn}'")
+            return True
+        logging.info(f"Table '{table_fqn}' already has tags; reading it before tagging")
+    except RequestException as e:
+        logging.warning(f"Tagging '{table_fqn}' failed: {str(e)}. Retrying after re-reading the table...")
+    table_data = get_table(base_url, headers, table_fqn)
+    if table_data is None:
+        return False
+    return apply_tag(base_url, headers, table_fqn, tag_fqn, table_data=table_data)
+
+def process_table(base_url, headers, table_info, tag_fqn, tag_exists, dry_run=False, write_only=False, buffer=None):
+    """
+    Check one table and apply the tag to it with at most one GET and one PATCH,
+    or a single PATCH in write-only mode.
+    With a change buffer the tag is queued instead of PATCHed, so a table in
+    several applications gets all its tags in one PATCH when the buffer is flushed.
+    Write-only mode does not use the buffer, since a queued tag cannot be guarded
+    against a table that already has it.
+    Returns counter increments as (existing, missing, applied, failed).
+    """
+    try:
+        if buffer is not None and tag_exists and not dry_run and not write_only:
+            table_data = get_table(base_url, headers, table_info['fqn'])
+            if table_data is None:
                 logging.warning(f"Table in list but not found in OpenMetadata API: {table_info['fqn']}")
-                missing_tables += 1
-        except RequestException as e:
-            logging.error(f"Failed to process table {table_info['fqn']}: {str(e)}")
-            failed_tag_applications += 1
+                return 0, 1, 0, 0
+            if any(tag.get('tagFQN') == tag_fqn for tag in table_data.get('tags') or []):
+                logging.info(f"Tag '{tag_fqn}' is already applied to table '{table_info['fqn']}'")
+            else:
+                buffer.add_tag(table_info['fqn'], tag_fqn)
+            return 1, 0, 1, 0
 
-    return existing_tables, missing_tables, tag_applications, failed_tag_applications
+        if write_only and tag_exists and not dry_run:
+            if write_tag(base_url, headers, table_info['fqn'], tag_fqn):
+                return 1, 0, 1, 0
+            logging.warning(f"Table in list but not found in OpenMetadata API: {table_info['fqn']}")
+            return 0, 1, 0, 0
 
-class DatePrefixFormatter(logging.Formatter):
-    def format(self, record):
-        record.asctime = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        return super().format(record)
+        table_data = get_table(base_url, headers, table_info['fqn'])
+        if table_data is not None:
+            logging.info(f"Table found in OpenMetadata: {table_info['fqn']}")
 
-def setup_logging():
+            if tag_exists:
+                if apply_tag(base_url, headers, table_info['fqn'], tag_fqn, dry_run, table_data=table_data):
+                    return 1, 0, 1, 0
+                return 1, 0, 0, 1
+            return 1, 0, 0, 0
+        else:
+            logging.warning(f"Table in list but not found in OpenMetadata API: {table_info['fqn']}")
+            return 0, 1, 0, 0
+    except RequestException as e:
+        logging.error(f"Failed to process table {table_info['fqn']}: {str(e)}")
+        return 0, 0, 0, 1
+
+def process_table_batch(base_url, headers, tables, tag_fqn, tag_exists, dry_run=False, max_workers=DEFAULT_MAX_WORKERS,
+                        write_only=False, journal=None, buffer=None):
+    """
+    Process (table_name, table_info) pairs concurrently with at most max_workers in flight.
+    With a run journal, tables it already has are skipped and each outcome is recorded;
+    tags queued in a change buffer are recorded by the caller once the buffer is flushed,
+    while tables that already carry the tag are recorded as existing straight away.
+    Returns totals as (existing, missing, applied, failed).
+    """
+    def worker(table):
+        table_name, table_info = table
+        return process_table(base_url, headers, table_info, tag_fqn, tag_exists, dry_run, write_only, buffer)
+
+    if journal is not None:
+        tables = [table for table in tables if not journal.table_done(table[1]['fqn'], tag_fqn)]
+
+    results = []
+    for (table_name, table_info), result in run_concurrently(worker, tables, max_workers):
+        if isinstance(result, Exception):
+            # Unexpected worker error; count it as a failed application
+            result = (0, 0, 0, 1)
+        outcome = outcome_from_counters(*result)
+        if journal is not None:
+            if buffer is not None and outcome == 'applied':
+                if not buffer.tag_queued(table_info['fqn'], tag_fqn):
+                    journal.record_table(table_info['fqn'], tag_fqn, 'existing')
+            else:
+                journal.record_table(table_info['fqn'], tag_fqn, outcome)
+        results.append(result)
+
+    return sum_counters(results, 4)
+
+def flush_change_buffer(buffer, max_workers=DEFAULT_MAX_WORKERS, journal=None):
+    """
+    Send the queued tags with one PATCH per table and journal each (table, tag) outcome.
+    Returns the number of tag applications that failed.
+    """
+    queued = buffer.pending_tags()
+    logging.info(f"Sending {buffer.operations} queued tag(s) for {len(buffer)} table(s)")
+    failed = 0
+    for table_fqn, success in buffer.flush(max_workers).items():
+        tags = queued.get(table_fqn, [])
+        if not success:
+            failed += len(tags)
+        if journal is not None:
+            for tag_fqn in tags:
+                journal.record_table(table_fqn, tag_fqn, 'applied' if success else 'failed')
+    return failed
+
+def setup_logging(debug=False):
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
     log_file = os.path.join(project_root, 'logs', 'openmetadata_tagging_run.log')
-    
-    # Ensure the logs directory exists
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    
-    # Set up logging with date prefix
-    formatter = DatePrefixFormatter('%(asctime)s - %(levelname)s - %(message)s')
 
-    # Set up file handler for logging to file
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
-    
-    # Set up stream handler for logging to console
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    
-    # Configure the root logger
-    logging.getLogger().setLevel(logging.INFO)
-    logging.getLogger().addHandler(file_handler)
-    logging.getLogger().addHandler(console_handler)
+    # Queue-backed: the file (JSON lines, rotated by size) and console are written by a listener thread
+    configure_logging(log_file, level=logging.DEBUG if debug else logging.INFO)
 
     # Add a date header for this run
     run_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -206,13 +362,41 @@ def setup_logging():
 def main():
     parser = argparse.ArgumentParser(description='Apply tags to tables in OpenMetadata.')
     parser.add_argument('--dry-run', action='store_true', help='Perform a dry run without applying tags')
+    parser.add_argument('--max-workers', type=int, help=f'Maximum concurrent table requests (default: max_workers in config or {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--per-application-queries', action='store_true',
+                        help='Run the ER/Studio query once per application instead of once for all applications')
+    parser.add_argument('--write-only', action='store_true',
+                        help='PATCH the tag without reading untagged tables first (one request per table); '
+                             'tables that already have tags are still read before tagging')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--plan', action='store_true', help='Compute and print the minimal tag diff without applying it')
+    mode.add_argument('--apply', action='store_true',
+                      help='Apply the minimal tag diff (loads --plan-file if it exists, otherwise plans first)')
+    parser.add_argument('--plan-file', help='Where --plan writes the plan and --apply reads it from')
+    parser.add_argument('--prune', action='store_true',
+                        help='With --plan/--apply, also remove Application System tags that are no longer desired')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='Read table FQNs and current tags from the local metadata snapshot (refreshed incrementally)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip applications and tables the run journal of an interrupted run already completed')
+    parser.add_argument('--coalesce', action='store_true',
+                        help='Queue tags across applications and send one PATCH per table at the end of the run')
+    parser.add_argument('--no-er-studio-cache', action='store_true',
+                        help='Always query ER/Studio instead of reusing results cached for the current model versions')
+    parser.add_argument('--debug', action='store_true', help='Log per-request detail (URLs and payloads)')
     args = parser.parse_args()
+    if args.coalesce and args.write_only:
+        parser.error("--write-only tags each table with its own guarded PATCH; it cannot be combined with --coalesce")
 
-    setup_logging()
+    setup_logging(args.debug)
 
     if args.dry_run:
         logging.info("Running in DRY RUN mode. No changes will be applied.")
+    if args.write_only:
+        logging.info("Running in WRITE ONLY mode. Tables are not read before tagging.")
 
+    snapshot = None
+    journal = None
     try:
         config = load_config('openmetadata_config.json')
         
@@ -222,21 +406,46 @@ def main():
             "Authorization": f"Bearer {jwt_token}",
             "Content-Type": "application/json"
         }
+        configure_session(config, headers)
+        max_workers = args.max_workers or config.get('max_workers', DEFAULT_MAX_WORKERS)
+        logging.info(f"Processing tables with up to {max_workers} concurrent workers")
 
         # Check DNS resolution before starting
         if not check_dns(base_url):
             logging.error(f"Unable to resolve hostname for {base_url}. Please check your network connection and DNS settings.")
             return
 
+        # Abort if the tags cannot be loaded rather than reporting every tag as missing
+        try:
+            tag_catalog = TagCatalog(base_url, headers, config.get('tag_classifications', DEFAULT_CLASSIFICATIONS)).load()
+        except RequestException as e:
+            logging.error(f"Unable to load the tag catalog from {base_url}: {str(e)}")
+            return
+
+        if args.apply and args.plan_file and os.path.exists(args.plan_file):
+            reconcile(base_url, headers, None, apply=True, plan_file=args.plan_file, max_workers=max_workers,
+                      dry_run=args.dry_run)
+            return
+
         script_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.dirname(script_dir)
-        csv_path = os.path.join(project_root, 'data', 'openmetadata_table_fqns.csv')
-        openmetadata_tables = load_openmetadata_tables(csv_path)
+        if args.snapshot:
+            snapshot = open_snapshot(base_url, headers, snapshot_path(config, project_root))
+            openmetadata_tables = build_table_index(snapshot.fqns())
+        else:
+            fqns_path = data_file(os.path.join(project_root, 'data'), 'openmetadata_table_fqns')
+            openmetadata_tables = load_openmetadata_tables(fqns_path)
+        # Optional service/database/schema that ER/Studio table names are matched within
+        match_scope = config.get('table_match_scope', {})
 
         engine = get_db_connection()
         sql_file_path = os.path.join(project_root, 'config', 'asset_ownership_er_studio.sql')
         with open(sql_file_path, 'r') as file:
             base_sql_query = file.read()
+        er_studio_cache = None
+        if not args.no_er_studio_cache:
+            cache_dir = os.path.join(project_root, config.get('er_studio_cache_dir', DEFAULT_CACHE_DIR))
+            er_studio_cache = ErStudioCache(cache_dir, engine)
 
         total_applications_processed = 0
         total_tables = 0
@@ -247,13 +456,36 @@ def main():
         total_tag_applications = 0
         total_failed_tag_applications = 0
 
-        for application in APPLICATION_LIST:
+        reconcile_mode = args.plan or args.apply
+        desired = {}  # table FQN -> tags, collected instead of tagging in --plan/--apply mode
+
+        # Plans are already minimal and dry runs change nothing, so only tagging runs are journaled
+        if not (reconcile_mode or args.dry_run):
+            journal = open_journal(os.path.join(project_root, 'data'), 'main', args.resume)
+
+        # With --coalesce, tags are queued per table and applications are journaled after the flush
+        buffer = ChangeBuffer(base_url, headers) if args.coalesce and not reconcile_mode else None
+        completed_applications = []
+
+        applications = deduplicate_applications(APPLICATION_LIST)
+        pending_applications = [application for application in applications
+                                if journal is None or not journal.application_done(application)]
+        if args.per_application_queries:
+            application_tables = fetch_tables_per_application(base_sql_query, engine, pending_applications, er_studio_cache)
+        else:
+            application_tables = fetch_application_tables(base_sql_query, engine, pending_applications, er_studio_cache)
+
+        for application in applications:
+            if journal is not None and journal.application_done(application):
+                logging.info(f"Skipping application {application}: already completed according to the run journal")
+                continue
             logging.info(f"Processing application: {application}")
-            sql_query = base_sql_query.replace("({application})", ":application")
-            df = execute_sql_query(sql_query, engine, params={"application": application})
+            application_started = time.monotonic()
+            failed = 0
+            df = application_tables.get(application, pd.DataFrame(columns=['application', 'table_name']))
 
             tag_fqn = f"Application System.{application}"
-            tag_exists = check_tag_exists(base_url, headers, tag_fqn)
+            tag_exists = check_tag_exists(base_url, headers, tag_fqn, tag_catalog)
             if tag_exists:
                 existing_tags += 1
                 logging.info(f"Tag '{tag_fqn}' exists in OpenMetadata.")
@@ -262,26 +494,56 @@ def main():
                 logging.warning(f"Tag '{tag_fqn}' does not exist in OpenMetadata.")
 
             if 'table_name' in df.columns:
-                tables = [(table_name, openmetadata_tables.get(table_name.lower())) 
-                          for table_name in df['table_name'] if table_name.lower() in openmetadata_tables]
+                tables = []
+                for table_name in df['table_name']:
+                    # Ambiguous names are reported by the index and skipped rather than guessed
+                    table_info = openmetadata_tables.resolve(table_name, **match_scope)
+                    if table_info is not None:
+                        tables.append((table_name, table_info))
                 total_tables += len(tables)
 
-                # Process tables in batches
-                for i in range(0, len(tables), BATCH_SIZE):
-                    batch = tables[i:i+BATCH_SIZE]
-                    existing, missing, applied, failed = process_table_batch(base_url, headers, batch, tag_fqn, tag_exists, args.dry_run)
-                    total_existing_tables += existing
-                    total_missing_tables += missing
-                    total_tag_applications += applied
-                    total_failed_tag_applications += failed
-
-                    if i + BATCH_SIZE < len(tables):
-                        logging.info(f"Waiting {BATCH_DELAY} seconds before processing next batch...")
-                        time.sleep(BATCH_DELAY)
+                if reconcile_mode:
+                    if tag_exists:
+                        for table_name, table_info in tables:
+                            desired.setdefault(table_info['fqn'], set()).add(tag_fqn)
+                    total_applications_processed += 1
+                    continue
+
+                # Process tables concurrently
+                existing, missing, applied, failed = process_table_batch(
+                    base_url, headers, tables, tag_fqn, tag_exists, args.dry_run, max_workers, args.write_only, journal,
+                    buffer
+                )
+                total_existing_tables += existing
+                total_missing_tables += missing
+                total_tag_applications += applied
+                total_failed_tag_applications += failed
+                metrics.record_tables(application, len(tables), time.monotonic() - application_started)
 
             total_applications_processed += 1
+            # An application with failed tables is not marked done, so --resume retries them
+            if buffer is not None and not failed:
+                completed_applications.append(application)
+            elif journal is not None and not failed:
+                journal.record_application(application)
             logging.info(f"Finished processing application: {application}")
 
+        if buffer is not None:
+            flush_failed = flush_change_buffer(buffer, max_workers, journal)
+            total_tag_applications -= flush_failed
+            total_failed_tag_applications += flush_failed
+            # A failed flush cannot be traced to one application, so none is marked done
+            if journal is not None and not flush_failed:
+                for application in completed_applications:
+                    journal.record_application(application)
+
+        if reconcile_mode:
+            current = snapshot.current_state(schemas_for(desired)) if snapshot else None
+            reconcile(base_url, headers, desired, apply=args.apply, plan_file=args.plan_file, prune=args.prune,
+                      max_workers=max_workers, dry_run=args.dry_run,
+                      classifications=config.get('tag_classifications', DEFAULT_CLASSIFICATIONS), current=current)
+            return
+
         summary = f"""
         Run Summary:
         Dry Run: {'Yes' if args.dry_run else 'No'}
@@ -291,17 +553,24 @@ def main():
         Missing tables in OpenMetadata: {total_missing_tables}
         Existing tags in OpenMetadata: {existing_tags}
         Missing tags in OpenMetadata: {missing_tags}
+        Ambiguous table names skipped: {len(openmetadata_tables.ambiguous)}
+        Tables skipped from the run journal: {journal.skipped_tables if journal else 0}
         {'Simulated' if args.dry_run else 'Actual'} tag applications: {total_tag_applications}
         {'Simulated' if args.dry_run else 'Actual'} failed tag applications: {total_failed_tag_applications}
         """
         logging.info(summary)
+        if journal is not None:
+            journal.finish()
 
     except Exception as e:
         logging.error(f"An error occurred in the main script: {str(e)}")
     finally:
-        if 'engine' in locals():
-            engine.dispose()
-            logging.info("Database connection closed.")
+        dispose_db_connection()
+        if snapshot is not None:
+            snapshot.close()
+        if journal is not None:
+            journal.close()
+        close_session()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
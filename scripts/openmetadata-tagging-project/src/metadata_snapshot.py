@@ -0,0 +1,243 @@
+"""
+Persistent local snapshot of OpenMetadata tables.
+
+Keeps one SQLite row per table, keyed by the table id, with its FQN, tags,
+owners and updatedAt, so each run does not have to rebuild its view of the
+catalogue from scratch. The first sync lists every table once. Later syncs
+only fetch the tables named in the change events (GET /v1/events) since
+the last sync; deleted tables are dropped. If the events endpoint is
+unavailable, or the number of changes makes a listing cheaper, the
+snapshot falls back to a full refresh.
+
+The taggers read table listings, FQNs and current tags from the snapshot
+instead of calling the API for them.
+
+Usage:
+    from metadata_snapshot import MetadataSnapshot, open_snapshot, snapshot_path
+
+    with MetadataSnapshot("data/openmetadata_snapshot.db") as snapshot:
+        snapshot.refresh(base_url, headers)             # incremental after the first run
+        tables = snapshot.tables("DBQ01.DBQ01.consep")  # same shape as the /v1/tables listing
+        fqns = snapshot.fqns()
+
+    # or, in the scripts, open the configured snapshot already refreshed
+    snapshot = open_snapshot(base_url, headers, snapshot_path(config, project_root))
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from table_iterator import iter_tables, iter_table_partitions
+from change_feed import table_events, fetch_changed_tables, DELETE_EVENTS
+from tagging_engine import DEFAULT_MAX_WORKERS
+
+DEFAULT_SNAPSHOT_PATH = os.path.join('data', 'openmetadata_snapshot.db')
+SNAPSHOT_FIELDS = 'tags,owners'
+FULL_REFRESH_THRESHOLD = 5000  # changed tables above which a full listing is cheaper
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tables (
+    id TEXT PRIMARY KEY,
+    fqn TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    schema_fqn TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    owners TEXT NOT NULL,
+    updated_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS tables_schema ON tables (schema_fqn);
+CREATE INDEX IF NOT EXISTS tables_name ON tables (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class MetadataSnapshot:
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM tables").fetchone()[0]
+
+    # ---- sync state -------------------------------------------------------
+
+    @property
+    def last_sync(self) -> Optional[int]:
+        """Epoch milliseconds at which the last successful sync started, or None."""
+        row = self.connection.execute("SELECT value FROM sync_state WHERE key = 'last_sync'").fetchone()
+        return int(row[0]) if row else None
+
+    def _set_last_sync(self, timestamp: int):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_sync', ?)", (str(timestamp),)
+        )
+
+    # ---- writes -----------------------------------------------------------
+
+    def upsert(self, tables: Iterable[Dict]) -> int:
+        rows = [
+            (
+                table['id'],
+                table['fullyQualifiedName'],
+                table.get('name') or table['fullyQualifiedName'].rsplit('.', 1)[-1],
+                table['fullyQualifiedName'].rsplit('.', 1)[0],
+                json.dumps(table.get('tags') or []),
+                json.dumps(table.get('owners') or []),
+                table.get('updatedAt'),
+            )
+            for table in tables
+        ]
+        # A table re-created under the same FQN gets a new id; drop the stale row first
+        self.connection.executemany("DELETE FROM tables WHERE fqn = ? AND id != ?", [(row[1], row[0]) for row in rows])
+        self.connection.executemany("INSERT OR REPLACE INTO tables VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def delete(self, table_ids: Iterable[str]) -> int:
+        cursor = self.connection.executemany("DELETE FROM tables WHERE id = ?", [(table_id,) for table_id in table_ids])
+        return cursor.rowcount
+
+    # ---- refresh ----------------------------------------------------------
+
+    def refresh(self, base_url: str, headers: Optional[Dict] = None, full: bool = False,
+                max_workers: Optional[int] = None) -> Dict:
+        """
+        Bring the snapshot up to date and return counters for the sync.
+        Runs a full refresh on the first sync, when full is set, or when the
+        incremental path cannot be used. With max_workers, a full refresh
+        lists the database schemas and fetches them concurrently, and an
+        incremental one fetches that many changed tables at a time.
+        """
+        started = int(time.time() * 1000)
+        stats = None
+        if not full and self.last_sync is not None:
+            try:
+                stats = self._refresh_incremental(base_url, headers, max_workers)
+            except requests.RequestException as e:
+                logging.warning(f"Incremental snapshot refresh failed ({e}); running a full refresh")
+        if stats is None:
+            stats = self._refresh_full(base_url, headers, max_workers)
+
+        self._set_last_sync(started)
+        self.connection.commit()
+        logging.info(f"Snapshot {self.path} refreshed ({stats['mode']}): {stats['updated']} updated, "
+                     f"{stats['deleted']} deleted, {len(self)} tables")
+        return stats
+
+    def _refresh_full(self, base_url: str, headers: Optional[Dict], max_workers: Optional[int] = None) -> Dict:
+        seen = set()
+        updated = 0
+        if max_workers and max_workers > 1:
+            for schema_fqn, tables in iter_table_partitions(base_url, headers, SNAPSHOT_FIELDS, max_workers):
+                seen.update(table['id'] for table in tables)
+                updated += self.upsert(tables)
+        else:
+            batch = []
+            for table in iter_tables(base_url, headers, fields=SNAPSHOT_FIELDS):
+                seen.add(table['id'])
+                batch.append(table)
+                if len(batch) >= 1000:
+                    updated += self.upsert(batch)
+                    batch = []
+            updated += self.upsert(batch)
+
+        stale = [row[0] for row in self.connection.execute("SELECT id FROM tables") if row[0] not in seen]
+        self.delete(stale)
+        return {'mode': 'full', 'updated': updated, 'deleted': len(stale)}
+
+    def _refresh_incremental(self, base_url: str, headers: Optional[Dict],
+                             max_workers: Optional[int] = None) -> Optional[Dict]:
+        """Apply table change events since the last sync; None means a full refresh is cheaper."""
+        latest = table_events(base_url, headers, self.last_sync)
+
+        if len(latest) > FULL_REFRESH_THRESHOLD:
+            logging.info(f"{len(latest)} tables changed since the last sync; running a full refresh instead")
+            return None
+
+        changed = fetch_changed_tables(base_url, headers, self.last_sync, SNAPSHOT_FIELDS,
+                                       max_workers or DEFAULT_MAX_WORKERS, events=latest)
+        # Deleted tables, including changed ones that were gone (404) by the time they were fetched
+        fetched = {table['id'] for table in changed}
+        deleted = [table_id for table_id, event_type in latest.items()
+                   if event_type in DELETE_EVENTS or table_id not in fetched]
+
+        self.upsert(changed)
+        self.delete(deleted)
+        return {'mode': 'incremental', 'updated': len(changed), 'deleted': len(deleted)}
+
+    # ---- reads ------------------------------------------------------------
+
+    @staticmethod
+    def _to_table(row) -> Dict:
+        table_id, name, fqn, tags, owners, updated_at = row
+        return {
+            'id': table_id,
+            'name': name,
+            'fullyQualifiedName': fqn,
+            'tags': json.loads(tags),
+            'owners': json.loads(owners),
+            'updatedAt': updated_at,
+        }
+
+    def tables(self, schema_fqn: Optional[str] = None) -> List[Dict]:
+        """Tables in the same shape as the /v1/tables listing (id, name, fullyQualifiedName, tags, owners, updatedAt)."""
+        query = "SELECT id, name, fqn, tags, owners, updated_at FROM tables"
+        params = ()
+        if schema_fqn:
+            query += " WHERE schema_fqn = ?"
+            params = (schema_fqn,)
+        return [self._to_table(row) for row in self.connection.execute(query + " ORDER BY fqn", params)]
+
+    def tables_by_fqn(self, fqns: Iterable[str]) -> Dict[str, Dict]:
+        """FQN -> table for the given FQNs that are in the snapshot."""
+        fqns = list(fqns)
+        found = {}
+        for start in range(0, len(fqns), 500):
+            chunk = fqns[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for row in self.connection.execute(
+                    f"SELECT id, name, fqn, tags, owners, updated_at FROM tables WHERE fqn IN ({placeholders})", chunk):
+                found[row[2]] = self._to_table(row)
+        return found
+
+    def fqns(self) -> List[str]:
+        return [row[0] for row in self.connection.execute("SELECT fqn FROM tables ORDER BY fqn")]
+
+    def current_state(self, schemas: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """Table FQN -> tag FQNs, in the shape tag_planner.current_state returns."""
+        state = {}
+        for schema in (schemas if schemas is not None else [None]):
+            for table in self.tables(schema):
+                state[table['fullyQualifiedName']] = [tag.get('tagFQN') for tag in table['tags']]
+        return state
+
+
+def snapshot_path(config: Dict, project_root: str) -> str:
+    """The snapshot_path from the config (relative to the project root), or data/openmetadata_snapshot.db."""
+    return os.path.join(project_root, config.get('snapshot_path', DEFAULT_SNAPSHOT_PATH))
+
+
+def open_snapshot(base_url: str, headers: Dict, path: str, refresh: bool = True) -> MetadataSnapshot:
+    """Open the snapshot at path and, by default, refresh it incrementally."""
+    snapshot = MetadataSnapshot(path)
+    if refresh:
+        snapshot.refresh(base_url, headers)
+    return snapshot
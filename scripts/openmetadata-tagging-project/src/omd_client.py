@@ -0,0 +1,177 @@
+"""
+Shared HTTP client for the OpenMetadata tagging scripts.
+
+Every script talks to OpenMetadata through the one pooled, keep-alive
+requests.Session held here instead of calling requests.get/patch directly,
+so connections to the OpenShift route are reused rather than paying a new
+TCP+TLS handshake on every call. Every request also passes through the
+shared RateLimiter, and 429 responses are retried after Retry-After. A 503
+is retried the same way for idempotent methods only, since a PATCH or POST
+may have reached the server before it answered 503 and resending it could
+append a tag or create an object twice.
+Each request, retry and rate-limiter wait is recorded in client_metrics,
+which close_session() exports when metrics_textfile or metrics_push_url
+is configured.
+
+Usage:
+    from omd_client import configure_session
+
+    session = configure_session(config)
+    response = session.get(f"{base_url}/v1/tables/name/{fqn}")
+
+Optional keys read from openmetadata_config.json:
+    pool_size  - number of pooled connections to keep open (default 20)
+    timeout    - request timeout in seconds, or [connect, read] (default [5, 60])
+    requests_per_second  - rate limiter target, 0 to disable (default 20)
+    max_throttle_retries - retries of a request answered with 429 (or 503 when idempotent) (default 5)
+    metrics_textfile     - Prometheus textfile written at the end of a run
+    metrics_push_url     - Pushgateway the metrics are pushed to at the end of a run
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import RateLimiter, parse_retry_after, DEFAULT_RATE
+from client_metrics import metrics
+
+DEFAULT_POOL_SIZE = 20
+DEFAULT_TIMEOUT = (5, 60)  # (connect, read) seconds
+DEFAULT_THROTTLE_RETRIES = 5
+THROTTLE_STATUS_CODES = (429, 503)
+# PATCH is left out: an add /tags/- PATCH sent to a table that already carries
+# the tag adds the label again. Callers therefore never resend a failed tag
+# PATCH as is; they re-read the table and only patch if the tag is still
+# missing, or guard a blind PATCH with a "test" operation.
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+# Statuses a JSON Patch is rejected with when one of its "test" operations does not match
+PATCH_TEST_FAILED_STATUSES = (400, 409, 412)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class OpenMetadataSession(requests.Session):
+    """requests.Session with a sized connection pool, a default timeout and rate limiting."""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 rate_limiter: Optional[RateLimiter] = None):
+        super().__init__()
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter(DEFAULT_RATE)
+        self.max_throttle_retries = DEFAULT_THROTTLE_RETRIES
+        self.headers.update({
+            "Content-Type": "application/json",
+            "Connection": "keep-alive"
+        })
+        self.set_pool_size(pool_size)
+
+    def set_pool_size(self, pool_size: int):
+        """Mount adapters that keep up to pool_size connections open per host."""
+        self.pool_size = pool_size
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_throttle_retries + 1):
+            waited = self.rate_limiter.acquire()
+            if waited:
+                metrics.record_throttle_wait(waited)
+            start = time.monotonic()
+            try:
+                response = super().request(method, url, **kwargs)
+            except requests.RequestException:
+                metrics.observe_request(method, url, 'error', time.monotonic() - start)
+                raise
+            elapsed = time.monotonic() - start
+            metrics.observe_request(method, url, response.status_code, elapsed)
+            logging.debug("%s %s -> %s in %.3fs", method, url, response.status_code, elapsed)
+            if response.status_code in THROTTLE_STATUS_CODES:
+                # Every worker pauses, even when this request is handed back to the caller unretried
+                self.rate_limiter.backoff(parse_retry_after(response.headers.get('Retry-After')))
+            if _retryable(method, response.status_code) and attempt < self.max_throttle_retries:
+                metrics.record_retry(method, url, response.status_code)
+                logging.warning(f"{method} {url} returned {response.status_code}; retry {attempt + 1} of {self.max_throttle_retries}")
+                continue
+            if response.status_code < 400:
+                self.rate_limiter.success()
+            return response
+
+
+def _retryable(method: str, status_code: int) -> bool:
+    """429 means the request was refused, so any method is resent; 503 only for idempotent methods."""
+    if status_code == 429:
+        return True
+    return status_code in THROTTLE_STATUS_CODES and method.upper() in IDEMPOTENT_METHODS
+
+
+def build_headers(jwt_token: str) -> Dict:
+    """Return the standard JSON headers with the bearer token."""
+    return {
+        "Authorization": f"Bearer {jwt_token}",
+        "Content-Type": "application/json"
+    }
+
+
+def get_session() -> OpenMetadataSession:
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = OpenMetadataSession()
+        return _session
+
+
+def configure_session(config: Optional[Dict] = None, headers: Optional[Dict] = None) -> OpenMetadataSession:
+    """
+    Apply pool size, timeout and default headers to the shared session.
+
+    config is the loaded openmetadata_config.json. When it holds a jwt_token
+    the Authorization header is set as a session default, so callers may
+    omit headers on individual requests.
+    """
+    config = config or {}
+    session = get_session()
+
+    pool_size = int(config.get('pool_size', DEFAULT_POOL_SIZE))
+    if pool_size != session.pool_size:
+        session.set_pool_size(pool_size)
+
+    timeout = config.get('timeout')
+    if timeout is not None:
+        session.timeout = tuple(timeout) if isinstance(timeout, list) else timeout
+
+    if 'requests_per_second' in config:
+        session.rate_limiter.set_rate(config['requests_per_second'])
+    if 'max_throttle_retries' in config:
+        session.max_throttle_retries = int(config['max_throttle_retries'])
+
+    metrics.configure(config)
+
+    if config.get('jwt_token'):
+        session.headers.update(build_headers(config['jwt_token']))
+    if headers:
+        session.headers.update(headers)
+
+    logging.info(f"OpenMetadata session configured: pool_size={session.pool_size}, timeout={session.timeout}, "
+                 f"requests_per_second={session.rate_limiter.target_rate or 'unlimited'}")
+    return session
+
+
+def close_session(job: Optional[str] = None):
+    """
+    Close pooled connections at the end of a run and export the run's
+    metrics as job (default: the script name) if an export is configured.
+    """
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+    metrics.export(job or os.path.splitext(os.path.basename(sys.argv[0] or 'omd_client'))[0])
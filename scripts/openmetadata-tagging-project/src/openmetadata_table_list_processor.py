@@ -1,22 +1,183 @@
 # Usage:
-# openmetadata_tables = load_openmetadata_tables('path/to/your/openmetadata_table_list.csv')
+# openmetadata_tables = load_openmetadata_tables('data/openmetadata_table_fqns.parquet')   # or a .csv
+# or, from the local metadata snapshot:
+# openmetadata_tables = build_table_index(snapshot.fqns())
+#
+# table_info = openmetadata_tables.resolve('MY_TABLE')                 # None if missing or ambiguous
+# table_info = openmetadata_tables.resolve('MY_TABLE', service='DBP01')
+# matches = openmetadata_tables.find('MY_TABLE')                       # every candidate
+# openmetadata_tables.ambiguous                                        # name -> FQNs that could not be resolved
 
 import csv
+import logging
+import sys
+from array import array
+
+from data_files import is_parquet, iter_chunks
+
+def split_fqn(fqn):
+    """
+    Split an FQN on the dots outside double quotes and strip the quotes,
+    e.g. 'svc."my.db".schema.T' -> ['svc', 'my.db', 'schema', 'T'].
+    """
+    if '"' not in fqn:
+        return fqn.split('.')
+    parts = []
+    current = []
+    quoted = False
+    for char in fqn:
+        if char == '"':
+            quoted = not quoted
+        elif char == '.' and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return parts
+
+class TableIndex:
+    """
+    In-memory index of table FQNs with lookups by table name, optionally
+    narrowed by service, database and schema (all case-insensitive).
+
+    Storage is columnar to stay small for millions of FQNs: the FQN strings,
+    an array of schema ids, and one interned (service, database, schema)
+    triple per schema. The name index holds an int for a single table and a
+    compact array of ints otherwise. Same-named tables in different schemas
+    are all kept; resolve() reports them as ambiguous instead of picking one.
+    """
+    __slots__ = ('_fqns', '_schema_ids', '_schemas', '_schema_lookup', '_schema_tables', '_by_name',
+                 'ambiguous', 'skipped', 'duplicates')
+
+    def __init__(self):
+        self._fqns = []                 # position -> FQN
+        self._schema_ids = array('I')   # position -> schema id
+        self._schemas = []              # schema id -> (service, database, schema)
+        self._schema_lookup = {}        # lowered (service, database, schema) -> schema id
+        self._schema_tables = []        # schema id -> array of positions
+        self._by_name = {}              # table.lower() -> int | array('I')
+        self.ambiguous = {}             # table name -> candidate FQNs seen by resolve()
+        self.skipped = 0                # FQNs with fewer than four parts
+        self.duplicates = 0             # FQNs added more than once, indexed only the first time
+
+    @classmethod
+    def from_fqns(cls, fqns):
+        index = cls()
+        for fqn in fqns:
+            index.add(fqn)
+        if index.skipped:
+            logging.warning(f"Skipped {index.skipped} FQNs that are not service.database.schema.table")
+        if index.duplicates:
+            logging.info(f"Ignored {index.duplicates} repeated FQNs")
+        return index
+
+    def add(self, fqn):
+        parts = split_fqn(fqn)
+        if len(parts) < 4:
+            self.skipped += 1
+            return False
+        # Anything before database.schema.table belongs to the service name
+        service = '.'.join(parts[:-3])
+        database, schema, table = parts[-3:]
+
+        # A repeated FQN (e.g. a duplicate row in the export) would otherwise make its name ambiguous
+        key = sys.intern(table.lower())
+        existing = self._by_name.get(key)
+        if existing is not None:
+            positions = (existing,) if isinstance(existing, int) else existing
+            if any(self._fqns[position] == fqn for position in positions):
+                self.duplicates += 1
+                return False
+
+        schema_key = (service.lower(), database.lower(), schema.lower())
+        schema_id = self._schema_lookup.get(schema_key)
+        if schema_id is None:
+            schema_id = len(self._schemas)
+            self._schema_lookup[schema_key] = schema_id
+            self._schemas.append((sys.intern(service), sys.intern(database), sys.intern(schema)))
+            self._schema_tables.append(array('I'))
+
+        position = len(self._fqns)
+        self._fqns.append(fqn)
+        self._schema_ids.append(schema_id)
+        self._schema_tables[schema_id].append(position)
+
+        if existing is None:
+            self._by_name[key] = position
+        elif isinstance(existing, int):
+            self._by_name[key] = array('I', (existing, position))
+        else:
+            existing.append(position)
+        return True
+
+    def __len__(self):
+        return len(self._fqns)
+
+    def __contains__(self, table_name):
+        return table_name.lower() in self._by_name
+
+    def _to_info(self, position):
+        fqn = self._fqns[position]
+        service, database, schema = self._schemas[self._schema_ids[position]]
+        return {'service': service, 'database': database, 'schema': schema, 'table': split_fqn(fqn)[-1], 'fqn': fqn}
+
+    @staticmethod
+    def _in_scope(schema_key, service, database, schema):
+        return ((service is None or schema_key[0] == service.lower())
+                and (database is None or schema_key[1] == database.lower())
+                and (schema is None or schema_key[2] == schema.lower()))
+
+    def _schema_key(self, position):
+        service, database, schema = self._schemas[self._schema_ids[position]]
+        return service.lower(), database.lower(), schema.lower()
+
+    def find(self, table_name, service=None, database=None, schema=None):
+        """Every table called table_name, narrowed by the given service, database and schema."""
+        positions = self._by_name.get(table_name.lower())
+        if positions is None:
+            return []
+        if isinstance(positions, int):
+            positions = (positions,)
+        return [self._to_info(position) for position in positions
+                if self._in_scope(self._schema_key(position), service, database, schema)]
+
+    def resolve(self, table_name, service=None, database=None, schema=None):
+        """
+        The single table called table_name within the given scope, or None.
+        When several tables match, the candidates are recorded in
+        self.ambiguous and None is returned.
+        """
+        matches = self.find(table_name, service, database, schema)
+        if len(matches) == 1:
+            return matches[0]
+        if len(matches) > 1:
+            candidates = [match['fqn'] for match in matches]
+            if table_name not in self.ambiguous:
+                logging.warning(f"Table name '{table_name}' is ambiguous: {', '.join(candidates)}")
+            self.ambiguous[table_name] = candidates
+        return None
+
+    def get(self, table_name, default=None):
+        match = self.resolve(table_name)
+        return default if match is None else match
+
+    def tables_in(self, service=None, database=None, schema=None):
+        """Every table in the schemas matching the given service, database and schema."""
+        results = []
+        for schema_key, schema_id in self._schema_lookup.items():
+            if self._in_scope(schema_key, service, database, schema):
+                results.extend(self._to_info(position) for position in self._schema_tables[schema_id])
+        return results
+
+def build_table_index(fqns):
+    return TableIndex.from_fqns(fqns)
 
 def load_openmetadata_tables(file_path):
-    table_dict = {}
-    with open(file_path, 'r') as file:
+    if is_parquet(file_path):
+        return build_table_index(fqn for chunk in iter_chunks(file_path, columns=['fqn'])
+                                 for fqn in chunk['fqn'].dropna())
+    with open(file_path, 'r', newline='') as file:
         reader = csv.reader(file)
         next(reader)  # Skip header if present
-        for row in reader:
-            fqn = row[0]  # Assuming the FQN is in the first column
-            parts = fqn.split('.')
-            if len(parts) == 4:
-                service, database, schema, table = parts
-                table_dict[table.lower()] = {
-                    'service': service,
-                    'database': database,
-                    'schema': schema,
-                    'fqn': fqn
-                }
-    return table_dict
\ No newline at end of file
+        return build_table_index(row[0] for row in reader if row)  # Assuming the FQN is in the first column
@@ -0,0 +1,110 @@
+"""
+Global adaptive rate limiter for OpenMetadata requests.
+
+A token bucket shared by every thread of a run replaces the fixed
+time.sleep() throttles the scripts used to have. The shared session in
+omd_client takes a token before each request, so throughput is bounded by
+the configured requests/sec target instead of worst-case guesses.
+
+When OpenMetadata answers 429 or 503 the limiter pauses all callers for the
+Retry-After period and halves the current rate; each later success adds
+the rate back gradually until it reaches the target again.
+
+Usage:
+    from rate_limiter import RateLimiter
+
+    limiter = RateLimiter(rate=10)
+    limiter.acquire()          # before a request
+    limiter.backoff(30)        # on 429/503 with Retry-After: 30
+    limiter.success()          # on a successful response
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+DEFAULT_RATE = 20.0  # requests per second
+DEFAULT_BACKOFF = 5.0  # seconds to pause when a 429/503 has no Retry-After
+MIN_RATE = 0.5
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the Retry-After header as seconds; accepts delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    def __init__(self, rate: Optional[float] = DEFAULT_RATE, burst: Optional[float] = None):
+        """
+        rate is the target requests per second; None or 0 disables the token
+        bucket but still honours Retry-After pauses. burst is the bucket size
+        (default: one second's worth of requests).
+        """
+        self._lock = threading.Lock()
+        self.set_rate(rate, burst)
+        self._blocked_until = 0.0
+        self.total_wait = 0.0
+
+    def set_rate(self, rate: Optional[float], burst: Optional[float] = None):
+        with self._lock:
+            self.target_rate = float(rate) if rate else None
+            self.rate = self.target_rate
+            self.capacity = float(burst) if burst else max(1.0, self.target_rate or 1.0)
+            self._tokens = self.capacity
+            self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.rate:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Block until a request may be sent. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._blocked_until > now:
+                    delay = self._blocked_until - now
+                elif not self.rate or self._tokens >= 1:
+                    if self.rate:
+                        self._tokens -= 1
+                    self.total_wait += waited
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def backoff(self, retry_after: Optional[float] = None):
+        """Pause every caller for retry_after seconds and halve the current rate."""
+        delay = DEFAULT_BACKOFF if retry_after is None else retry_after
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            if self.rate:
+                self.rate = max(MIN_RATE, self.rate / 2)
+                self._tokens = min(self._tokens, 0.0)
+            current_rate = self.rate
+        logging.warning(f"OpenMetadata asked to slow down; pausing {delay:.1f}s, rate now {current_rate} req/s")
+
+    def success(self):
+        """Recover the rate a little after each successful request, up to the target."""
+        with self._lock:
+            if self.rate and self.rate < self.target_rate:
+                self.rate = min(self.target_rate, self.rate + max(0.1, self.target_rate * 0.02))
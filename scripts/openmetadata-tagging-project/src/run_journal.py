@@ -0,0 +1,150 @@
+"""
+Append-only checkpoint journal for long tagging runs.
+
+Each completed (table, tag) outcome and each finished application is
+written as one JSON line and flushed straight away, so a run that crashes
+or loses its JWT part way through leaves a record of what it already did.
+Started with resume, the journal reloads that record and the scripts skip
+the tables and applications it covers; failed tables are retried.
+
+A journal whose run finished is not resumed: the next run starts a new one.
+
+Usage:
+    from run_journal import RunJournal
+
+    with RunJournal("data/run_journal_main.jsonl", resume=args.resume) as journal:
+        if journal.application_done(application):
+            ...
+        if not journal.table_done(table_fqn, tag_fqn):
+            ...
+            journal.record_table(table_fqn, tag_fqn, 'applied')
+        journal.record_application(application)
+        journal.finish()
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+# Outcomes that do not need to be redone on resume; 'failed' and 'skipped' are retried
+DONE_OUTCOMES = ('applied', 'existing', 'missing')
+FSYNC_EVERY = 100
+
+
+def journal_path(data_dir: str, script_name: str) -> str:
+    return os.path.join(data_dir, f"run_journal_{script_name}.jsonl")
+
+
+def outcome_from_counters(existing: int, missing: int, applied: int, failed: int) -> str:
+    """Map the (existing, missing, applied, failed) increments of one table to a journal outcome."""
+    if failed:
+        return 'failed'
+    if applied:
+        return 'applied'
+    if missing:
+        return 'missing'
+    # The table exists but its tag does not, so nothing was done
+    return 'skipped'
+
+
+class RunJournal:
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done_tables = set()
+        self._done_applications = set()
+        self._unsynced = 0
+        self.skipped_tables = 0
+
+        if resume and os.path.exists(path):
+            finished = self._load()
+            if finished:
+                logging.info(f"Journal {path} belongs to a finished run; starting a new run")
+                self._done_tables.clear()
+                self._done_applications.clear()
+            else:
+                logging.info(f"Resuming from {path}: {len(self._done_tables)} table outcomes and "
+                             f"{len(self._done_applications)} applications already done")
+                self._file = open(path, 'a')
+                self._write({'type': 'resumed'})
+                return
+        elif resume:
+            logging.info(f"No journal at {path}; starting a new run")
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'w')
+        self._write({'type': 'started'})
+
+    def _load(self) -> bool:
+        """Read the existing journal; returns True if its run finished."""
+        finished = False
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A crash can leave a partial last line
+                    continue
+                kind = record.get('type')
+                if kind == 'table':
+                    key = (record['table'], record['tag'])
+                    if record.get('outcome') in DONE_OUTCOMES:
+                        self._done_tables.add(key)
+                    else:
+                        self._done_tables.discard(key)
+                elif kind == 'application':
+                    self._done_applications.add(record['name'])
+                elif kind == 'finished':
+                    finished = True
+                elif kind in ('started', 'resumed'):
+                    finished = False
+        return finished
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, record: dict, sync: bool = False):
+        record['ts'] = time.time()
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if sync or self._unsynced >= FSYNC_EVERY:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def table_done(self, table_fqn: str, tag_fqn: str) -> bool:
+        if (table_fqn, tag_fqn) in self._done_tables:
+            self.skipped_tables += 1
+            return True
+        return False
+
+    def application_done(self, application: str) -> bool:
+        return application in self._done_applications
+
+    def record_table(self, table_fqn: str, tag_fqn: str, outcome: str):
+        self._write({'type': 'table', 'table': table_fqn, 'tag': tag_fqn, 'outcome': outcome})
+        if outcome in DONE_OUTCOMES:
+            self._done_tables.add((table_fqn, tag_fqn))
+
+    def record_application(self, application: str):
+        self._write({'type': 'application', 'name': application}, sync=True)
+        self._done_applications.add(application)
+
+    def finish(self):
+        """Mark the run as complete so the next --resume starts fresh."""
+        self._write({'type': 'finished'}, sync=True)
+
+    def close(self):
+        if not self._file.closed:
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+
+def open_journal(data_dir: str, script_name: str, resume: bool = False) -> RunJournal:
+    return RunJournal(journal_path(data_dir, script_name), resume)
@@ -0,0 +1,111 @@
+"""
+Non-blocking, structured logging for the tagging scripts.
+
+Worker threads only put records on an in-memory queue (QueueHandler); a
+single QueueListener thread formats them and does the file and console
+I/O, so a slow disk or terminal never holds up a table's requests. The log
+file holds one JSON object per line and rotates by size instead of growing
+forever; the console keeps the familiar one-line text format.
+
+Bearer tokens and JWTs are masked in both outputs, whatever logs them.
+
+Usage:
+    from run_logging import configure_logging
+
+    configure_logging(os.path.join(LOGS_DIR, 'openmetadata_tagging_run.log'), level=logging.DEBUG)
+    logging.info("Processing application: FTA")
+    logging.debug(f"Payload: {payload}")   # per-request detail, only with level=DEBUG
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+MAX_LOG_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+TEXT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SECRET_PATTERNS = (
+    re.compile(r'(Bearer\s+)[A-Za-z0-9\-_.=]+'),
+    re.compile(r'eyJ[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+'),
+)
+
+_listener = None
+
+
+def redact(message: str) -> str:
+    for pattern in SECRET_PATTERNS:
+        message = pattern.sub(lambda match: (match.group(1) if match.groups() else '') + '***', message)
+    return message
+
+
+class RedactingFormatter(logging.Formatter):
+    def format(self, record):
+        return redact(super().format(record))
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, thread, message and exception if any."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': redact(record.getMessage()),
+        }
+        if record.exc_info:
+            entry['exception'] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(log_file: str, level: int = logging.INFO, max_bytes: int = MAX_LOG_BYTES,
+                      backup_count: int = LOG_BACKUPS, console: bool = True) -> QueueListener:
+    """
+    Route the root logger through a queue to a rotating JSON log file and,
+    optionally, the console. Replaces any handlers already configured and
+    stops the listener (flushing the queue) at exit.
+    """
+    global _listener
+    stop_logging()
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(RedactingFormatter(TEXT_FORMAT, TEXT_DATE_FORMAT))
+        handlers.append(console_handler)
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(records))
+    root.setLevel(level)
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Drain the queue and close the handlers; safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(stop_logging)
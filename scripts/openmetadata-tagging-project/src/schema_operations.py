@@ -0,0 +1,153 @@
+"""
+Several table operations over one or more schemas in a single pass.
+
+apply_user.py, remove_user.py, tagging_object.py and removing_tags.py each
+list a schema and then do one thing to every table. Here each schema is
+listed once (with tags and owners), every requested operation is decided
+against that listing, and the resulting changes go through a ChangeBuffer,
+so each table gets at most one PATCH on the shared rate-limited session
+however many operations touch it. Tables that already match an operation
+are not written.
+
+Operations are (kind, value) pairs:
+    ('apply_tag', 'Application System.A4CA')
+    ('remove_tag', 'Test Classification.Ignore this tag')
+    ('set_owner', {'id': user_id, 'type': 'user'})
+    ('remove_owner', None)
+
+Usage:
+    from schema_operations import run_operations, format_summary
+
+    summary = run_operations(base_url, headers, ["ODS.odsdev.ats_replication"],
+                             [('apply_tag', 'Application System.A4CA'), ('set_owner', {'id': uid, 'type': 'user'})])
+    print(format_summary(summary))
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from change_buffer import ChangeBuffer
+from table_iterator import iter_tables
+from tagging_engine import DEFAULT_MAX_WORKERS
+
+OPERATIONS = ('apply_tag', 'remove_tag', 'set_owner', 'remove_owner')
+LISTING_FIELDS = 'tags,owners'
+
+
+def operation_label(operation: Tuple[str, object]) -> str:
+    kind, value = operation
+    if kind in ('apply_tag', 'remove_tag'):
+        return f"{kind} {value}"
+    if kind == 'set_owner':
+        return f"{kind} {value.get('type', 'user')}:{value.get('id')}"
+    return kind
+
+
+def _owner_ids(table: Dict) -> set:
+    owners = list(table.get('owners') or [])
+    if table.get('owner'):
+        owners.append(table['owner'])
+    return {owner.get('id') for owner in owners}
+
+
+def queue_operation(buffer: ChangeBuffer, table: Dict, operation: Tuple[str, object]) -> bool:
+    """Queue the change operation makes to table; returns False when the table already matches."""
+    kind, value = operation
+    table_id = table['id']
+    tags = [tag.get('tagFQN') for tag in table.get('tags') or []]
+
+    if kind == 'apply_tag':
+        if value in tags:
+            return False
+        buffer.add_tag(table_id, value)
+    elif kind == 'remove_tag':
+        if value not in tags:
+            return False
+        buffer.remove_tag(table_id, value, tags)
+    elif kind == 'set_owner':
+        if _owner_ids(table) == {value.get('id')}:
+            return False
+        buffer.set_owner(table_id, value)
+    elif kind == 'remove_owner':
+        if not _owner_ids(table):
+            return False
+        buffer.remove_owner(table_id)
+    else:
+        raise ValueError(f"Unknown operation: {kind}")
+    return True
+
+
+def validate_operations(operations: List[Tuple[str, object]]):
+    """
+    Raise ValueError for unknown operations and for operations that contradict
+    each other on the same table, since only the later one would take effect.
+    """
+    for kind, _ in operations:
+        if kind not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {kind}")
+    kinds = {kind for kind, _ in operations}
+    if {'set_owner', 'remove_owner'} <= kinds:
+        raise ValueError("set_owner and remove_owner cannot be combined")
+    owners = {value.get('id') for kind, value in operations if kind == 'set_owner'}
+    if len(owners) > 1:
+        raise ValueError("set_owner can only be given once")
+    conflicting = ({value for kind, value in operations if kind == 'apply_tag'} &
+                   {value for kind, value in operations if kind == 'remove_tag'})
+    if conflicting:
+        raise ValueError(f"Tags both applied and removed: {', '.join(sorted(conflicting))}")
+
+
+def run_operations(base_url: str, headers: Optional[Dict], schemas: Iterable[str],
+                   operations: List[Tuple[str, object]], max_workers: int = DEFAULT_MAX_WORKERS,
+                   dry_run: bool = False) -> Dict:
+    """
+    List each schema once, apply every operation to its tables and return a
+    summary: tables and requests counts, plus operation label ->
+    {'applied', 'unchanged', 'failed'} counts.
+    """
+    validate_operations(operations)
+
+    labels = [operation_label(operation) for operation in operations]
+    results = {label: {'applied': 0, 'unchanged': 0, 'failed': 0} for label in labels}
+    summary = {'schemas': 0, 'tables': 0, 'requests': 0, 'failed_schemas': [], 'operations': results}
+    buffer = ChangeBuffer(base_url, headers)
+    queued = {}  # table id -> labels of the operations queued for it
+
+    for schema in schemas:
+        try:
+            tables = list(iter_tables(base_url, headers, database_schema=schema, fields=LISTING_FIELDS))
+        except Exception as e:
+            logging.error(f"Failed to list tables in {schema}: {str(e)}")
+            summary['failed_schemas'].append(schema)
+            continue
+        summary['schemas'] += 1
+        summary['tables'] += len(tables)
+        logging.info(f"Listed {len(tables)} tables in {schema}")
+
+        for table in tables:
+            for operation, label in zip(operations, labels):
+                if queue_operation(buffer, table, operation):
+                    queued.setdefault(table['id'], []).append(label)
+                else:
+                    results[label]['unchanged'] += 1
+
+    flushed = buffer.flush(max_workers, dry_run)
+    summary['requests'] = 0 if dry_run else len(flushed)
+    for table_id, success in flushed.items():
+        for label in queued.get(table_id, []):
+            results[label]['applied' if success else 'failed'] += 1
+    return summary
+
+
+def format_summary(summary: Dict, dry_run: bool = False) -> str:
+    verb = 'would apply' if dry_run else 'applied'
+    lines = [
+        f"{summary['tables']} table(s) in {summary['schemas']} schema(s); "
+        f"{summary['requests']} PATCH request(s) sent"
+    ]
+    for schema in summary['failed_schemas']:
+        lines.append(f"  could not list {schema}")
+    for label, counts in summary['operations'].items():
+        lines.append(f"  {label}: {verb} {counts['applied']}, unchanged {counts['unchanged']}, "
+                     f"failed {counts['failed']}")
+    return "\n".join(lines)
@@ -1,6 +1,6 @@
 """
 Applies application-specific tags to database tables in OpenMetadata using its API.
-Processes tables in batches, validates table/tag existence, and provides detailed
+Processes tables concurrently on a bounded worker pool, validates table/tag existence, and provides detailed
 logging of operations. Includes dry-run capability to preview changes.
 
 """
@@ -40,6 +40,16 @@ print(f"Project Root: {PROJECT_ROOT}")
 print(f"Config Dir: {CONFIG_DIR}")
 print(f"Logs Dir: {LOGS_DIR}")
 
+# Make the shared modules in src importable
+sys.path.append(str(PROJECT_ROOT / "src"))
+from omd_client import get_session, configure_session, close_session
+from run_logging import configure_logging
+from tagging_engine import run_concurrently, sum_counters, DEFAULT_MAX_WORKERS
+from tag_catalog import TagCatalog, DEFAULT_CLASSIFICATIONS
+from table_iterator import iter_tables
+
+session = get_session()
+
 # Ensure logs directory exists
 LOGS_DIR.mkdir(exist_ok=True)
 
@@ -58,9 +68,6 @@ APPLICATION_TAG_MAPPING = {
     # Add other mappings as needed
 }
 
-BATCH_SIZE = 100
-BATCH_DELAY = 2  # seconds
-
 def load_config():
     try:
         with open(CONFIG_FILE, 'r') as config_file:
@@ -92,27 +99,20 @@ def get_tables_for_application(base_url: str, headers: Dict, application: str) -
     
     for schema in schemas:
         schema_fqn = f"DBQ01.DBQ01.{schema}"
-        endpoint = f"{base_url}/v1/tables"
-        params = {
-            'databaseSchema': schema_fqn,
-            'fields': 'tags,name,fullyQualifiedName',
-            'limit': 1000
-        }
         
         try:
-            response = requests.get(endpoint, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json().get('data', [])
-            
-            for table in data:
+            # Walk every page of the schema, requesting only the tags field
+            count = 0
+            for table in iter_tables(base_url, headers, database_schema=schema_fqn, fields='tags'):
                 table_info = {
                     'name': table.get('name'),
                     'fqn': table.get('fullyQualifiedName'),
                     'tags': table.get('tags', [])
                 }
                 matched_tables.append((table.get('name'), table_info))
+                count += 1
             
-            logging.info(f"Found {len(data)} tables in schema {schema_fqn}")
+            logging.info(f"Found {count} tables in schema {schema_fqn}")
             
         except Exception as e:
             logging.error(f"Error fetching tables for schema {schema_fqn}: {str(e)}")
@@ -135,37 +135,36 @@ def get_tables_for_application(base_url: str, headers: Dict, application: str) -
     
     return matched_tables
 
-def check_table_exists(base_url, headers, table_fqn):
-    try:
-        encoded_fqn = requests.utils.quote(table_fqn)
-        response = requests.get(f"{base_url}/v1/tables/name/{encoded_fqn}", headers=headers)
-        return response.status_code == 200
-    except Exception as e:
-        logging.error(f"Error checking table existence: {str(e)}")
-        return False
-
-def check_tag_exists(base_url, headers, tag_fqn):
+def check_tag_exists(base_url, headers, tag_fqn, tag_catalog=None):
+    if tag_catalog is not None:
+        return tag_catalog.exists(tag_fqn)
     try:
         encoded_fqn = requests.utils.quote(tag_fqn)
-        response = requests.get(f"{base_url}/v1/tags/name/{encoded_fqn}", headers=headers)
+        response = session.get(f"{base_url}/v1/tags/name/{encoded_fqn}", headers=headers)
         return response.status_code == 200
     except Exception as e:
         logging.error(f"Error checking tag existence: {str(e)}")
         return False
 
-def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=False, max_retries=3, retry_delay=5):
+def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=False, max_retries=3, retry_delay=5, table_data=None):
+    """
+    Apply tag_fqn to the table unless it is already there.
+    Pass table_data (with tags, e.g. from the schema listing) to skip the GET;
+    the table is only re-read on a retry after a failed PATCH.
+    """
     encoded_fqn = requests.utils.quote(table_fqn)
     url = f"{base_url}/v1/tables/name/{encoded_fqn}"
     
     for attempt in range(max_retries):
         try:
-            # First, get the current table metadata
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            table_data = response.json()
+            if table_data is None:
+                # Get the current table metadata
+                response = session.get(url, headers=headers, params={'fields': 'tags'})
+                response.raise_for_status()
+                table_data = response.json()
             
             # Check if the tag is already applied
-            existing_tags = table_data.get('tags', [])
+            existing_tags = table_data.get('tags') or []
             if any(tag.get('tagFQN') == tag_fqn for tag in existing_tags):
                 logging.info(f"Tag '{tag_fqn}' is already applied to table '{table_fqn}'")
                 return True
@@ -188,13 +187,15 @@ def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=False, max_retries=
             patch_headers['Content-Type'] = 'application/json-patch+json'
 
             # Apply the PATCH operation
-            patch_response = requests.patch(url, headers=patch_headers, json=patch_operation)
+            patch_response = session.patch(url, headers=patch_headers, json=patch_operation)
             patch_response.raise_for_status()
             
             logging.info(f"Successfully applied tag '{tag_fqn}' to table '{table_fqn}'")
             return True
 
         except RequestException as e:
+            # Re-read the table on the next attempt in case the PATCH partly landed
+            table_data = None
             if attempt < max_retries - 1:
                 logging.warning(f"Attempt {attempt + 1} failed. Retrying in {retry_delay} seconds...")
                 time.sleep(retry_delay)
@@ -202,29 +203,35 @@ def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=False, max_retries=
                 logging.error(f"Failed to apply tag after {max_retries} attempts.")
                 return False
 
-def process_table_batch(base_url, headers, tables, tag_fqn, tag_exists, dry_run=False):
-    existing_tables = 0
-    missing_tables = 0
-    tag_applications = 0
-    failed_tag_applications = 0
-    already_tagged = 0
-
-    for table_name, table_info in tables:
-        if check_table_exists(base_url, headers, table_info['fqn']):
-            existing_tables += 1
-            current_tags = [tag.get('tagFQN') for tag in table_info.get('tags', [])]
-            
-            if tag_fqn in current_tags:
-                already_tagged += 1
-                logging.info(f"Table already has tag '{tag_fqn}': {table_info['fqn']}")
-            elif tag_exists:
-                if apply_tag(base_url, headers, table_info['fqn'], tag_fqn, dry_run):
-                    tag_applications += 1
-                else:
-                    failed_tag_applications += 1
-        else:
-            logging.warning(f"Table not found in OpenMetadata API: {table_info['fqn']}")
-            missing_tables += 1
+def process_table(base_url, headers, table_info, tag_fqn, tag_exists, dry_run=False):
+    """
+    Apply the tag to one table from the schema listing.
+    The listing already proves the table exists and carries its tags, so this
+    costs at most one PATCH and no reads.
+    Returns counter increments as (existing, missing, applied, failed, already_tagged).
+    """
+    current_tags = [tag.get('tagFQN') for tag in table_info.get('tags', [])]
+    if tag_fqn in current_tags:
+        logging.info(f"Table already has tag '{tag_fqn}': {table_info['fqn']}")
+        return 1, 0, 0, 0, 1
+    if tag_exists:
+        if apply_tag(base_url, headers, table_info['fqn'], tag_fqn, dry_run, table_data=table_info):
+            return 1, 0, 1, 0, 0
+        return 1, 0, 0, 1, 0
+    return 1, 0, 0, 0, 0
+
+def process_table_batch(base_url, headers, tables, tag_fqn, tag_exists, dry_run=False, max_workers=DEFAULT_MAX_WORKERS):
+    def worker(table):
+        table_name, table_info = table
+        return process_table(base_url, headers, table_info, tag_fqn, tag_exists, dry_run)
+
+    results = []
+    for table, result in run_concurrently(worker, tables, max_workers):
+        if isinstance(result, Exception):
+            result = (0, 0, 0, 1, 0)
+        results.append(result)
+
+    existing_tables, missing_tables, tag_applications, failed_tag_applications, already_tagged = sum_counters(results, 5)
 
     # Batch summary
     logging.info(f"""
@@ -239,34 +246,13 @@ def process_table_batch(base_url, headers, tables, tag_fqn, tag_exists, dry_run=
 
     return existing_tables, missing_tables, tag_applications, failed_tag_applications
 
-def setup_logging(dry_run=False):
+def setup_logging(dry_run=False, debug=False):
     """Set up logging configuration with both file and console output"""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     log_file = LOGS_DIR / f'openmetadata_tagging_consep_schema_{timestamp}.log'
-    
+    configure_logging(str(log_file), level=logging.DEBUG if debug else logging.INFO)
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-    
-    # Remove existing handlers
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
-    
-    # Create formatter
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s',
-                                datefmt='%Y-%m-%d %H:%M:%S')
-    
-    # File handler
-    file_handler = logging.FileHandler(log_file, mode='w')
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+
     run_type = "[DRY RUN] " if dry_run else ""
     logger.info(f"--- New {run_type}Run Started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ---")
 
@@ -274,11 +260,15 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description='OpenMetadata Table Tagging Script')
     parser.add_argument('--dry-run', action='store_true', 
                       help='Perform a dry run without applying any tags')
+    parser.add_argument('--max-workers', type=int,
+                      help=f'Maximum concurrent table requests (default: max_workers in config or {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--debug', action='store_true',
+                      help='Log per-request detail')
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-    setup_logging(args.dry_run)
+    setup_logging(args.dry_run, args.debug)
 
     try:
         config = load_config()
@@ -289,6 +279,9 @@ def main():
             "Authorization": f"Bearer {jwt_token}",
             "Content-Type": "application/json"
         }
+        configure_session(config, headers)
+        max_workers = args.max_workers or config.get('max_workers', DEFAULT_MAX_WORKERS)
+        tag_catalog = TagCatalog(base_url, headers, config.get('tag_classifications', DEFAULT_CLASSIFICATIONS)).load()
 
         total_applications_processed = 0
         total_tables = 0
@@ -311,7 +304,7 @@ def main():
             tables = get_tables_for_application(base_url, headers, application)
             logging.info(f"Found {len(tables)} tables with schema matching {application}")
 
-            tag_exists = check_tag_exists(base_url, headers, tag_fqn)
+            tag_exists = check_tag_exists(base_url, headers, tag_fqn, tag_catalog)
             if tag_exists:
                 existing_tags += 1
                 logging.info(f"Tag '{tag_fqn}' exists in OpenMetadata.")
@@ -321,20 +314,14 @@ def main():
 
             total_tables += len(tables)
 
-            # Process tables in batches
-            for i in range(0, len(tables), BATCH_SIZE):
-                batch = tables[i:i+BATCH_SIZE]
-                existing, missing, applied, failed = process_table_batch(
-                    base_url, headers, batch, tag_fqn, tag_exists, args.dry_run
-                )
-                total_existing_tables += existing
-                total_missing_tables += missing
-                total_tag_applications += applied
-                total_failed_tag_applications += failed
-
-                if i + BATCH_SIZE < len(tables):
-                    logging.info(f"Waiting {BATCH_DELAY} seconds before processing next batch...")
-                    time.sleep(BATCH_DELAY)
+            # Process tables concurrently
+            existing, missing, applied, failed = process_table_batch(
+                base_url, headers, tables, tag_fqn, tag_exists, args.dry_run, max_workers
+            )
+            total_existing_tables += existing
+            total_missing_tables += missing
+            total_tag_applications += applied
+            total_failed_tag_applications += failed
 
             total_applications_processed += 1
 
@@ -356,6 +343,8 @@ def main():
         logging.error(f"An error occurred in the main script: {str(e)}")
         logging.exception("Full traceback:")
         sys.exit(1)
+    finally:
+        close_session()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,13 +1,12 @@
 # Script to compare dbq01_the_schema.csv against both erstudio_fta.csv (tables and views)
 # Matches OBJECT_NAME from DBQ01 to TABLE_NAME in files
-# Outputs matching TABLE_NAME and APPLICATION pairs
-
-# Script to compare dbq01_the_schema.csv against both erstudio_fta.csv (tables and views)
-# Matches OBJECT_NAME from DBQ01 to TABLE_NAME in files
-# Outputs matching TABLE_NAME and APPLICATION pairs
+# Outputs every matching TABLE_NAME and APPLICATION pair, flagging tables claimed by several applications
 
+import argparse
 import pandas as pd
+from pandas.api.types import union_categoricals
 import os
+import sys
 
 # Get the absolute path to the script itself
 SCRIPT_PATH = os.path.abspath(__file__)
@@ -23,38 +22,88 @@ PROJECT_ROOT = os.path.dirname(SRC_DIR)
 DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 LOGS_DIR = os.path.join(PROJECT_ROOT, 'logs')
 
-def merge_fta_files():
-    # File paths
-    dbq_file = os.path.join(DATA_DIR, 'THE_schema_dump.csv')
-    erstudio_file = os.path.join(DATA_DIR, 'er_studio_fta_tables_views.csv')
-    output_file = os.path.join(DATA_DIR, 'matched_records_fta.csv')
-    
-    # Read files
-    dbq = pd.read_csv(dbq_file)
-    erstudio = pd.read_csv(erstudio_file)
-    
-    # Rename column in dbq to match erstudio's TABLE_NAME
-    dbq = dbq.rename(columns={'OBJECT_NAME': 'TABLE_NAME'})
-    
-    # Drop OBJECT_TYPE column from dbq
-    dbq = dbq.drop(columns=['OBJECT_TYPE'])
-    
-    # Drop ASSET_TYPE column from erstudio
-    erstudio = erstudio.drop(columns=['ASSET_TYPE'])
-    
-    # Merge on TABLE_NAME
-    merged_results = pd.merge(dbq, erstudio, on='TABLE_NAME', how='inner', suffixes=('_dbq', '_erstudio'))
-    
-    # Remove duplicates if any exist
-    final_results = merged_results.drop_duplicates(subset=['TABLE_NAME'])
-    
+# Make the shared modules in src importable
+sys.path.append(SRC_DIR)
+from data_files import data_file, columns_of, iter_chunks, write_table
+
+# Rows per chunk when streaming the THE dump and the ER/Studio list
+CHUNK_SIZE = 200000
+
+def _find_column(path, name):
+    """The column of path called name, ignoring case (SQLAlchemy extracts have lower-case names)."""
+    for column in columns_of(path):
+        if column.upper() == name:
+            return column
+    raise ValueError(f"{path} has no {name} column")
+
+def load_er_studio_pairs(erstudio_file, chunksize=CHUNK_SIZE):
+    """
+    Distinct (TABLE_NAME, APPLICATION) pairs of the ER/Studio list, with any
+    other columns except ASSET_TYPE. Read in chunks and held as categoricals,
+    so memory follows the number of distinct names, not the file size.
+    """
+    columns = [column for column in columns_of(erstudio_file) if column.upper() != 'ASSET_TYPE']
+    pairs = []
+    for chunk in iter_chunks(erstudio_file, columns=columns, chunksize=chunksize):
+        chunk.columns = chunk.columns.str.upper()
+        chunk = chunk.dropna(subset=['TABLE_NAME', 'APPLICATION'])
+        for column in ('TABLE_NAME', 'APPLICATION'):
+            chunk[column] = chunk[column].astype(str).astype('category')
+        pairs.append(chunk.drop_duplicates(subset=['TABLE_NAME', 'APPLICATION']))
+    if not pairs:
+        return pd.DataFrame(columns=['TABLE_NAME', 'APPLICATION'])
+    # union_categoricals keeps the concatenated key columns categorical
+    combined = pd.concat(pairs, ignore_index=True)
+    for column in ('TABLE_NAME', 'APPLICATION'):
+        combined[column] = union_categoricals([frame[column] for frame in pairs], ignore_order=True)
+    return combined.drop_duplicates(subset=['TABLE_NAME', 'APPLICATION'], ignore_index=True)
+
+def matched_object_names(dbq_file, names, chunksize=CHUNK_SIZE):
+    """Names in the THE dump that are also in names; the dump is streamed one chunk at a time."""
+    object_name = _find_column(dbq_file, 'OBJECT_NAME')
+    matched = set()
+    for chunk in iter_chunks(dbq_file, columns=[object_name], chunksize=chunksize):
+        objects = chunk[object_name].dropna().astype(str)
+        matched.update(objects[objects.isin(names)].unique())
+    return matched
+
+def merge_fta_files(data_dir=DATA_DIR, csv_export=False, chunksize=CHUNK_SIZE):
+    """
+    Match THE schema objects to ER/Studio FTA tables and write every
+    (TABLE_NAME, APPLICATION) pair of a matched table. A table claimed by
+    more than one application keeps all its pairs, with APPLICATION_COUNT
+    set and AMBIGUOUS true, rather than all but one being dropped.
+    """
+    # File paths: Parquet, or the CSV saved from a query tool
+    dbq_file = data_file(data_dir, 'THE_schema_dump')
+    erstudio_file = data_file(data_dir, 'er_studio_fta_tables_views')
+    output_file = os.path.join(data_dir, 'matched_records_fta.parquet')
+
+    # The ER/Studio side is held as categorical pairs; the THE dump is only scanned for their names
+    erstudio = load_er_studio_pairs(erstudio_file, chunksize)
+    names = erstudio['TABLE_NAME'].cat.categories if len(erstudio) else pd.Index([])
+    matched = matched_object_names(dbq_file, names, chunksize)
+
+    final_results = erstudio[erstudio['TABLE_NAME'].isin(matched)].copy()
+    final_results['APPLICATION_COUNT'] = final_results.groupby('TABLE_NAME', observed=True)['APPLICATION'] \
+                                                      .transform('size').astype('int32')
+    final_results['AMBIGUOUS'] = final_results['APPLICATION_COUNT'] > 1
+    final_results = final_results.sort_values(['TABLE_NAME', 'APPLICATION'], ignore_index=True)
+    for column in ('TABLE_NAME', 'APPLICATION'):
+        final_results[column] = final_results[column].cat.remove_unused_categories()
+
     # Save results
-    final_results.to_csv(output_file, index=False)
-    print(f"Total unique matches: {len(final_results)}")
+    write_table(final_results, output_file, categorical=['APPLICATION'], csv_export=csv_export)
+    ambiguous = final_results.loc[final_results['AMBIGUOUS'], 'TABLE_NAME'].nunique()
+    print(f"Total matches: {len(final_results)} (table, application) pairs for "
+          f"{final_results['TABLE_NAME'].nunique()} tables")
+    print(f"Tables matched to more than one application: {ambiguous}")
     print("\nSample of matched records:")
     print(final_results.head())
-    
+
     return final_results
 
 if __name__ == '__main__':
-    merge_fta_files()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Match THE schema objects to ER/Studio FTA tables')
+    parser.add_argument('--csv', action='store_true', help='Also export data/matched_records_fta.csv')
+    merge_fta_files(csv_export=parser.parse_args().csv)
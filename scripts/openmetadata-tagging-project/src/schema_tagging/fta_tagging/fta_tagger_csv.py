@@ -1,19 +1,21 @@
 '''
 To use this script try:
 
-python script.py --csv-file your_tables.csv
+python script.py --csv-file data/matched_records_fta.parquet
 
 dry run:
-python script.py --csv-file your_tables.csv --dry-run
+python script.py --csv-file data/matched_records_fta.parquet --dry-run
+
+(a .csv file works too)
 
 '''
 import os
 import json
 import logging
+import time
 import requests
 import pandas as pd
 from typing import List, Dict
-import time
 from datetime import datetime
 from requests.exceptions import RequestException
 import sys
@@ -29,6 +31,8 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(SCRIPT_DIR)))
 CONFIG_DIR = os.path.join(PROJECT_ROOT, 'config')
 DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 LOGS_DIR = os.path.join(PROJECT_ROOT, 'logs')
+# Rows per chunk when reading large CSV files
+CSV_CHUNK_SIZE = 200000
 
 # Debug logging to verify paths
 print(f"Script Path: {SCRIPT_PATH}")
@@ -38,8 +42,19 @@ print(f"Config Directory: {CONFIG_DIR}")
 print(f"Data Directory: {DATA_DIR}")
 print(f"Logs Directory: {LOGS_DIR}")
 
-# Add project root to system path for imports
+# Add project root and src to system path for imports
 sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+from omd_client import get_session, configure_session, close_session, PATCH_TEST_FAILED_STATUSES
+from data_files import columns_of, iter_chunks
+from run_logging import configure_logging
+from tagging_engine import run_concurrently, sum_counters, DEFAULT_MAX_WORKERS
+from tag_catalog import TagCatalog, DEFAULT_CLASSIFICATIONS
+from tag_planner import reconcile
+from metadata_snapshot import open_snapshot, snapshot_path
+from run_journal import open_journal, outcome_from_counters
+
+session = get_session()
 
 def load_config(config_path: str = None) -> Dict:
     """
@@ -61,15 +76,17 @@ def load_config(config_path: str = None) -> Dict:
         logging.error(f"Error loading configuration: {str(e)}")
         raise
 
-def load_tables_from_csv(csv_path: str) -> List[Dict]:
+def load_tables_from_csv(csv_path: str, chunksize: int = CSV_CHUNK_SIZE) -> List[Dict]:
     """
-    Load table information from CSV file with case-insensitive column matching.
+    Load table information from a Parquet or CSV file with case-insensitive
+    column matching. The file is read in chunks with only the two needed
+    columns, and each chunk is mapped to table rows with vectorised column
+    operations.
     """
     try:
-        df = pd.read_csv(csv_path)
-        
-        # Convert all column names to lowercase for comparison
-        df.columns = df.columns.str.lower()
+        # Read only the header (or Parquet schema) to match the columns
+        columns = columns_of(csv_path)
+        lowered = {col.lower(): col for col in columns}
         
         # Define required columns and their possible variations
         required_columns = {
@@ -80,24 +97,33 @@ def load_tables_from_csv(csv_path: str) -> List[Dict]:
         # Find matching columns for each required field
         column_mapping = {}
         for required_col, variations in required_columns.items():
-            matching_cols = [col for col in df.columns if col.lower() in variations]
+            matching_cols = [col for col in lowered if col in variations]
             if matching_cols:
-                column_mapping[required_col] = matching_cols[0]
+                column_mapping[required_col] = lowered[matching_cols[0]]
             else:
-                available_columns = ', '.join(df.columns.tolist())
+                available_columns = ', '.join(lowered)
                 raise ValueError(f"Could not find a column matching '{required_col}'. "
                                f"Available columns are: {available_columns}")
         
+        name_col = column_mapping['table_name']
+        app_col = column_mapping['application']
         tables = []
-        for _, row in df.iterrows():
+        incomplete = 0
+        for chunk in iter_chunks(csv_path, columns=[name_col, app_col], chunksize=chunksize):
+            complete = chunk[name_col].notna() & chunk[app_col].notna()
+            incomplete += int((~complete).sum())
+            chunk = chunk[complete]
+            
             # Construct FQN with 'the' schema
-            table_info = {
-                'name': row[column_mapping['table_name']],
-                'fqn': f"DBQ01.DBQ01.the.{row[column_mapping['table_name']]}",
-                'application': row[column_mapping['application']]
-            }
-            tables.append(table_info)
+            rows = pd.DataFrame({
+                'name': chunk[name_col].astype(str),
+                'fqn': 'DBQ01.DBQ01.the.' + chunk[name_col].astype(str),
+                'application': chunk[app_col].astype(str)
+            })
+            tables.extend(rows.to_dict('records'))
         
+        if incomplete:
+            logging.warning(f"Skipped {incomplete} rows without a table name or application")
         logging.info(f"Successfully mapped columns: {column_mapping}")
         return tables
         
@@ -111,42 +137,50 @@ def load_tables_from_csv(csv_path: str) -> List[Dict]:
         logging.error(f"Error loading CSV file: {str(e)}")
         raise
 
+def get_table(base_url: str, headers: Dict, table_fqn: str) -> Dict:
+    """
+    Fetch a table with its tags in a single GET. Returns None if it does not
+    exist (404); any other error is raised so the table counts as failed.
+    """
+    encoded_fqn = requests.utils.quote(table_fqn)
+    url = f"{base_url}/v1/tables/name/{encoded_fqn}?fields=tags&include=all"
+    
+    response = session.get(url, headers=headers)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    table_data = response.json()
+    logging.info(f"Found match: {table_fqn}")
+    
+    # Log existing tags - they're in the root level 'tags' array
+    existing_tags = table_data.get('tags') or []
+    tag_fqns = [tag.get('tagFQN') for tag in existing_tags]
+    logging.info(f"Current tags on table: {tag_fqns}")
+    
+    return table_data
+
 def check_table_exists(base_url: str, headers: Dict, table_fqn: str) -> tuple:
     """
     Check if table exists and return tuple of (exists, correct_fqn).
     """
-    try:
-        encoded_fqn = requests.utils.quote(table_fqn)
-        url = f"{base_url}/v1/tables/name/{encoded_fqn}?fields=tags&include=all"
-        
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            table_data = response.json()
-            logging.info(f"Found match: {table_fqn}")
-            
-            # Log existing tags - they're in the root level 'tags' array
-            existing_tags = table_data.get('tags', [])
-            tag_fqns = [tag.get('tagFQN') for tag in existing_tags]
-            logging.info(f"Current tags on table: {tag_fqns}")
-            
-            return True, table_fqn
-            
-        return False, None
-
-    except Exception as e:
-        logging.error(f"Error checking table existence: {str(e)}")
-        return False, None
+    if get_table(base_url, headers, table_fqn) is not None:
+        return True, table_fqn
+    return False, None
 
-def check_tag_exists(base_url: str, headers: Dict, tag_fqn: str) -> bool:
+def check_tag_exists(base_url: str, headers: Dict, tag_fqn: str, tag_catalog=None) -> bool:
     """
     Check if tag exists and log detailed info about the check.
+    When a prefetched TagCatalog is passed the answer comes from memory.
     """
+    if tag_catalog is not None:
+        return tag_catalog.exists(tag_fqn)
+
     try:
         encoded_fqn = requests.utils.quote(tag_fqn)
         url = f"{base_url}/v1/tags/name/{encoded_fqn}"
         logging.info(f"Checking tag existence: {tag_fqn} at URL: {url}")
         
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers)
         if response.status_code == 200:
             logging.info(f"Tag '{tag_fqn}' exists in OpenMetadata")
             return True
@@ -158,110 +192,195 @@ def check_tag_exists(base_url: str, headers: Dict, tag_fqn: str) -> bool:
         logging.error(f"Error checking tag existence: {str(e)}")
         return False
 
-def apply_tag(base_url: str, headers: Dict, table_fqn: str, tag_fqn: str, dry_run: bool = False) -> bool:
+def is_retryable(error: Exception) -> bool:
+    """
+    Connection errors, timeouts and 5xx responses may succeed on a later attempt;
+    4xx responses (bad request, forbidden, not found) will fail again.
+    """
+    if not isinstance(error, RequestException):
+        return False
+    response = getattr(error, 'response', None)
+    return response is None or response.status_code >= 500
+
+def apply_tag(base_url: str, headers: Dict, table_fqn: str, tag_fqn: str, dry_run: bool = False,
+              table_data: Dict = None, max_retries: int = 3, retry_delay: int = 5) -> bool:
     """
     Apply a tag to a table.
+    Pass table_data (with tags) when the table has already been fetched to skip the GET.
+    A failed PATCH is not resent blindly: the table is re-read first, in case
+    the tag landed before the error, and the PATCH is only repeated if it is
+    still missing.
     """
     encoded_fqn = requests.utils.quote(table_fqn)
     url = f"{base_url}/v1/tables/name/{encoded_fqn}?fields=tags&include=all"  # Added fields and include parameters
     
-    try:
-        # First, get the current table metadata
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        table_data = response.json()
-        
-        # Check if the tag is already applied
-        existing_tags = table_data.get('tags', [])
-        tag_fqns = [tag.get('tagFQN') for tag in existing_tags]
-        logging.info(f"Found existing tags on table: {tag_fqns}")
-        
-        if tag_fqn in tag_fqns:
-            if dry_run:
-                logging.info(f"DRY RUN: Table '{table_fqn}' is already tagged with '{tag_fqn}' - skipping")
-            else:
-                logging.info(f"Table '{table_fqn}' is already tagged with '{tag_fqn}' - skipping")
-            return True
+    for attempt in range(max_retries):
+        try:
+            if table_data is None:
+                # First, get the current table metadata
+                response = session.get(url, headers=headers)
+                response.raise_for_status()
+                table_data = response.json()
             
-        # Log when tag is not found
-        logging.info(f"Tag '{tag_fqn}' not found in existing tags: {tag_fqns}")
+            # Check if the tag is already applied
+            existing_tags = table_data.get('tags') or []
+            tag_fqns = [tag.get('tagFQN') for tag in existing_tags]
+            logging.info(f"Found existing tags on table: {tag_fqns}")
+            
+            if tag_fqn in tag_fqns:
+                if dry_run:
+                    logging.info(f"DRY RUN: Table '{table_fqn}' is already tagged with '{tag_fqn}' - skipping")
+                else:
+                    logging.info(f"Table '{table_fqn}' is already tagged with '{tag_fqn}' - skipping")
+                return True
+                
+            # Log when tag is not found
+            logging.info(f"Tag '{tag_fqn}' not found in existing tags: {tag_fqns}")
 
-        if dry_run:
-            logging.info(f"DRY RUN: Would apply tag '{tag_fqn}' to table '{table_fqn}'")
+            if dry_run:
+                logging.info(f"DRY RUN: Would apply tag '{tag_fqn}' to table '{table_fqn}'")
+                return True
+
+            # Prepare the patch operation
+            patch_operation = [
+                {
+                    "op": "add",
+                    "path": "/tags/-",
+                    "value": {"tagFQN": tag_fqn}
+                }
+            ]
+
+            # Set the correct Content-Type for JSON Patch
+            patch_headers = headers.copy()
+            patch_headers['Content-Type'] = 'application/json-patch+json'
+
+            # Apply the PATCH operation
+            patch_url = f"{base_url}/v1/tables/name/{encoded_fqn}"  # Remove query parameters for PATCH
+            patch_response = session.patch(patch_url, headers=patch_headers, json=patch_operation)
+            patch_response.raise_for_status()
+            
+            logging.info(f"Successfully applied tag '{tag_fqn}' to table '{table_fqn}'")
             return True
 
-        # Prepare the patch operation
-        patch_operation = [
-            {
-                "op": "add",
-                "path": "/tags/-",
-                "value": {"tagFQN": tag_fqn}
-            }
-        ]
-
-        # Set the correct Content-Type for JSON Patch
-        patch_headers = headers.copy()
-        patch_headers['Content-Type'] = 'application/json-patch+json'
-
-        # Apply the PATCH operation
-        patch_url = f"{base_url}/v1/tables/name/{encoded_fqn}"  # Remove query parameters for PATCH
-        patch_response = requests.patch(patch_url, headers=patch_headers, json=patch_operation)
+        except Exception as e:
+            # Re-read the table on the next attempt in case the PATCH landed
+            table_data = None
+            if attempt < max_retries - 1 and is_retryable(e):
+                logging.warning(f"Attempt {attempt + 1} to tag '{table_fqn}' failed: {str(e)}. "
+                                f"Retrying in {retry_delay} seconds...")
+                time.sleep(retry_delay)
+                continue
+            logging.error(f"Failed to apply tag '{tag_fqn}' to table '{table_fqn}': {str(e)}")
+            if getattr(e, 'response', None) is not None:
+                logging.error(f"Response status code: {e.response.status_code}")
+                logging.error(f"Response content: {e.response.text}")
+            return False
+
+def write_tag(base_url: str, headers: Dict, table_fqn: str, tag_fqn: str) -> tuple:
+    """
+    Write-only mode: PATCH the tag without reading the table first, guarded by a
+    JSON Patch test so it only applies to a table with no tags. A table that
+    already has tags, or a PATCH that failed with a connection or 5xx error, is
+    handed to apply_tag, which re-reads it and only patches if the tag is still
+    missing. Returns a tuple of (table_exists, success).
+    """
+    encoded_fqn = requests.utils.quote(table_fqn)
+    patch_url = f"{base_url}/v1/tables/name/{encoded_fqn}"
+    patch_headers = headers.copy()
+    patch_headers['Content-Type'] = 'application/json-patch+json'
+    patch_operation = [
+        {"op": "test", "path": "/tags", "value": []},
+        {"op": "add", "path": "/tags/-", "value": {"tagFQN": tag_fqn}}
+    ]
+
+    try:
+        patch_response = session.patch(patch_url, headers=patch_headers, json=patch_operation)
+        if patch_response.status_code == 404:
+            return False, False
+        if patch_response.status_code in PATCH_TEST_FAILED_STATUSES:
+            logging.info(f"Table '{table_fqn}' already has tags; reading it before tagging")
+            return True, apply_tag(base_url, headers, table_fqn, tag_fqn)
         patch_response.raise_for_status()
-        
         logging.info(f"Successfully applied tag '{tag_fqn}' to table '{table_fqn}'")
-        return True
-
+        return True, True
     except Exception as e:
+        if is_retryable(e):
+            logging.warning(f"Tagging '{table_fqn}' failed: {str(e)}. Retrying after re-reading the table...")
+            return True, apply_tag(base_url, headers, table_fqn, tag_fqn)
         logging.error(f"Failed to apply tag '{tag_fqn}' to table '{table_fqn}': {str(e)}")
-        if hasattr(e, 'response'):
-            logging.error(f"Response status code: {e.response.status_code}")
-            logging.error(f"Response content: {e.response.text}")
-        return False
+        return True, False
 
-def process_tables(base_url: str, headers: Dict, tables: List[Dict], dry_run: bool = False) -> tuple:
+def process_table(base_url: str, headers: Dict, table: Dict, dry_run: bool = False,
+                  write_only: bool = False, tag_catalog=None, known_tables: Dict = None) -> tuple:
     """
-    Process tables in batches and apply tags.
+    Check one table row and apply its application tag with at most one GET
+    and one PATCH, or a single PATCH in write-only mode.
+    known_tables (FQN -> table with tags, e.g. from the metadata snapshot)
+    replaces the GET when given.
+    Returns counter increments as (existing, missing, applied, failed).
     """
-    BATCH_SIZE = 100
-    BATCH_DELAY = 2  # seconds
-
-    total_tables = len(tables)
-    existing_tables = 0
-    missing_tables = 0
-    tag_applications = 0
-    failed_tag_applications = 0
-
-    for i in range(0, total_tables, BATCH_SIZE):
-        batch = tables[i:i+BATCH_SIZE]
-        
-        for table in batch:
-            table_fqn = table['fqn']
-            tag_fqn = f"Application System.{table['application']}"
-
-            exists, correct_fqn = check_table_exists(base_url, headers, table_fqn)
-            if exists:
-                existing_tables += 1
-                logging.info(f"Found table: {correct_fqn}")
-                
-                if check_tag_exists(base_url, headers, tag_fqn):
-                    if apply_tag(base_url, headers, correct_fqn, tag_fqn, dry_run):
-                        tag_applications += 1
-                    else:
-                        failed_tag_applications += 1
-                else:
-                    logging.warning(f"Tag '{tag_fqn}' does not exist in OpenMetadata")
-                    failed_tag_applications += 1
-            else:
-                logging.warning(f"Table not found in OpenMetadata: {table_fqn}")
-                missing_tables += 1
-
-        if i + BATCH_SIZE < total_tables:
-            logging.info(f"Waiting {BATCH_DELAY} seconds before processing next batch...")
-            time.sleep(BATCH_DELAY)
-
-    return existing_tables, missing_tables, tag_applications, failed_tag_applications
-
-def setup_logging(dry_run: bool = False) -> None:
+    table_fqn = table['fqn']
+    tag_fqn = f"Application System.{table['application']}"
+
+    if not check_tag_exists(base_url, headers, tag_fqn, tag_catalog):
+        logging.warning(f"Tag '{tag_fqn}' does not exist in OpenMetadata")
+        exists, _ = check_table_exists(base_url, headers, table_fqn)
+        if not exists:
+            logging.warning(f"Table not found in OpenMetadata: {table_fqn}")
+            return 0, 1, 0, 0
+        return 1, 0, 0, 1
+
+    if write_only and not dry_run:
+        exists, success = write_tag(base_url, headers, table_fqn, tag_fqn)
+        if not exists:
+            logging.warning(f"Table not found in OpenMetadata: {table_fqn}")
+            return 0, 1, 0, 0
+        return (1, 0, 1, 0) if success else (1, 0, 0, 1)
+
+    if known_tables is not None:
+        table_data = known_tables.get(table_fqn)
+    else:
+        table_data = get_table(base_url, headers, table_fqn)
+    if table_data is None:
+        logging.warning(f"Table not found in OpenMetadata: {table_fqn}")
+        return 0, 1, 0, 0
+
+    logging.info(f"Found table: {table_fqn}")
+    if apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run, table_data=table_data):
+        return 1, 0, 1, 0
+    return 1, 0, 0, 1
+
+def process_tables(base_url: str, headers: Dict, tables: List[Dict], dry_run: bool = False,
+                   max_workers: int = DEFAULT_MAX_WORKERS, write_only: bool = False,
+                   tag_catalog=None, known_tables: Dict = None, journal=None) -> tuple:
+    """
+    Process tables concurrently and apply tags.
+    Tag existence is answered by tag_catalog when given, so rows sharing a tag
+    do not each trigger a lookup. With a run journal, rows it already has are
+    skipped and each outcome is recorded.
+    """
+    def worker(table):
+        return process_table(base_url, headers, table, dry_run, write_only, tag_catalog, known_tables)
+
+    if journal is not None:
+        tables = [table for table in tables
+                  if not journal.table_done(table['fqn'], f"Application System.{table['application']}")]
+
+    results = []
+    for table, result in run_concurrently(worker, tables, max_workers):
+        if isinstance(result, Exception):
+            # Lookup errors (5xx, timeouts) are counted as failed and left out of the journal
+            logging.error(f"Error processing table {table['fqn']}: {str(result)}")
+            results.append((0, 0, 0, 1))
+            continue
+        if journal is not None:
+            journal.record_table(table['fqn'], f"Application System.{table['application']}",
+                                 outcome_from_counters(*result))
+        results.append(result)
+
+    return sum_counters(results, 4)
+
+def setup_logging(dry_run: bool = False, debug: bool = False) -> None:
     """
     Set up logging configuration to write to both file and console.
     """
@@ -269,30 +388,9 @@ def setup_logging(dry_run: bool = False) -> None:
     logs_dir = LOGS_DIR
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     log_file = os.path.join(logs_dir, f'openmetadata_tagging_fta_{timestamp}.log')
-    
+    configure_logging(str(log_file), level=logging.DEBUG if debug else logging.INFO)
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-    
-    # Remove existing handlers
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
-    
-    # Create formatter
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s',
-                                datefmt='%Y-%m-%d %H:%M:%S')
-    
-    # File handler
-    file_handler = logging.FileHandler(log_file, mode='w')
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+
     run_type = "[DRY RUN] " if dry_run else ""
     logger.info(f"--- New {run_type}Run Started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ---")
 
@@ -303,14 +401,35 @@ def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description='OpenMetadata Table Tagging Script')
     parser.add_argument('--dry-run', action='store_true', 
                       help='Perform a dry run without applying any tags')
-    parser.add_argument('--csv-file', required=True,
-                      help='Path to the CSV file containing table information')
+    parser.add_argument('--csv-file', '--data-file', dest='csv_file', required=True,
+                      help='Path to the Parquet or CSV file containing table information')
     parser.add_argument('--config', help='Path to custom config file')
+    parser.add_argument('--max-workers', type=int,
+                      help=f'Maximum concurrent table requests (default: max_workers in config or {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--debug', action='store_true',
+                      help='Log per-request detail')
+    parser.add_argument('--write-only', action='store_true',
+                      help='PATCH the tag without reading untagged tables first (one request per table); '
+                           'tables that already have tags are still read before tagging')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--plan', action='store_true',
+                      help='Compute and print the minimal tag diff without applying it')
+    mode.add_argument('--apply', action='store_true',
+                      help='Apply the minimal tag diff (loads --plan-file if it exists, otherwise plans first)')
+    parser.add_argument('--plan-file', help='Where --plan writes the plan and --apply reads it from')
+    parser.add_argument('--prune', action='store_true',
+                      help='With --plan/--apply, also remove Application System tags that are no longer desired')
+    parser.add_argument('--snapshot', action='store_true',
+                      help='Read tables and their tags from the local metadata snapshot (refreshed incrementally)')
+    parser.add_argument('--resume', action='store_true',
+                      help='Skip rows the run journal of an interrupted run already completed')
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-    setup_logging(args.dry_run)
+    setup_logging(args.dry_run, args.debug)
+    snapshot = None
+    journal = None
 
     try:
         config = load_config(args.config)
@@ -321,14 +440,47 @@ def main():
             "Authorization": f"Bearer {jwt_token}",
             "Content-Type": "application/json"
         }
+        configure_session(config, headers)
+        max_workers = args.max_workers or config.get('max_workers', DEFAULT_MAX_WORKERS)
+        tag_catalog = TagCatalog(base_url, headers, config.get('tag_classifications', DEFAULT_CLASSIFICATIONS)).load()
+
+        if args.apply and args.plan_file and os.path.exists(args.plan_file):
+            reconcile(base_url, headers, None, apply=True, plan_file=args.plan_file, max_workers=max_workers,
+                      dry_run=args.dry_run)
+            return
 
         # Load tables from CSV
         tables = load_tables_from_csv(args.csv_file)
         logging.info(f"Loaded {len(tables)} tables from CSV file")
 
+        known_tables = None
+        if args.snapshot:
+            snapshot = open_snapshot(base_url, headers, snapshot_path(config, PROJECT_ROOT))
+            known_tables = snapshot.tables_by_fqn(table['fqn'] for table in tables)
+
+        if args.plan or args.apply:
+            desired = {}
+            for table in tables:
+                tag_fqn = f"Application System.{table['application']}"
+                if check_tag_exists(base_url, headers, tag_fqn, tag_catalog):
+                    desired.setdefault(table['fqn'], set()).add(tag_fqn)
+                else:
+                    logging.warning(f"Tag '{tag_fqn}' does not exist in OpenMetadata")
+            current = None
+            if known_tables is not None:
+                current = {fqn: [tag.get('tagFQN') for tag in table['tags']] for fqn, table in known_tables.items()}
+            reconcile(base_url, headers, desired, apply=args.apply, plan_file=args.plan_file, prune=args.prune,
+                      max_workers=max_workers, dry_run=args.dry_run,
+                      classifications=config.get('tag_classifications', DEFAULT_CLASSIFICATIONS), current=current)
+            return
+
+        # Dry runs change nothing, so only tagging runs are journaled
+        if not args.dry_run:
+            journal = open_journal(DATA_DIR, 'fta', args.resume)
+
         # Process tables
         existing_tables, missing_tables, tag_applications, failed_tag_applications = process_tables(
-            base_url, headers, tables, args.dry_run
+            base_url, headers, tables, args.dry_run, max_workers, args.write_only, tag_catalog, known_tables, journal
         )
 
         run_type = "[DRY RUN] " if args.dry_run else ""
@@ -339,13 +491,22 @@ def main():
         Missing tables in OpenMetadata: {missing_tables}
         {"Would apply" if args.dry_run else "Applied"} tags successfully: {tag_applications}
         Failed tag applications: {failed_tag_applications}
+        Rows skipped from the run journal: {journal.skipped_tables if journal else 0}
         """
         logging.info(summary)
+        if journal is not None:
+            journal.finish()
 
     except Exception as e:
         logging.error(f"An error occurred in the main script: {str(e)}")
         logging.exception("Full traceback:")
         sys.exit(1)
+    finally:
+        if snapshot is not None:
+            snapshot.close()
+        if journal is not None:
+            journal.close()
+        close_session()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
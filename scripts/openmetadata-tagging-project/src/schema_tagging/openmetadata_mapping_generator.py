@@ -4,6 +4,7 @@ import logging
 from collections import defaultdict
 from datetime import datetime
 import os
+import sys
 
 # Get the absolute path to the script itself
 SCRIPT_PATH = os.path.abspath(__file__)
@@ -16,6 +17,12 @@ PROJECT_ROOT = os.path.dirname(SRC_DIR)
 # Define other directory paths
 DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 LOGS_DIR = os.path.join(PROJECT_ROOT, 'logs')
+# Rows per chunk when reading large FQN exports
+CSV_CHUNK_SIZE = 200000
+
+# Make the shared modules in src importable
+sys.path.append(SRC_DIR)
+from data_files import data_file, iter_chunks
 
 # Debug print statements
 print(f"Script Path: {SCRIPT_PATH}")
@@ -40,39 +47,51 @@ def setup_logging():
     
     logging.info(f"=== New Mapping Generation Started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
 
-def generate_mapping_from_csv(csv_path):
-    """Generate application mapping structure from CSV FQNs"""
+def generate_mapping_from_csv(csv_path, chunksize=CSV_CHUNK_SIZE):
+    """
+    Generate application mapping structure from the FQN export (Parquet or CSV).
+    The file is read in chunks and each chunk's FQNs are split with vectorised
+    string operations, so memory stays bounded by the chunk size and the
+    number of distinct schemas rather than by the number of FQNs.
+    """
     logging.info(f"Reading from: {csv_path}")
     
     if not os.path.exists(csv_path):
-        raise FileNotFoundError(f"CSV file not found at: {csv_path}")
-    
-    # Read the CSV file
-    df = pd.read_csv(csv_path)
+        raise FileNotFoundError(f"FQN file not found at: {csv_path}")
     
-    # Dictionary to store unique service/database/schema combinations
-    combinations = defaultdict(set)
+    # Per service/database/schema combination: table count and the first few FQNs
+    counts = defaultdict(int)
+    samples = defaultdict(list)
     
-    # Process each FQN
-    for _, row in df.iterrows():
-        fqn = row['fqn']
-        parts = fqn.split('.')
+    # FQNs in the export are unique, so duplicates are only dropped within a chunk
+    for chunk in iter_chunks(csv_path, columns=['fqn'], chunksize=chunksize):
+        fqns = chunk['fqn'].dropna().drop_duplicates()
+        parts = fqns.str.split('.', n=3, expand=True)
+        if parts.shape[1] < 4:
+            continue
         
-        if len(parts) >= 4:
-            service = parts[0]
-            database = parts[1]
-            schema = parts[2]
-            
-            # Create a key that combines all three elements
-            key = f"{service}.{database}.{schema}"
-            combinations[key].add(fqn)
+        # Keep FQNs with at least service.database.schema.table
+        frame = pd.DataFrame({
+            'service': parts[0],
+            'database': parts[1],
+            'schema': parts[2],
+            'fqn': fqns
+        })[parts[3].notna()]
+        
+        keys = ['service', 'database', 'schema']
+        # Register combinations in file order, as the mapping keys were before
+        for key in frame[keys].drop_duplicates().itertuples(index=False, name=None):
+            counts.setdefault(key, 0)
+        for key, count in frame.groupby(keys).size().items():
+            counts[key] += int(count)
+        first_fqns = frame.sort_values('fqn').groupby(keys).head(5)
+        for key, group in first_fqns.groupby(keys):
+            samples[key] = sorted(samples[key] + group['fqn'].tolist())[:5]
     
     # Create the mapping structure
     mapping = {}
     
-    for key, fqns in combinations.items():
-        service, database, schema = key.split('.')
-        
+    for (service, database, schema), total in counts.items():
         app_name = f"{schema.upper()} - {database}"
         
         mapping[app_name] = {
@@ -80,8 +99,8 @@ def generate_mapping_from_csv(csv_path):
             'service': service,
             'database': database,
             'schema': schema,
-            'sample_tables': list(sorted(fqns))[:5],
-            'total_tables': len(fqns)
+            'sample_tables': samples[(service, database, schema)],
+            'total_tables': total
         }
     
     return mapping
@@ -111,13 +130,13 @@ def main():
         setup_logging()
         
         # Construct paths relative to the project root
-        csv_path = os.path.join(DATA_DIR, 'openmetadata_table_fqns.csv')
+        csv_path = data_file(DATA_DIR, 'openmetadata_table_fqns')
         output_file = os.path.join(DATA_DIR, 'application_mapping.json')
         
         # Debug path information
         print(f"Project Root: {PROJECT_ROOT}")
         print(f"Data Directory: {DATA_DIR}")
-        print(f"Looking for CSV at: {csv_path}")
+        print(f"Looking for FQNs at: {csv_path}")
         
         # Generate mapping
         mapping = generate_mapping_from_csv(csv_path)
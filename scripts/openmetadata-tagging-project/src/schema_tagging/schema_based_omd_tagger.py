@@ -4,6 +4,7 @@ import logging
 import requests
 from datetime import datetime
 import sys
+import time
 import argparse
 from typing import List, Dict
 from requests.exceptions import RequestException
@@ -17,6 +18,23 @@ PROJECT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(SCRI
 # Get the config and data directories
 CONFIG_DIR = os.path.join(PROJECT_ROOT, 'config')
 DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+
+# Make the shared modules in src importable
+sys.path.append(SRC_DIR)
+from omd_client import get_session, configure_session, close_session
+from tagging_engine import run_concurrently, DEFAULT_MAX_WORKERS
+from tag_catalog import TagCatalog, DEFAULT_CLASSIFICATIONS
+from table_iterator import iter_tables
+from tag_planner import reconcile
+from metadata_snapshot import open_snapshot, snapshot_path
+from run_journal import open_journal
+from bulk_tagging import add_tag_to_assets
+from client_metrics import metrics
+from change_feed import ChangeWatermark, fetch_changed_tables, group_by_schema, watermark_path, now_ms
+from run_logging import configure_logging
+
+session = get_session()
 
 # Debug logging to verify paths
 print(f"Script Path: {SCRIPT_PATH}")
@@ -30,18 +48,9 @@ Initialize logging configuration for both file and console output.
 Creates a log file in the script directory and sets up formatters
 for consistent logging across the application.
 """
-def setup_logging():
+def setup_logging(debug=False):
     log_file = os.path.join(PROJECT_ROOT, 'logs', 'openmetadata_schema_tagging.log')
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
+    configure_logging(log_file, level=logging.DEBUG if debug else logging.INFO)
     
     logging.info(f"=== New Table Check and Tagging Run Started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
 
@@ -94,49 +103,73 @@ def load_config(config_file):
         logging.error(f"Error loading config file {config_file}")
         raise
 
+"""
+The fields of an OpenMetadata table that the tagging logic uses.
+"""
+def to_table_info(table: Dict) -> Dict:
+    return {
+        'id': table.get('id'),
+        'table_name': table.get('name'),
+        'full_fqn': table.get('fullyQualifiedName'),
+        'tags': table.get('tags', [])
+    }
+
 """
 Retrieve all tables associated with an application from OpenMetadata.
 Uses the OpenMetadata API to fetch tables based on the provided service,
-database, and schema information from the application mapping.
-Returns a list of dictionaries containing table information.
+database, and schema information from the application mapping, following
+the paging cursor so large schemas are not truncated. When a local metadata
+snapshot is given the tables are read from it instead of the API.
+Returns a list of dictionaries containing table information; listing errors
+are logged and raised.
 """
-def get_tables_for_application(base_url: str, headers: Dict, app_mapping: Dict) -> List[Dict]:
+def get_tables_for_application(base_url: str, headers: Dict, app_mapping: Dict, snapshot=None) -> List[Dict]:
     matched_tables = []
     schema_fqn = f"{app_mapping['service']}.{app_mapping['database']}.{app_mapping['schema']}"
-    endpoint = f"{base_url}/v1/tables"
-    params = {
-        'databaseSchema': schema_fqn,
-        'fields': 'tags,name,fullyQualifiedName,version',  # Explicitly request tags
-        'include': 'all',  # Include all fields
-        'limit': 1000
-    }
     
     try:
-        response = requests.get(endpoint, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json().get('data', [])
-        
-        for table in data:
-            table_info = {
-                'table_name': table.get('name'),
-                'full_fqn': table.get('fullyQualifiedName'),
-                'tags': table.get('tags', [])
-            }
-            matched_tables.append(table_info)
+        # Walk every page of the schema, requesting only the tags field
+        if snapshot is not None:
+            tables = snapshot.tables(schema_fqn)
+        else:
+            tables = iter_tables(base_url, headers, database_schema=schema_fqn, fields='tags', include='all')
+        for table in tables:
+            matched_tables.append(to_table_info(table))
         
-        logging.info(f"Found {len(data)} tables in schema {schema_fqn}")
+        logging.info(f"Found {len(matched_tables)} tables in schema {schema_fqn}")
         
     except Exception as e:
         logging.error(f"Error fetching tables for schema {schema_fqn}: {str(e)}")
+        raise
     
     return matched_tables
 
+"""
+Select the changed tables (grouped by schema FQN, see change_feed.group_by_schema)
+that belong to an application's schema, in the same shape as get_tables_for_application.
+"""
+def get_changed_tables_for_application(changed_by_schema: Dict, app_mapping: Dict) -> List[Dict]:
+    schema_fqn = f"{app_mapping['service']}.{app_mapping['database']}.{app_mapping['schema']}"
+    return [to_table_info(table) for table in changed_by_schema.get(schema_fqn, [])]
+
+"""
+Move the --incremental watermark to the start of this run, but only when
+every changed table was handled: no failed tables, no failed schema
+listings and no missing tag for an application with changed tables.
+Otherwise the next run sees the same changes.
+"""
+def advance_watermark(watermark, run_started: int, overall_stats: Dict, failed_tables: int):
+    if failed_tables or overall_stats['listing_failures'] or overall_stats['missing_tags']:
+        logging.warning("Change watermark not advanced: some tables or schema listings failed, or tags are missing")
+        return
+    watermark.advance(run_started)
+
 """
 Check tag status
 """
 def check_tag_status(base_url, headers, table_fqn, tag_fqn):
     encoded_fqn = requests.utils.quote(table_fqn)
-    response = requests.get(f"{base_url}/v1/tables/name/{encoded_fqn}", headers=headers)
+    response = session.get(f"{base_url}/v1/tables/name/{encoded_fqn}", headers=headers)
     
     if response.status_code == 200:
         table_data = response.json()
@@ -149,12 +182,22 @@ def check_tag_status(base_url, headers, table_fqn, tag_fqn):
 """
 Check if a tag exists in OpenMetadata.
 Verifies that the tag is properly configured before attempting to use it.
+When a prefetched TagCatalog is passed the answer comes from memory.
 Returns boolean indicating if tag exists.
 """
-def check_tag_exists(base_url: str, headers: Dict, tag_fqn: str, dry_run: bool = True) -> bool:
+def check_tag_exists(base_url: str, headers: Dict, tag_fqn: str, dry_run: bool = True, tag_catalog=None) -> bool:
+    if tag_catalog is not None:
+        exists = tag_catalog.exists(tag_fqn)
+        prefix = "DRY RUN: " if dry_run else ""
+        if exists:
+            logging.info(f"{prefix}Tag '{tag_fqn}' exists in OpenMetadata")
+        else:
+            logging.error(f"{prefix}Tag '{tag_fqn}' does not exist in OpenMetadata")
+        return exists
+
     try:
         encoded_fqn = requests.utils.quote(tag_fqn)
-        response = requests.get(f"{base_url}/v1/tags/name/{encoded_fqn}", headers=headers)
+        response = session.get(f"{base_url}/v1/tags/name/{encoded_fqn}", headers=headers)
         
         if response.status_code == 200:
             if dry_run:
@@ -188,20 +231,22 @@ Handles both dry-run and actual tag application, including checking
 current tags and updating them via the OpenMetadata API.
 Returns boolean indicating success of operation.
 """
-def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=True):
+def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=True, table_data=None):
     """
     Apply a tag to a specific table in OpenMetadata using PATCH method.
+    Pass table_data (with tags) when the table is already in hand to skip the GET.
     """
     try:
-        # First check if tag already exists on table
         encoded_fqn = requests.utils.quote(table_fqn)
         url = f"{base_url}/v1/tables/name/{encoded_fqn}"
         
-        # Check current table tags
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            table_data = response.json()
-            existing_tags = table_data.get('tags', [])
+        # First check if tag already exists on table
+        if table_data is None:
+            response = session.get(url, headers=headers, params={'fields': 'tags'})
+            if response.status_code == 200:
+                table_data = response.json()
+        if table_data is not None:
+            existing_tags = table_data.get('tags') or []
             if any(tag.get('tagFQN') == tag_fqn for tag in existing_tags):
                 if dry_run:
                     logging.info(f"DRY RUN: Tag {tag_fqn} already exists on table {table_fqn}, skipping")
@@ -224,7 +269,7 @@ def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=True):
         patch_headers = headers.copy()
         patch_headers['Content-Type'] = 'application/json-patch+json'
 
-        patch_response = requests.patch(url, headers=patch_headers, json=patch_operation)
+        patch_response = session.patch(url, headers=patch_headers, json=patch_operation)
         
         if patch_response.status_code == 200:
             logging.info(f"Successfully tagged table {table_fqn} with {tag_fqn}")
@@ -239,15 +284,42 @@ def apply_tag(base_url, headers, table_fqn, tag_fqn, dry_run=True):
         logging.error(f"Error applying tag to {table_fqn}: {str(e)}")
         return False
 
+"""
+Check a single table and apply the tag if it is missing.
+Costs at most one PATCH: the tags come from the schema listing.
+Returns the name of the statistic to increment: 'already_tagged',
+'newly_tagged' or 'failed_tagging'.
+"""
+def process_table(table, base_url, headers, tag_fqn, dry_run=True):
+    # The schema listing already carries the table's tags, so no extra read is needed
+    if any(tag.get('tagFQN') == tag_fqn for tag in table.get('tags') or []):
+        logging.info(f"{'DRY RUN: ' if dry_run else ''}Table {table['full_fqn']} already has tag {tag_fqn}, skipping")
+        return 'already_tagged'
+    
+    try:
+        # Only attempt to apply tag if it's not already present
+        if apply_tag(base_url, headers, table['full_fqn'], tag_fqn, dry_run, table_data=table):
+            return 'newly_tagged'
+        return 'failed_tagging'
+            
+    except Exception as e:
+        logging.error(f"Error processing table {table['full_fqn']}: {str(e)}")
+        return 'failed_tagging'
+
 """
 Process a list of tables and apply tags as needed.
+Tables are handled concurrently with at most max_workers requests in flight.
+With bulk, the untagged tables get the tag through the bulk tag-to-assets
+endpoint, a few hundred tables per request.
 Tracks statistics about the tagging process including counts of
 already tagged tables, newly tagged tables, and failed operations.
 Returns a dictionary of statistics about the operation.
 """
-def process_tables(openmetadata_tables, base_url, headers, tag_fqn, dry_run=True):
+def process_tables(openmetadata_tables, base_url, headers, tag_fqn, dry_run=True, max_workers=DEFAULT_MAX_WORKERS,
+                   journal=None, bulk=False):
     """
     Process a list of tables and apply tags as needed, skipping already tagged tables.
+    With a run journal, tables it already has are skipped and each outcome is recorded.
     """
     stats = {
         'total_tables': len(openmetadata_tables),
@@ -256,44 +328,56 @@ def process_tables(openmetadata_tables, base_url, headers, tag_fqn, dry_run=True
         'failed_tagging': 0
     }
     
+    def worker(table):
+        return process_table(table, base_url, headers, tag_fqn, dry_run)
+
+    if journal is not None:
+        openmetadata_tables = [table for table in openmetadata_tables
+                               if not journal.table_done(table['full_fqn'], tag_fqn)]
+
+    if bulk and not dry_run:
+        return process_tables_bulk(openmetadata_tables, base_url, headers, tag_fqn, stats, max_workers, journal)
+
+    for table, outcome in run_concurrently(worker, openmetadata_tables, max_workers):
+        if isinstance(outcome, Exception):
+            outcome = 'failed_tagging'
+        if journal is not None:
+            journal.record_table(table['full_fqn'], tag_fqn, JOURNAL_OUTCOMES[outcome])
+        stats[outcome] += 1
+    
+    return stats
+
+"""
+Tag the untagged tables of one application in bulk requests, falling back
+to per-table PATCHes where the server cannot, and fill in stats per table.
+"""
+def process_tables_bulk(openmetadata_tables, base_url, headers, tag_fqn, stats, max_workers=DEFAULT_MAX_WORKERS,
+                        journal=None):
+    untagged = {}
     for table in openmetadata_tables:
-        # First check if table already has the tag from the initial data
-        if any(tag.get('tagFQN') == tag_fqn for tag in table.get('tags', [])):
+        if any(tag.get('tagFQN') == tag_fqn for tag in table.get('tags') or []):
             stats['already_tagged'] += 1
-            logging.info(f"{'DRY RUN: ' if dry_run else ''}Table {table['full_fqn']} already has tag {tag_fqn}, skipping")
-            continue
-            
-        # Get fresh data for the table to ensure we have latest tags
-        encoded_fqn = requests.utils.quote(table['full_fqn'])
-        url = f"{base_url}/v1/tables/name/{encoded_fqn}?fields=tags&include=all"
-        
-        try:
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                table_data = response.json()
-                current_tags = table_data.get('tags', [])
-                
-                # Double check if table has the tag
-                if any(tag.get('tagFQN') == tag_fqn for tag in current_tags):
-                    stats['already_tagged'] += 1
-                    logging.info(f"{'DRY RUN: ' if dry_run else ''}Table {table['full_fqn']} already has tag {tag_fqn}, skipping")
-                    continue
-                
-                # Only attempt to apply tag if it's not already present
-                if apply_tag(base_url, headers, table['full_fqn'], tag_fqn, dry_run):
-                    stats['newly_tagged'] += 1
-                else:
-                    stats['failed_tagging'] += 1
-            else:
-                logging.error(f"Failed to get table data for {table['full_fqn']}")
-                stats['failed_tagging'] += 1
-                
-        except Exception as e:
-            logging.error(f"Error processing table {table['full_fqn']}: {str(e)}")
-            stats['failed_tagging'] += 1
+            if journal is not None:
+                journal.record_table(table['full_fqn'], tag_fqn, JOURNAL_OUTCOMES['already_tagged'])
+        else:
+            untagged[table['full_fqn']] = table.get('id')
+
+    results = add_tag_to_assets(base_url, headers, tag_fqn, untagged, max_workers) if untagged else {}
+    for table_fqn, result in results.items():
+        outcome = 'newly_tagged' if result['status'] == 'applied' else 'failed_tagging'
+        if journal is not None:
+            journal.record_table(table_fqn, tag_fqn, JOURNAL_OUTCOMES[outcome])
+        stats[outcome] += 1
     
     return stats
 
+# Run journal outcome for each process_table result
+JOURNAL_OUTCOMES = {
+    'already_tagged': 'existing',
+    'newly_tagged': 'applied',
+    'failed_tagging': 'failed'
+}
+
 """
 Log the results of the tagging operation for a specific application.
 Provides a summary of the operation including total tables processed,
@@ -315,8 +399,12 @@ Handles argument parsing, configuration loading, and iterating through
 applications to process their tables and apply tags as needed.
 """
 def main():
-    # Setup logging first
-    setup_logging()
+    # Setup logging first; --debug is read ahead of the full parser, whose choices need the logged mapping load
+    debug_parser = argparse.ArgumentParser(add_help=False)
+    debug_parser.add_argument('--debug', action='store_true')
+    setup_logging(debug_parser.parse_known_args()[0].debug)
+    snapshot = None
+    journal = None
     
     try:
         # Load application mapping and initialize applications list
@@ -326,6 +414,23 @@ def main():
         parser = argparse.ArgumentParser(description='Check and tag tables in OpenMetadata.')
         parser.add_argument('--dry-run', action='store_true', help='Perform a dry run without applying tags')
         parser.add_argument('--application', choices=APPLICATIONS, help='Specific application to process')
+        parser.add_argument('--max-workers', type=int, help=f'Maximum concurrent table requests (default: max_workers in config or {DEFAULT_MAX_WORKERS})')
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument('--plan', action='store_true', help='Compute and print the minimal tag diff without applying it')
+        mode.add_argument('--apply', action='store_true',
+                          help='Apply the minimal tag diff (loads --plan-file if it exists, otherwise plans first)')
+        parser.add_argument('--plan-file', help='Where --plan writes the plan and --apply reads it from')
+        parser.add_argument('--prune', action='store_true',
+                            help='With --plan/--apply, also remove Application System tags that are no longer desired')
+        parser.add_argument('--snapshot', action='store_true',
+                            help='Read schema listings from the local metadata snapshot (refreshed incrementally)')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip applications and tables the run journal of an interrupted run already completed')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Tag each application with bulk tag-to-assets requests instead of one PATCH per table')
+        parser.add_argument('--incremental', action='store_true',
+                            help='Only process tables created or updated since the last successful incremental run')
+        parser.add_argument('--debug', action='store_true', help='Log per-request detail')
         args = parser.parse_args()
         
         # Load configuration
@@ -335,6 +440,45 @@ def main():
             "Authorization": f"Bearer {config['jwt_token']}",
             "Content-Type": "application/json"
         }
+        configure_session(config, headers)
+        max_workers = args.max_workers or config.get('max_workers', DEFAULT_MAX_WORKERS)
+        tag_catalog = TagCatalog(base_url, headers, config.get('tag_classifications', DEFAULT_CLASSIFICATIONS)).load()
+        
+        if args.apply and args.plan_file and os.path.exists(args.plan_file):
+            reconcile(base_url, headers, None, apply=True, plan_file=args.plan_file, max_workers=max_workers,
+                      dry_run=args.dry_run)
+            return
+        
+        if args.snapshot:
+            snapshot = open_snapshot(base_url, headers, snapshot_path(config, PROJECT_ROOT))
+        
+        # In --plan/--apply mode the schema listings provide both states
+        reconcile_mode = args.plan or args.apply
+        desired, current = {}, {}
+        
+        # Plans are already minimal and dry runs change nothing, so only tagging runs are journaled
+        if not (reconcile_mode or args.dry_run):
+            journal = open_journal(DATA_DIR, 'schema_based', args.resume)
+        
+        # In --incremental mode only the tables in the change events since the watermark are processed;
+        # without a watermark yet, this run sweeps every schema and sets one
+        watermark = None
+        changed_by_schema = None
+        if args.incremental:
+            if args.application:
+                parser.error("--incremental covers every mapped application; it cannot be combined with --application")
+            if args.resume:
+                # Applications the journal skips would still be covered by the new watermark and their
+                # later changes lost; an interrupted incremental run is redone from the old watermark instead
+                parser.error("--incremental reruns from the last watermark after an interruption; "
+                             "it cannot be combined with --resume")
+            watermark = ChangeWatermark(watermark_path(DATA_DIR, 'schema_based'))
+            run_started = now_ms()
+            if watermark.timestamp is None:
+                logging.info("No change watermark yet; processing every mapped schema once")
+            else:
+                changed_by_schema = group_by_schema(
+                    fetch_changed_tables(base_url, headers, watermark.timestamp, fields='tags', max_workers=max_workers))
         
         # Determine which applications to process
         applications_to_process = [args.application] if args.application else APPLICATIONS
@@ -346,11 +490,16 @@ def main():
             'missing_tags': [],
             'total_tables_processed': 0,
             'total_tables_tagged': 0,
-            'total_tables_skipped': 0
+            'total_tables_skipped': 0,
+            'listing_failures': 0
         }
         
         for application in applications_to_process:
+            if journal is not None and journal.application_done(application):
+                logging.info(f"Skipping application {application}: already completed according to the run journal")
+                continue
             logging.info(f"\nProcessing application: {application}")
+            application_started = time.monotonic()
             
             app_mapping = APPLICATION_NAME_MAPPING.get(application)
             if not app_mapping:
@@ -358,9 +507,18 @@ def main():
                 overall_stats['skipped_apps'] += 1
                 continue
             
+            # In --incremental mode only the changed tables are tagged; an application
+            # without any is skipped before its tag is checked, so a tag that is still
+            # missing only holds back the watermark when there is something to tag
+            if changed_by_schema is not None:
+                openmetadata_tables = get_changed_tables_for_application(changed_by_schema, app_mapping)
+                if not openmetadata_tables:
+                    logging.info(f"No changed tables for application {application}")
+                    continue
+            
             # Check if tag exists before processing tables
             tag_fqn = f"Application System.{app_mapping['tag_name']}"
-            if not check_tag_exists(base_url, headers, tag_fqn):
+            if not check_tag_exists(base_url, headers, tag_fqn, args.dry_run, tag_catalog):
                 logging.error(f"Skipping application '{application}' due to missing tag: {tag_fqn}")
                 overall_stats['skipped_apps'] += 1
                 overall_stats['missing_tags'].append({
@@ -369,21 +527,38 @@ def main():
                 })
                 continue
             
-            # Get tables from OpenMetadata API
-            openmetadata_tables = get_tables_for_application(base_url, headers, app_mapping)
+            # Get tables from OpenMetadata API unless --incremental already selected the changed ones
+            if changed_by_schema is None:
+                try:
+                    openmetadata_tables = get_tables_for_application(base_url, headers, app_mapping, snapshot)
+                except Exception:
+                    overall_stats['skipped_apps'] += 1
+                    overall_stats['listing_failures'] += 1
+                    continue
             
             if not openmetadata_tables:
                 logging.warning(f"No tables found for application {application}")
                 overall_stats['skipped_apps'] += 1
                 continue
             
+            if reconcile_mode:
+                for table in openmetadata_tables:
+                    # A table mapped to several applications keeps every application's tag
+                    desired.setdefault(table['full_fqn'], set()).add(tag_fqn)
+                    current[table['full_fqn']] = [tag.get('tagFQN') for tag in table.get('tags') or []]
+                overall_stats['processed_apps'] += 1
+                continue
+            
             # Process and tag tables
             stats = process_tables(
                 openmetadata_tables,
                 base_url,
                 headers,
                 tag_fqn,
-                args.dry_run
+                args.dry_run,
+                max_workers,
+                journal,
+                args.bulk
             )
             
             # Update overall statistics
@@ -393,7 +568,22 @@ def main():
             overall_stats['total_tables_skipped'] += stats['failed_tagging']
             
             # Log results for this application
+            metrics.record_tables(application, stats['total_tables'], time.monotonic() - application_started)
             log_tagging_results(stats, application, args.dry_run)
+            # An application with failed tables is not marked done, so --resume retries them
+            if journal is not None and not stats['failed_tagging']:
+                journal.record_application(application)
+        
+        if reconcile_mode:
+            plan = reconcile(base_url, headers, desired, apply=args.apply, plan_file=args.plan_file, prune=args.prune,
+                             max_workers=max_workers, dry_run=args.dry_run,
+                             classifications=config.get('tag_classifications', DEFAULT_CLASSIFICATIONS), current=current)
+            if watermark is not None and args.apply and not args.dry_run:
+                advance_watermark(watermark, run_started, overall_stats, plan.failed)
+            return
+        
+        if watermark is not None and not args.dry_run:
+            advance_watermark(watermark, run_started, overall_stats, overall_stats['total_tables_skipped'])
         
         # Log overall summary
         logging.info("\n" + "="*50)
@@ -408,11 +598,22 @@ def main():
         logging.info(f"\nTotal Tables Processed: {overall_stats['total_tables_processed']}")
         logging.info(f"Total Tables Tagged: {overall_stats['total_tables_tagged']}")
         logging.info(f"Total Tables Skipped: {overall_stats['total_tables_skipped']}")
+        if overall_stats['listing_failures']:
+            logging.info(f"Schema Listings Failed: {overall_stats['listing_failures']}")
+        if journal is not None:
+            logging.info(f"Tables Skipped From Run Journal: {journal.skipped_tables}")
+            journal.finish()
         logging.info("="*50 + "\n")
         
     except Exception as e:
         logging.error(f"Error occurred: {str(e)}", exc_info=True)
         sys.exit(1)
+    finally:
+        if snapshot is not None:
+            snapshot.close()
+        if journal is not None:
+            journal.close()
+        close_session()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
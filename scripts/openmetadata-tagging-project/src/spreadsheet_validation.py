@@ -0,0 +1,110 @@
+"""
+Validation of data-classification spreadsheets against the catalogue.
+
+The spreadsheet lists one row per (Table, Column). Instead of re-filtering
+the spreadsheet once per table, the catalogue is loaded once as a
+two-column (Table, Column) frame covering every page of the schema's
+tables, and each spreadsheet row is looked up in it with a single
+vectorised membership test. The result is the rows that can be applied
+plus a report of the tables and columns the catalogue does not have.
+
+By default a table with any missing column is left out entirely, so a
+spreadsheet that is out of date for a table is not half applied.
+
+Usage:
+    from spreadsheet_validation import catalogue_columns, validate_spreadsheet, format_report
+
+    catalogue = catalogue_columns(base_url, headers, "geobc+test+database.GEOTST.ats")
+    kept, report = validate_spreadsheet(pd.read_excel(path), catalogue)
+    print(format_report(report))
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from table_iterator import iter_tables
+
+TABLE_COLUMN = 'Table'
+COLUMN_COLUMN = 'Column'
+
+
+def catalogue_columns(base_url: str, headers: Optional[Dict], database_schema: str,
+                      include: str = 'non-deleted') -> pd.DataFrame:
+    """Every (Table, Column) of the schema, lower-cased, from all pages of /v1/tables."""
+    tables = []
+    columns = []
+    table_count = 0
+    for table in iter_tables(base_url, headers, database_schema=database_schema, fields='columns',
+                             include=include):
+        table_count += 1
+        table_name = table['name'].lower()
+        # A table without columns still exists, so its spreadsheet rows are reported as missing columns
+        tables.append(table_name)
+        columns.append(None)
+        for column in table.get('columns') or []:
+            tables.append(table_name)
+            columns.append(column['name'].lower())
+    logging.info(f"Catalogue lists {table_count} tables in {database_schema}")
+    return pd.DataFrame({TABLE_COLUMN: tables, COLUMN_COLUMN: columns})
+
+
+def validate_spreadsheet(df: pd.DataFrame, catalogue: pd.DataFrame,
+                         drop_incomplete_tables: bool = True) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Split the spreadsheet into the rows that exist in the catalogue and a
+    report of what does not. Table and column names are compared
+    case-insensitively; the kept rows carry the lower-cased names.
+
+    The report holds the row counts, the sorted missing tables, and
+    missing_columns as {table: [column, ...]}. Rows without a table or
+    column name are counted as incomplete_rows.
+    """
+    df = df.copy()
+    df[TABLE_COLUMN] = df[TABLE_COLUMN].astype('string').str.strip().str.lower()
+    df[COLUMN_COLUMN] = df[COLUMN_COLUMN].astype('string').str.strip().str.lower()
+
+    known = catalogue.dropna(subset=[COLUMN_COLUMN])
+    known_pairs = pd.MultiIndex.from_frame(known[[TABLE_COLUMN, COLUMN_COLUMN]])
+    complete = df[TABLE_COLUMN].notna() & df[COLUMN_COLUMN].notna()
+
+    table_found = complete & df[TABLE_COLUMN].isin(catalogue[TABLE_COLUMN].unique())
+    column_found = table_found & pd.MultiIndex.from_frame(df[[TABLE_COLUMN, COLUMN_COLUMN]]).isin(known_pairs)
+    column_missing = table_found & ~column_found
+
+    missing = df.loc[column_missing, [TABLE_COLUMN, COLUMN_COLUMN]].drop_duplicates()
+    missing_columns = {
+        table_name: sorted(group[COLUMN_COLUMN])
+        for table_name, group in missing.groupby(TABLE_COLUMN, sort=True)
+    }
+
+    keep = column_found
+    if drop_incomplete_tables and missing_columns:
+        keep &= ~df[TABLE_COLUMN].isin(list(missing_columns))
+
+    report = {
+        'rows': len(df),
+        'kept_rows': int(keep.sum()),
+        'incomplete_rows': int((~complete).sum()),
+        'missing_tables': sorted(df.loc[complete & ~table_found, TABLE_COLUMN].unique()),
+        'missing_columns': missing_columns,
+        'dropped_tables': sorted(missing_columns) if drop_incomplete_tables else [],
+    }
+    return df[keep], report
+
+
+def format_report(report: Dict, limit: int = 20) -> str:
+    lines = [
+        f"Spreadsheet validation: kept {report['kept_rows']} of {report['rows']} rows; "
+        f"{len(report['missing_tables'])} table(s) not in the catalogue, "
+        f"{len(report['missing_columns'])} table(s) with missing columns, "
+        f"{report['incomplete_rows']} row(s) without a table or column."
+    ]
+    for table_name in report['missing_tables'][:limit]:
+        lines.append(f"  missing table: {table_name}")
+    for table_name in list(report['missing_columns'])[:limit]:
+        lines.append(f"  table '{table_name}' is missing columns: {', '.join(report['missing_columns'][table_name])}")
+    if report['dropped_tables']:
+        lines.append(f"  {len(report['dropped_tables'])} table(s) with missing columns were left out entirely")
+    return "\n".join(lines)
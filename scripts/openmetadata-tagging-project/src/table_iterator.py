@@ -0,0 +1,142 @@
+"""
+Streaming, complete iterator over OpenMetadata tables.
+
+Walks GET /v1/tables page by page with the paging.after cursor, so a schema
+with more tables than one page is never silently truncated, and yields the
+tables lazily so callers do not hold every page in memory. Only the
+optional fields the caller asks for (e.g. 'tags' or 'owners') are
+requested, keeping payloads small.
+
+The page size adapts to the observed response time: it grows while pages
+come back faster than target_latency and shrinks when they are slower.
+
+For whole-catalogue exports, iter_table_partitions lists the database
+schemas first and pages through each schema's tables on its own worker, so
+the export scales with the worker count instead of walking one global
+cursor.
+
+Usage:
+    from table_iterator import iter_tables, iter_table_partitions
+
+    for table in iter_tables(base_url, headers, database_schema="DBQ01.DBQ01.consep", fields="tags"):
+        print(table['fullyQualifiedName'], table.get('tags'))
+
+    for schema_fqn, tables in iter_table_partitions(base_url, headers, max_workers=8):
+        ...
+"""
+
+import logging
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from omd_client import get_session
+from tagging_engine import run_concurrently, DEFAULT_MAX_WORKERS
+
+DEFAULT_PAGE_SIZE = 200
+MIN_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+TARGET_LATENCY = 2.0  # seconds per page
+
+
+class AdaptivePageSize:
+    """Grows or shrinks the page size to keep each page near target_latency."""
+
+    def __init__(self, initial: int = DEFAULT_PAGE_SIZE, minimum: int = MIN_PAGE_SIZE,
+                 maximum: int = MAX_PAGE_SIZE, target_latency: float = TARGET_LATENCY):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.size = max(minimum, min(maximum, initial))
+
+    def update(self, elapsed: float) -> int:
+        if elapsed > self.target_latency:
+            self.size = max(self.minimum, self.size // 2)
+        elif elapsed < self.target_latency / 2:
+            self.size = min(self.maximum, self.size * 2)
+        return self.size
+
+
+def iter_entities(base_url: str, endpoint: str, headers: Optional[Dict] = None, params: Optional[Dict] = None,
+                  page_size: Optional[AdaptivePageSize] = None) -> Iterator[Dict]:
+    """
+    Yield every entity of a paged list endpoint such as 'tables' or
+    'databaseSchemas'. Raises requests.HTTPError if a page cannot be
+    fetched, rather than returning a partial listing.
+    """
+    session = get_session()
+    page_size = page_size or AdaptivePageSize()
+    query = dict(params or {})
+
+    pages = 0
+    total = 0
+    after = None
+    while True:
+        query['limit'] = page_size.size
+        if after:
+            query['after'] = after
+
+        start = time.monotonic()
+        response = session.get(f"{base_url}/v1/{endpoint}", headers=headers, params=query)
+        response.raise_for_status()
+        data = response.json()
+        page_size.update(time.monotonic() - start)
+
+        entities = data.get('data', [])
+        pages += 1
+        total += len(entities)
+        yield from entities
+
+        after = data.get('paging', {}).get('after')
+        if not after:
+            break
+
+    logging.debug(f"Listed {total} {endpoint} in {pages} pages" + (f" with {params}" if params else ""))
+
+
+def iter_tables(base_url: str, headers: Optional[Dict] = None, database_schema: Optional[str] = None,
+                fields: Optional[str] = None, include: Optional[str] = None,
+                page_size: Optional[AdaptivePageSize] = None, params: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    Yield every table (optionally within one database schema) across all pages.
+
+    fields is the comma-separated list of optional fields to return, e.g.
+    'tags' or 'tags,owners'; leave it empty when only id, name and FQN are
+    needed. Raises requests.HTTPError if a page cannot be fetched, rather
+    than returning a partial listing.
+    """
+    query = dict(params or {})
+    if database_schema:
+        query['databaseSchema'] = database_schema
+    if fields:
+        query['fields'] = fields
+    if include:
+        query['include'] = include
+    return iter_entities(base_url, 'tables', headers, query, page_size)
+
+
+def iter_database_schemas(base_url: str, headers: Optional[Dict] = None, database: Optional[str] = None,
+                          page_size: Optional[AdaptivePageSize] = None) -> Iterator[Dict]:
+    """Yield every database schema, optionally within one database FQN."""
+    params = {'database': database} if database else {}
+    return iter_entities(base_url, 'databaseSchemas', headers, params, page_size)
+
+
+def iter_table_partitions(base_url: str, headers: Optional[Dict] = None, fields: Optional[str] = None,
+                          max_workers: int = DEFAULT_MAX_WORKERS) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    List the database schemas, then fetch each schema's tables concurrently.
+
+    Yields (schema FQN, tables) as partitions complete, so the order varies
+    between runs; sort by schema FQN for a deterministic result. Raises the
+    first partition error rather than yielding a partial catalogue.
+    """
+    schemas = sorted(schema['fullyQualifiedName'] for schema in iter_database_schemas(base_url, headers))
+    logging.info(f"Listing tables of {len(schemas)} database schemas with up to {max_workers} workers")
+
+    def list_partition(schema_fqn):
+        return list(iter_tables(base_url, headers, database_schema=schema_fqn, fields=fields))
+
+    for schema_fqn, tables in run_concurrently(list_partition, schemas, max_workers, progress_every=100):
+        if isinstance(tables, Exception):
+            raise tables
+        yield schema_fqn, tables
@@ -0,0 +1,126 @@
+"""
+In-memory catalog of OpenMetadata tags.
+
+Loads every tag of the targeted classifications (by default
+'Application System') with a few paginated GET /v1/tags calls at startup,
+then answers "does this tag exist?" from memory instead of one
+GET /v1/tags/name/{fqn} per table or per application.
+
+A lookup that misses refreshes the tag's classification (at most once per
+refresh_interval seconds) so tags created during a run are still found.
+
+Usage:
+    from tag_catalog import TagCatalog
+
+    tag_catalog = TagCatalog(base_url, headers)
+    tag_catalog.load()
+    if tag_catalog.exists("Application System.FTA"):
+        ...
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import requests
+
+from omd_client import get_session
+
+DEFAULT_CLASSIFICATIONS = ('Application System',)
+PAGE_SIZE = 1000  # maximum page size accepted by /v1/tags
+REFRESH_INTERVAL = 60  # seconds between refreshes of the same classification
+
+
+class TagCatalog:
+    def __init__(self, base_url: str, headers: Optional[Dict] = None,
+                 classifications: Iterable[str] = DEFAULT_CLASSIFICATIONS,
+                 refresh_interval: float = REFRESH_INTERVAL):
+        self.base_url = base_url
+        self.headers = headers or {}
+        self.classifications = list(classifications)
+        self.refresh_interval = refresh_interval
+        self.session = get_session()
+        self._tags = set()
+        self._last_refresh = {}
+        self._missing = {}  # tag FQN -> time of the failed single lookup
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Fetch every tag of the configured classifications. Raises if one
+        cannot be fetched, rather than letting every tag look missing.
+        """
+        for classification in self.classifications:
+            self._refresh(classification, raise_errors=True)
+        logging.info(f"Tag catalog loaded {len(self._tags)} tags from {self.classifications}")
+        return self
+
+    def _fetch_classification(self, classification: str) -> set:
+        tags = set()
+        params = {'parent': classification, 'limit': PAGE_SIZE}
+        while True:
+            response = self.session.get(f"{self.base_url}/v1/tags", headers=self.headers, params=params)
+            response.raise_for_status()
+            data = response.json()
+            tags.update(tag['fullyQualifiedName'] for tag in data.get('data', []) if tag.get('fullyQualifiedName'))
+
+            after = data.get('paging', {}).get('after')
+            if not after:
+                return tags
+            params['after'] = after
+
+    def _refresh(self, classification: str, raise_errors: bool = False):
+        with self._lock:
+            last = self._last_refresh.get(classification)
+            if last is not None and time.monotonic() - last < self.refresh_interval:
+                return
+            try:
+                fetched = self._fetch_classification(classification)
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error loading tags for classification '{classification}': {str(e)}")
+                if raise_errors:
+                    raise
+                return
+            finally:
+                self._last_refresh[classification] = time.monotonic()
+            # Drop this classification's old entries so deleted tags disappear
+            prefix = f"{classification}."
+            self._tags = {tag for tag in self._tags if not tag.startswith(prefix)} | fetched
+
+    def _fetch_single(self, tag_fqn: str) -> bool:
+        checked_at = self._missing.get(tag_fqn)
+        if checked_at is not None and time.monotonic() - checked_at < self.refresh_interval:
+            return False
+
+        encoded_fqn = requests.utils.quote(tag_fqn)
+        try:
+            response = self.session.get(f"{self.base_url}/v1/tags/name/{encoded_fqn}", headers=self.headers)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error checking tag existence for '{tag_fqn}': {str(e)}")
+            return False
+        if response.status_code == 200:
+            with self._lock:
+                self._tags.add(tag_fqn)
+            return True
+        self._missing[tag_fqn] = time.monotonic()
+        return False
+
+    def exists(self, tag_fqn: str) -> bool:
+        """Return True if the tag exists, refreshing its classification on a miss."""
+        if tag_fqn in self._tags:
+            return True
+
+        classification = tag_fqn.split('.', 1)[0]
+        if classification in self.classifications:
+            self._refresh(classification)
+            return tag_fqn in self._tags
+
+        # Tag outside the prefetched classifications: look it up on its own
+        return self._fetch_single(tag_fqn)
+
+    def __contains__(self, tag_fqn: str) -> bool:
+        return self.exists(tag_fqn)
+
+    def __len__(self) -> int:
+        return len(self._tags)
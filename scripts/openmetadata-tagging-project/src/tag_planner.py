@@ -0,0 +1,244 @@
+"""
+Plan/apply reconciliation of Application System tags.
+
+Instead of walking every table and deciding one at a time whether to PATCH,
+the planner compares the desired state (table FQN -> tags it should carry,
+built from ER/Studio, the FTA CSV or application_mapping.json) with the
+current state (tags already on each table, listed a schema at a time) and
+keeps only the tables that actually need a change.
+
+A plan can be printed, saved to JSON and reviewed before it is applied. Its
+request estimate is known up front: one PATCH per changed table, because
+all of a table's adds and removes go in a single JSON Patch. On a steady
+state run the plan is empty and nothing is written.
+
+Removals are opt-in (prune) and limited to the managed classifications, so
+tags from other classifications are never touched. Every remove is guarded
+by a JSON Patch "test" operation; if the table changed since it was planned
+the PATCH is rejected and the table is picked up again by the next plan.
+
+Usage:
+    from tag_planner import current_state, build_plan, apply_plan, schemas_for
+
+    desired = {"DBQ01.DBQ01.the.TABLE": {"Application System.FTA"}}
+    current = current_state(base_url, headers, schemas_for(desired))
+    plan = build_plan(desired, current)
+    print(plan.summary())
+    plan.save("data/tag_plan.json")
+    applied, failed = apply_plan(base_url, headers, plan)
+"""
+
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import requests
+
+from omd_client import get_session
+from table_iterator import iter_tables
+from tag_catalog import DEFAULT_CLASSIFICATIONS
+from tagging_engine import run_concurrently, DEFAULT_MAX_WORKERS
+
+PLAN_VERSION = 1
+
+
+def schemas_for(fqns: Iterable[str]) -> List[str]:
+    """Return the sorted database schema FQNs (service.database.schema) of the given table FQNs."""
+    return sorted({fqn.rsplit('.', 1)[0] for fqn in fqns if '.' in fqn})
+
+
+def current_state(base_url: str, headers: Dict, schemas: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+    """
+    List the tag FQNs currently on each table, in the order OpenMetadata
+    returns them, so removals can address /tags/{index}. Pass the schemas of
+    the desired tables to avoid listing the whole catalogue.
+    """
+    state = {}
+    for schema in (schemas if schemas is not None else [None]):
+        for table in iter_tables(base_url, headers, database_schema=schema, fields='tags'):
+            state[table['fullyQualifiedName']] = [tag.get('tagFQN') for tag in table.get('tags') or []]
+    logging.info(f"Listed current tags for {len(state)} tables")
+    return state
+
+
+class TagPlan:
+    """
+    The minimal set of tag changes that brings OpenMetadata to the desired state.
+
+    changes maps table FQN -> {'add': [tag, ...], 'remove': [[index, tag], ...]};
+    missing lists desired tables that do not exist in OpenMetadata.
+    """
+
+    def __init__(self, changes: Optional[Dict[str, Dict]] = None, missing: Optional[List[str]] = None,
+                 unchanged: int = 0):
+        self.changes = changes or {}
+        self.missing = missing or []
+        self.unchanged = unchanged
+        # Tables whose PATCH failed when the plan was last applied
+        self.failed = 0
+
+    @property
+    def adds(self) -> int:
+        return sum(len(change['add']) for change in self.changes.values())
+
+    @property
+    def removes(self) -> int:
+        return sum(len(change['remove']) for change in self.changes.values())
+
+    @property
+    def estimated_requests(self) -> int:
+        """One PATCH per changed table; the current state has already been listed."""
+        return len(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def summary(self, limit: int = 20) -> str:
+        lines = [
+            f"Plan: {self.adds} tag(s) to add, {self.removes} to remove on {len(self.changes)} table(s); "
+            f"{self.unchanged} table(s) unchanged, {len(self.missing)} not found in OpenMetadata.",
+            f"Estimated requests to apply: {self.estimated_requests}",
+        ]
+        for fqn in sorted(self.changes)[:limit]:
+            change = self.changes[fqn]
+            lines.extend(f"  + {fqn}: {tag}" for tag in change['add'])
+            lines.extend(f"  - {fqn}: {tag}" for index, tag in change['remove'])
+        if len(self.changes) > limit:
+            lines.append(f"  ... and {len(self.changes) - limit} more table(s)")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': PLAN_VERSION,
+            'estimated_requests': self.estimated_requests,
+            'unchanged': self.unchanged,
+            'missing': self.missing,
+            'changes': self.changes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TagPlan':
+        if data.get('version') != PLAN_VERSION:
+            raise ValueError(f"Unsupported plan version: {data.get('version')}")
+        return cls(data.get('changes', {}), data.get('missing', []), data.get('unchanged', 0))
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+        logging.info(f"Plan written to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'TagPlan':
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def build_plan(desired: Dict[str, Set[str]], current: Dict[str, List[str]], prune: bool = False,
+               classifications: Iterable[str] = DEFAULT_CLASSIFICATIONS) -> TagPlan:
+    """
+    Diff desired (table FQN -> tag FQNs) against current (table FQN -> tag FQNs).
+
+    Tags are only added, unless prune is set: then tags of the managed
+    classifications that are not desired are removed from every listed table,
+    including tables absent from desired. Only prune when desired is the
+    complete state for the listed schemas.
+    """
+    prefixes = tuple(f"{classification}." for classification in classifications)
+    changes = {}
+    missing = []
+    unchanged = 0
+
+    tables = set(desired) | (set(current) if prune else set())
+    for fqn in sorted(tables):
+        wanted = desired.get(fqn, set())
+        if fqn not in current:
+            missing.append(fqn)
+            continue
+
+        present = current[fqn]
+        add = sorted(tag for tag in wanted if tag not in present)
+        remove = []
+        if prune:
+            remove = [[index, tag] for index, tag in enumerate(present)
+                      if tag and tag.startswith(prefixes) and tag not in wanted]
+        if add or remove:
+            changes[fqn] = {'add': add, 'remove': remove}
+        else:
+            unchanged += 1
+
+    return TagPlan(changes, missing, unchanged)
+
+
+def build_patch(change: Dict) -> List[Dict]:
+    """
+    JSON Patch for one table: guarded removes from the highest index down (so
+    earlier indexes stay valid), then appends.
+    """
+    operations = []
+    for index, tag in sorted(change['remove'], reverse=True):
+        operations.append({"op": "test", "path": f"/tags/{index}/tagFQN", "value": tag})
+        operations.append({"op": "remove", "path": f"/tags/{index}"})
+    for tag in change['add']:
+        operations.append({"op": "add", "path": "/tags/-", "value": {"tagFQN": tag}})
+    return operations
+
+
+def apply_change(base_url: str, headers: Dict, table_fqn: str, change: Dict) -> bool:
+    session = get_session()
+    patch_headers = headers.copy()
+    patch_headers['Content-Type'] = 'application/json-patch+json'
+    encoded_fqn = requests.utils.quote(table_fqn)
+    response = session.patch(f"{base_url}/v1/tables/name/{encoded_fqn}", headers=patch_headers,
+                             json=build_patch(change))
+    if response.status_code >= 400:
+        logging.error(f"Failed to apply plan to {table_fqn}: {response.status_code} {response.text[:200]}")
+        return False
+    logging.info(f"Applied plan to {table_fqn}: +{len(change['add'])} -{len(change['remove'])}")
+    return True
+
+
+def apply_plan(base_url: str, headers: Dict, plan: TagPlan, max_workers: int = DEFAULT_MAX_WORKERS,
+               dry_run: bool = False) -> Tuple[int, int]:
+    """Send one PATCH per changed table concurrently. Returns (applied, failed)."""
+    if dry_run:
+        logging.info(f"DRY RUN: Would send {plan.estimated_requests} PATCH request(s)")
+        return 0, 0
+
+    applied = failed = 0
+    items = list(plan.changes.items())
+    for (table_fqn, change), result in run_concurrently(
+            lambda item: apply_change(base_url, headers, *item), items, max_workers):
+        if result is True:
+            applied += 1
+        else:
+            failed += 1
+    logging.info(f"Plan applied: {applied} table(s) updated, {failed} failed")
+    return applied, failed
+
+
+def reconcile(base_url: str, headers: Dict, desired: Optional[Dict[str, Set[str]]], apply: bool = False,
+              plan_file: Optional[str] = None, prune: bool = False, max_workers: int = DEFAULT_MAX_WORKERS,
+              dry_run: bool = False, classifications: Iterable[str] = DEFAULT_CLASSIFICATIONS,
+              current: Optional[Dict[str, List[str]]] = None) -> TagPlan:
+    """
+    Shared --plan/--apply entry point for the tagging scripts.
+
+    With apply and an existing plan_file, the saved plan is applied as is and
+    desired may be None. Otherwise the plan is computed from desired, printed,
+    written to plan_file (if given) and, with apply, executed. Pass current
+    when the caller has already listed the tables, to skip listing them again.
+    """
+    if apply and plan_file and desired is None:
+        plan = TagPlan.load(plan_file)
+        logging.info(f"Loaded plan from {plan_file}")
+    else:
+        if current is None:
+            current = current_state(base_url, headers, schemas_for(desired))
+        plan = build_plan(desired, current, prune, classifications)
+        if plan_file:
+            plan.save(plan_file)
+
+    logging.info("\n" + plan.summary())
+    if apply and plan.changes:
+        _, plan.failed = apply_plan(base_url, headers, plan, max_workers, dry_run)
+    return plan
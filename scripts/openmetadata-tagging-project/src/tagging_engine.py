@@ -0,0 +1,78 @@
+"""
+Concurrent execution engine for the tagging scripts.
+
+Replaces the serial BATCH_SIZE / BATCH_DELAY loops: each table is handled by
+a worker function on a bounded thread pool, so many existence checks and tag
+PATCHes are in flight at once while at most max_workers requests hit
+OpenMetadata at any moment.
+
+Worker functions return a result per item (for example a tuple of counter
+increments); results are handed back to the calling thread, which does all
+counting, so no locking is needed in the scripts.
+
+Usage:
+    from tagging_engine import run_concurrently
+
+    for table, result in run_concurrently(process_table, tables, max_workers=8):
+        ...
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, Iterator, Tuple, Any
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def run_concurrently(func: Callable, items: Iterable, max_workers: int = DEFAULT_MAX_WORKERS,
+                     progress_every: int = 500) -> Iterator[Tuple[Any, Any]]:
+    """
+    Run func(item) for every item on a bounded thread pool.
+
+    At most max_workers calls run at once and at most 2 * max_workers items
+    are queued, so very long iterables are consumed lazily. Yields
+    (item, result) pairs in completion order. An exception raised by func is
+    logged and yielded as the result so one bad table cannot stop the run.
+    """
+    max_workers = max(1, int(max_workers))
+    max_pending = max_workers * 2
+    completed = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tagging') as executor:
+        pending = {}
+        items = iter(items)
+        exhausted = False
+
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(func, item)] = item
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"Worker failed for {item}: {str(e)}")
+                    result = e
+                completed += 1
+                if progress_every and completed % progress_every == 0:
+                    logging.info(f"Processed {completed} items...")
+                yield item, result
+
+
+def sum_counters(results: Iterable[Tuple], width: int) -> Tuple:
+    """Add up tuples of per-item counter increments into one tuple of totals."""
+    totals = [0] * width
+    for counters in results:
+        for i, value in enumerate(counters):
+            totals[i] += value
+    return tuple(totals)
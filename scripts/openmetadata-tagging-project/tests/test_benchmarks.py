@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from omd_client import configure_session
+from run_benchmarks import run_benchmark, compare_to_baseline
+from fake_openmetadata_server import FakeOpenMetadataServer
+
+class TestBenchmarks(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        configure_session({'requests_per_second': 0})
+
+    def test_main_flow_against_fake_server(self):
+        result = run_benchmark('main', 50, max_workers=4, latency=0.0, error_rate=0.0)
+
+        self.assertEqual((result['existing'], result['missing'], result['applied'], result['failed']), (50, 0, 50, 0))
+        self.assertEqual(result['errors'], 0)
+        self.assertLessEqual(result['requests_per_table'], 2.1)
+
+    # The retry delay in fta_tagger_csv.apply_tag is skipped
+    @patch('fta_tagger_csv.time')
+    def test_fta_flow_survives_injected_errors(self, mock_time):
+        result = run_benchmark('fta', 50, max_workers=4, latency=0.0, error_rate=0.1)
+
+        self.assertEqual((result['applied'], result['failed']), (50, 0))
+        self.assertGreater(result['errors'], 0)
+        self.assertTrue(mock_time.sleep.called)
+
+    def test_write_only_rerun_does_not_duplicate_tags(self):
+        import main
+        import fta_tagger_csv
+
+        server = FakeOpenMetadataServer()
+        for name in ('BENCH', 'FTA', 'OTHER'):
+            server.add_tag('Application System', name)
+        fqns = [f"BENCH.BENCHDB.bench.TABLE_{i}" for i in range(10)]
+        server.add_tables(fqns)
+        # A table with another tag already is read before it is tagged
+        server.tables[fqns[0]]['tags'].append({'tagFQN': 'Application System.OTHER'})
+        base_url = server.start()
+        self.addCleanup(server.stop)
+
+        tag_fqn = 'Application System.BENCH'
+        for _ in range(2):
+            result = main.process_table_batch(base_url, {}, [(fqn, {'fqn': fqn}) for fqn in fqns], tag_fqn, True,
+                                              write_only=True)
+            self.assertEqual(result, (10, 0, 10, 0))
+            fta_tagger_csv.process_tables(base_url, {}, [{'fqn': fqn, 'application': 'FTA'} for fqn in fqns],
+                                          write_only=True, tag_catalog=MagicMock())
+
+        for fqn in fqns:
+            labels = [tag['tagFQN'] for tag in server.tables[fqn]['tags']]
+            self.assertEqual(labels.count(tag_fqn), 1)
+            self.assertEqual(labels.count('Application System.FTA'), 1)
+
+    def test_compare_to_baseline(self):
+        baseline = [{'flow': 'main', 'size': 10, 'requests_per_table': 2.0, 'wall_time': 1.0}]
+        results = [{'flow': 'main', 'size': 10, 'requests_per_table': 3.0, 'wall_time': 1.1}]
+
+        regressions = compare_to_baseline(results, baseline, time_tolerance=0.5, request_tolerance=0.05)
+
+        self.assertEqual(len(regressions), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import bulk_tagging
+from omd_client import configure_session
+from fake_openmetadata_server import FakeOpenMetadataServer
+from bulk_tagging import add_tag_to_assets
+
+TAG = 'Application System.FTA'
+
+class TestBulkTagging(unittest.TestCase):
+
+    def start(self, tables, bulk_assets=True):
+        configure_session({'requests_per_second': 0})
+        bulk_tagging._bulk_supported.clear()
+        self.server = FakeOpenMetadataServer(bulk_assets=bulk_assets)
+        self.server.add_tag('Application System', 'FTA')
+        self.server.add_tables(f"DBP01.DBP01.fta.TABLE_{i}" for i in range(tables))
+        self.base_url = self.server.start()
+        self.addCleanup(self.server.stop)
+        return {fqn: table['id'] for fqn, table in self.server.tables.items()}
+
+    def tagged(self):
+        return sum(1 for table in self.server.tables.values() if {'tagFQN': TAG} in table['tags'])
+
+    def test_schema_is_tagged_in_a_handful_of_requests(self):
+        assets = self.start(2000)
+
+        results = add_tag_to_assets(self.base_url, {}, TAG, assets)
+
+        self.assertEqual(len(results), 2000)
+        self.assertTrue(all(result['status'] == 'applied' and result['via'] == 'bulk' for result in results.values()))
+        self.assertEqual(self.tagged(), 2000)
+        self.assertEqual(self.server.request_counts[('PUT', 'tags.assets.add', 200)], 4)
+        self.assertEqual(self.server.total_requests, 5)
+
+    def test_failed_assets_are_reported_per_table(self):
+        assets = self.start(10)
+        gone = 'DBP01.DBP01.fta.TABLE_3'
+        self.server.delete_table(gone)
+
+        results = add_tag_to_assets(self.base_url, {}, TAG, assets)
+
+        self.assertEqual(results[gone]['status'], 'failed')
+        self.assertIn('not found', results[gone]['message'])
+        self.assertEqual(sum(result['status'] == 'applied' for result in results.values()), 9)
+
+    def test_falls_back_to_per_table_patches(self):
+        assets = self.start(30, bulk_assets=False)
+
+        results = add_tag_to_assets(self.base_url, {}, TAG, assets, batch_size=10)
+
+        self.assertTrue(all(result['via'] == 'patch' for result in results.values()))
+        self.assertEqual(self.tagged(), 30)
+        # The server is remembered as unsupported after the first batch
+        self.assertEqual(self.server.request_counts[('PUT', 'tags.assets.add', 404)], 1)
+        self.assertEqual(self.server.request_counts[('PATCH', 'tables.patch', 200)], 30)
+
+    def test_tables_without_an_id_are_patched(self):
+        assets = self.start(5)
+        assets['DBP01.DBP01.fta.TABLE_0'] = None
+
+        results = add_tag_to_assets(self.base_url, {}, TAG, assets)
+
+        self.assertEqual(results['DBP01.DBP01.fta.TABLE_0']['via'], 'patch')
+        self.assertEqual(results['DBP01.DBP01.fta.TABLE_1']['via'], 'bulk')
+        self.assertEqual(self.tagged(), 5)
+
+    def test_tables_are_reread_after_an_uncertain_bulk_failure(self):
+        assets = self.start(5)
+        # The bulk request tagged part of the batch before failing
+        for fqn in list(assets)[:3]:
+            self.server.tables[fqn]['tags'].append({'tagFQN': TAG})
+
+        with patch.object(bulk_tagging, '_bulk_add', return_value=(None, True)):
+            results = add_tag_to_assets(self.base_url, {}, TAG, assets)
+
+        self.assertTrue(all(result['status'] == 'applied' for result in results.values()))
+        self.assertTrue(all(table['tags'].count({'tagFQN': TAG}) == 1 for table in self.server.tables.values()))
+        self.assertEqual(self.server.request_counts[('PATCH', 'tables.patch', 200)], 2)
+
+if __name__ == '__main__':
+    unittest.main()
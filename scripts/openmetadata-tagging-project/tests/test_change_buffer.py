@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from omd_client import configure_session
+from fake_openmetadata_server import FakeOpenMetadataServer
+from change_buffer import ChangeBuffer
+
+class TestChangeBuffer(unittest.TestCase):
+
+    def setUp(self):
+        configure_session({'requests_per_second': 0})
+        self.server = FakeOpenMetadataServer()
+        for name in ('FTA', 'RRS', 'OLD'):
+            self.server.add_tag('Application System', name)
+        self.server.add_tables(['DBP01.DBP01.fta.HARVEST'], tags=['Application System.OLD'])
+        self.server.add_tables(f"DBP01.DBP01.fta.TABLE_{i}" for i in range(3))
+        self.base_url = self.server.start()
+        self.buffer = ChangeBuffer(self.base_url, {})
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_every_change_of_a_table_goes_in_one_patch(self):
+        table = self.server.tables['DBP01.DBP01.fta.HARVEST']
+        self.buffer.add_tag(table['id'], 'Application System.FTA')
+        self.buffer.add_tag(table['id'], 'Application System.RRS')
+        self.buffer.add_tag(table['id'], 'Application System.FTA')
+        self.buffer.remove_tag(table['id'], 'Application System.OLD', ['Application System.OLD'])
+        self.buffer.set_owner(table['id'], {'id': 'user-1', 'type': 'user'})
+        self.buffer.set_description(table['id'], 'Harvest records')
+        self.assertEqual(self.buffer.operations, 5)
+
+        results = self.buffer.flush()
+
+        self.assertEqual(results, {table['id']: True})
+        self.assertEqual(self.server.request_counts[('PATCH', 'tables.patch', 200)], 1)
+        self.assertEqual([tag['tagFQN'] for tag in table['tags']], ['Application System.FTA', 'Application System.RRS'])
+        self.assertEqual(table['owners'], [{'id': 'user-1', 'type': 'user'}])
+        self.assertEqual(table['description'], 'Harvest records')
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_entities_are_keyed_by_fqn_or_id_and_failures_reported(self):
+        self.buffer.add_tag('DBP01.DBP01.fta.TABLE_0', 'Application System.FTA')
+        self.buffer.remove_owner(self.server.tables['DBP01.DBP01.fta.TABLE_1']['id'])
+        self.buffer.add_tag('DBP01.DBP01.fta.GONE', 'Application System.FTA')
+
+        results = self.buffer.flush()
+
+        self.assertTrue(results['DBP01.DBP01.fta.TABLE_0'])
+        self.assertFalse(results['DBP01.DBP01.fta.GONE'])
+        self.assertEqual(self.server.tables['DBP01.DBP01.fta.TABLE_1']['owners'], [])
+        self.assertEqual(self.server.total_requests, 3)
+
+    def test_dry_run_sends_nothing(self):
+        self.buffer.add_tag('DBP01.DBP01.fta.TABLE_0', 'Application System.FTA')
+        self.assertEqual(self.buffer.flush(dry_run=True), {'DBP01.DBP01.fta.TABLE_0': True})
+        self.assertEqual(self.server.total_requests, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from omd_client import configure_session
+from fake_openmetadata_server import FakeOpenMetadataServer
+from change_feed import ChangeWatermark, fetch_changed_tables, group_by_schema, watermark_path, now_ms
+
+FTA = "Application System.FTA"
+
+class TestChangeFeed(unittest.TestCase):
+
+    def setUp(self):
+        configure_session({'requests_per_second': 0})
+        self.server = FakeOpenMetadataServer()
+        self.server.add_tag('Application System', 'FTA')
+        self.server.add_tables(f"DBQ01.DBQ01.the.TABLE_{i}" for i in range(20))
+        self.server.add_tables(f"DBQ01.DBQ01.consep.TABLE_{i}" for i in range(5))
+        self.base_url = self.server.start()
+        time.sleep(0.01)
+        self.since = now_ms()
+        time.sleep(0.01)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_fetches_only_tables_changed_since(self):
+        self.server.add_tables(['DBQ01.DBQ01.the.NEW'])
+        self.server.patch_table('DBQ01.DBQ01.consep.TABLE_1', [{'op': 'add', 'path': '/tags/-', 'value': {'tagFQN': FTA}}])
+        self.server.reset_counts()
+
+        tables = fetch_changed_tables(self.base_url, None, self.since, max_workers=4)
+
+        self.assertEqual([table['fullyQualifiedName'] for table in tables],
+                         ['DBQ01.DBQ01.consep.TABLE_1', 'DBQ01.DBQ01.the.NEW'])
+        self.assertEqual(tables[0]['tags'], [{'tagFQN': FTA}])
+        self.assertEqual(self.server.request_counts[('GET', 'events.list', 200)], 1)
+        self.assertEqual(self.server.request_counts[('GET', 'tables.get', 200)], 2)
+        self.assertEqual(self.server.request_counts[('GET', 'tables.list', 200)], 0)
+
+    def test_deleted_tables_are_left_out(self):
+        self.server.add_tables(['DBQ01.DBQ01.the.NEW'])
+        self.server.delete_table('DBQ01.DBQ01.the.NEW')
+
+        self.assertEqual(fetch_changed_tables(self.base_url, None, self.since), [])
+
+    def test_no_changes(self):
+        self.assertEqual(fetch_changed_tables(self.base_url, None, self.since), [])
+
+    def test_group_by_schema(self):
+        tables = [{'fullyQualifiedName': 'S.D.the.A'}, {'fullyQualifiedName': 'S.D.consep.B'},
+                  {'fullyQualifiedName': 'S.D.the.C'}]
+
+        grouped = group_by_schema(tables)
+
+        self.assertEqual(sorted(grouped), ['S.D.consep', 'S.D.the'])
+        self.assertEqual(len(grouped['S.D.the']), 2)
+
+class TestChangeWatermark(unittest.TestCase):
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = watermark_path(os.path.join(tmp, 'data'), 'schema_based')
+            self.assertTrue(path.endswith('change_watermark_schema_based.json'))
+            self.assertIsNone(ChangeWatermark(path).timestamp)
+
+            ChangeWatermark(path).advance(1234)
+
+            self.assertEqual(ChangeWatermark(path).timestamp, 1234)
+            self.assertFalse(os.path.exists(f"{path}.tmp"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from omd_client import configure_session, get_session
+from fake_openmetadata_server import FakeOpenMetadataServer
+from client_metrics import ClientMetrics, endpoint_label, metrics
+
+class TestClientMetrics(unittest.TestCase):
+
+    def test_endpoint_labels_are_templates(self):
+        self.assertEqual(endpoint_label('https://host/api/v1/tables/name/A.B.c.T?fields=tags'), '/v1/tables/name/{fqn}')
+        self.assertEqual(endpoint_label('http://h/api/v1/tags/0b6f6a9e-1c1f-4f7b-9b1a-2d3c4e5f6a7b/assets/add'),
+                         '/v1/tags/{id}/assets/add')
+        self.assertEqual(endpoint_label('http://h/api/v1/tables'), '/v1/tables')
+
+    def test_render_prometheus_text(self):
+        registry = ClientMetrics()
+        registry.observe_request('GET', 'http://h/api/v1/tables', 200, 0.2)
+        registry.observe_request('GET', 'http://h/api/v1/tables', 200, 3.0)
+        registry.record_tables('FTA "main"', 100, 4.0)
+
+        text = registry.render()
+
+        self.assertIn('# TYPE omd_client_requests_total counter', text)
+        self.assertIn('omd_client_requests_total{endpoint="/v1/tables",method="GET",status="200"} 2.0', text)
+        self.assertIn('omd_client_request_duration_seconds_bucket{endpoint="/v1/tables",method="GET",status="200",le="0.25"} 1', text)
+        self.assertIn('omd_client_request_duration_seconds_bucket{endpoint="/v1/tables",method="GET",status="200",le="+Inf"} 2', text)
+        self.assertIn('omd_client_request_duration_seconds_count{endpoint="/v1/tables",method="GET",status="200"} 2', text)
+        self.assertIn('omd_tagging_tables_per_second{application="FTA \\"main\\""} 25.0', text)
+
+    def test_session_records_requests_retries_and_exports(self):
+        metrics.reset()
+        configure_session({'requests_per_second': 0, 'max_throttle_retries': 3})
+        server = FakeOpenMetadataServer(error_rate=1.0, error_status=429, retry_after=0)
+        base_url = server.start()
+        try:
+            get_session().get(f"{base_url}/v1/tables/name/A.B.C.T")
+        finally:
+            server.stop()
+
+        labels = {'method': 'GET', 'endpoint': '/v1/tables/name/{fqn}', 'status': 429}
+        self.assertEqual(metrics.value('omd_client_requests_total', **labels), 4)
+        self.assertEqual(metrics.value('omd_client_retries_total', **labels), 3)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'omd.prom')
+            metrics.write_textfile(path)
+            with open(path) as f:
+                self.assertIn('omd_client_retries_total', f.read())
+
+    def test_push_to_gateway(self):
+        received = {}
+
+        class Gateway(BaseHTTPRequestHandler):
+            def do_PUT(self):
+                received['path'] = self.path
+                received['body'] = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        httpd = HTTPServer(('127.0.0.1', 0), Gateway)
+        thread = threading.Thread(target=httpd.handle_request)
+        thread.start()
+        registry = ClientMetrics()
+        registry.record_throttle_wait(1.5)
+        registry.push(f"http://127.0.0.1:{httpd.server_port}", 'main')
+        thread.join()
+        httpd.server_close()
+
+        self.assertEqual(received['path'], '/metrics/job/main')
+        self.assertIn('omd_client_throttle_wait_seconds_total 1.5', received['body'])
+
+if __name__ == '__main__':
+    unittest.main()
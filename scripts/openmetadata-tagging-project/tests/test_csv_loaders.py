@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the schema tagging script directories to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src', 'schema_tagging'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src', 'schema_tagging', 'fta_tagging'))
+
+from openmetadata_mapping_generator import generate_mapping_from_csv
+from fta_tagger_csv import load_tables_from_csv
+
+class TestCsvLoaders(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_mapping_counts_and_samples_across_chunks(self):
+        rows = [f"DBP01.DBP01.fta.T{i:02d}" for i in range(12)] + ["DBP01.DBP01.rrs.PERMIT", "too.short"]
+        path = self.write('fqns.csv', "fqn,name\n" + "\n".join(f"{fqn},x" for fqn in reversed(rows)) + "\n")
+
+        mapping = generate_mapping_from_csv(path, chunksize=5)
+
+        self.assertEqual(list(mapping), ['RRS - DBP01', 'FTA - DBP01'])
+        fta = mapping['FTA - DBP01']
+        self.assertEqual(fta['total_tables'], 12)
+        self.assertEqual(fta['sample_tables'], [f"DBP01.DBP01.fta.T{i:02d}" for i in range(5)])
+        self.assertEqual(fta['service'], 'DBP01')
+        self.assertEqual(mapping['RRS - DBP01']['total_tables'], 1)
+
+    def test_fta_tables_use_case_insensitive_columns(self):
+        path = self.write('fta.csv', "Table_Name,APPLICATION,other\nHARVEST,FTA,1\nPERMIT,,2\nTENURE,RRS,3\n")
+
+        tables = load_tables_from_csv(path, chunksize=2)
+
+        self.assertEqual(tables, [
+            {'name': 'HARVEST', 'fqn': 'DBQ01.DBQ01.the.HARVEST', 'application': 'FTA'},
+            {'name': 'TENURE', 'fqn': 'DBQ01.DBQ01.the.TENURE', 'application': 'RRS'},
+        ])
+
+    def test_fta_missing_column_is_reported(self):
+        path = self.write('bad.csv', "table_name,owner\nHARVEST,me\n")
+        with self.assertRaises(ValueError):
+            load_tables_from_csv(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import pandas as pd
+
+# Add src and the FTA scripts to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src', 'schema_tagging', 'fta_tagging'))
+
+from data_files import data_file, columns_of, read_table, iter_chunks, write_table, write_chunks
+from openmetadata_table_list_processor import load_openmetadata_tables
+from fta_tagger_csv import load_tables_from_csv
+
+class TestDataFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parquet_round_trip_keeps_categoricals(self):
+        df = pd.DataFrame({'TABLE_NAME': ['HARVEST', 'PERMIT', 'TENURE'], 'APPLICATION': ['FTA', 'FTA', 'RRS']})
+        path = write_table(df, os.path.join(self.dir, 'matched.parquet'), categorical=['APPLICATION'], csv_export=True)
+
+        loaded = read_table(path)
+
+        self.assertIsInstance(loaded['APPLICATION'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(loaded['TABLE_NAME']), ['HARVEST', 'PERMIT', 'TENURE'])
+        self.assertEqual(columns_of(path), ['TABLE_NAME', 'APPLICATION'])
+        self.assertEqual(list(pd.read_csv(os.path.join(self.dir, 'matched.csv'))['APPLICATION']), ['FTA', 'FTA', 'RRS'])
+
+    def test_chunks_and_column_selection(self):
+        chunks = (pd.DataFrame({'fqn': [f"S.D.s.T{i}" for i in range(start, start + 4)], 'other': 1})
+                  for start in range(0, 12, 4))
+        path = os.path.join(self.dir, 'fqns.parquet')
+
+        self.assertEqual(write_chunks(chunks, path), 12)
+
+        read = list(iter_chunks(path, columns=['fqn'], chunksize=5))
+        self.assertEqual([len(chunk) for chunk in read], [5, 5, 2])
+        self.assertEqual(list(read[0].columns), ['fqn'])
+
+    def test_data_file_prefers_parquet_and_falls_back_to_csv(self):
+        self.assertEqual(data_file(self.dir, 'dump'), os.path.join(self.dir, 'dump.parquet'))
+        pd.DataFrame({'fqn': ['a']}).to_csv(os.path.join(self.dir, 'dump.csv'), index=False)
+        self.assertEqual(data_file(self.dir, 'dump'), os.path.join(self.dir, 'dump.csv'))
+        write_table(pd.DataFrame({'fqn': ['a']}), os.path.join(self.dir, 'dump.parquet'))
+        self.assertEqual(data_file(self.dir, 'dump'), os.path.join(self.dir, 'dump.parquet'))
+
+    def test_consumers_read_parquet(self):
+        fqns = write_table(pd.DataFrame({'fqn': ['DBP01.DBP01.fta.HARVEST', 'DBP01.DBP01.rrs.PERMIT']}),
+                           os.path.join(self.dir, 'openmetadata_table_fqns.parquet'))
+        self.assertEqual(load_openmetadata_tables(fqns).resolve('harvest')['schema'], 'fta')
+
+        matched = write_table(pd.DataFrame({'TABLE_NAME': ['HARVEST', None], 'APPLICATION': ['FTA', 'FTA']}),
+                              os.path.join(self.dir, 'matched_records_fta.parquet'), categorical=['APPLICATION'])
+        self.assertEqual(load_tables_from_csv(matched),
+                         [{'name': 'HARVEST', 'fqn': 'DBQ01.DBQ01.the.HARVEST', 'application': 'FTA'}])
+
+if __name__ == '__main__':
+    unittest.main()
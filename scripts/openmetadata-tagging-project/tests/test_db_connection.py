@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import pandas as pd
+from sqlalchemy import text
+
+# Add src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from db_connection_cx import create_db_engine, stream_query, iter_rows, read_query, run_queries, export_query
+
+class TestDbConnection(unittest.TestCase):
+
+    def setUp(self):
+        # SQLite stands in for Oracle; the pooling and streaming paths are the same SQLAlchemy calls
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.tmp.name, 'er_studio.db')}")
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE tables (application TEXT, table_name TEXT)"))
+            connection.execute(text("INSERT INTO tables VALUES (:application, :table_name)"),
+                               [{'application': 'FTA' if i % 3 else 'ATS', 'table_name': f"T{i}"} for i in range(1000)])
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_stream_query_yields_bounded_chunks(self):
+        chunks = list(stream_query(self.engine, "SELECT * FROM tables ORDER BY rowid", chunksize=300))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [300, 300, 300, 100])
+        self.assertEqual(list(chunks[0].columns), ['application', 'table_name'])
+        self.assertEqual(chunks[-1]['table_name'].iloc[-1], 'T999')
+
+    def test_empty_result_keeps_columns(self):
+        df = read_query(self.engine, "SELECT * FROM tables WHERE application = :application", {'application': 'NONE'})
+
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ['application', 'table_name'])
+
+    def test_iter_rows(self):
+        rows = list(iter_rows(self.engine, "SELECT table_name FROM tables WHERE rowid <= 2 ORDER BY rowid", chunksize=1))
+
+        self.assertEqual(rows, [('T0',), ('T1',)])
+
+    def test_run_queries_concurrently(self):
+        sql = "SELECT table_name FROM tables WHERE application = :application"
+        results = dict(run_queries(self.engine, {app: (sql, {'application': app}) for app in ('FTA', 'ATS', 'NONE')},
+                                   max_workers=3))
+
+        self.assertEqual(len(results['FTA']), 666)
+        self.assertEqual(len(results['ATS']), 334)
+        self.assertTrue(results['NONE'].empty)
+
+    def test_export_query_streams_to_parquet_and_csv(self):
+        path = os.path.join(self.tmp.name, 'dump.parquet')
+
+        rows = export_query(self.engine, "SELECT * FROM tables", path, chunksize=128, csv_export=True)
+
+        self.assertEqual(rows, 1000)
+        df = pd.read_parquet(path)
+        self.assertEqual(len(df), 1000)
+        self.assertEqual(list(df.columns), ['application', 'table_name'])
+        self.assertEqual(len(pd.read_csv(os.path.join(self.tmp.name, 'dump.csv'))), 1000)
+
+if __name__ == '__main__':
+    unittest.main()
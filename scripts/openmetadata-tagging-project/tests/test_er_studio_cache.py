@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import tempfile
+
+from sqlalchemy import event, text
+
+# Add src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from db_connection_cx import create_db_engine
+from er_studio_cache import ErStudioCache, run_cached_queries, query_key
+
+PROBE_SQL = "SELECT MAX(diagram_ver_id) AS diagram_ver, MAX(model_ver_id) AS model_ver FROM versions"
+TABLES_SQL = "SELECT application, table_name FROM tables WHERE application = :application ORDER BY table_name"
+
+class TestErStudioCache(unittest.TestCase):
+
+    def setUp(self):
+        # SQLite stands in for the ER/Studio repository
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.tmp.name, 'er_studio.db')}")
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE versions (diagram_ver_id INTEGER, model_ver_id INTEGER)"))
+            connection.execute(text("INSERT INTO versions VALUES (10, 20)"))
+            connection.execute(text("CREATE TABLE tables (application TEXT, table_name TEXT)"))
+            connection.execute(text("INSERT INTO tables VALUES ('FTA', 'T1'), ('FTA', 'T2'), ('ATS', 'T3')"))
+
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def queries(self):
+        return {app: (TABLES_SQL, {'application': app}) for app in ('FTA', 'ATS')}
+
+    def run_cached(self):
+        cache = ErStudioCache(self.cache_dir, self.engine, probe_sql=PROBE_SQL)
+        return cache, run_cached_queries(self.engine, self.queries(), cache)
+
+    def test_second_run_only_probes(self):
+        _, first = self.run_cached()
+        self.statements.clear()
+
+        cache, second = self.run_cached()
+
+        self.assertEqual(self.statements, [PROBE_SQL])
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(list(second['FTA']['table_name']), ['T1', 'T2'])
+        self.assertEqual(list(second['ATS']['table_name']), list(first['ATS']['table_name']))
+
+    def test_new_model_version_invalidates(self):
+        self.run_cached()
+        with self.engine.begin() as connection:
+            connection.execute(text("INSERT INTO versions VALUES (11, 20)"))
+            connection.execute(text("INSERT INTO tables VALUES ('FTA', 'T4')"))
+
+        cache, results = self.run_cached()
+
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(list(results['FTA']['table_name']), ['T1', 'T2', 'T4'])
+        # Results stored for the old versions are pruned
+        self.assertEqual(len([name for name in os.listdir(self.cache_dir) if name.endswith('.parquet')]), 2)
+
+    def test_failed_probe_bypasses_cache(self):
+        cache = ErStudioCache(self.cache_dir, self.engine, probe_sql="SELECT * FROM missing_table")
+
+        results = run_cached_queries(self.engine, self.queries(), cache)
+
+        self.assertEqual(len(results['ATS']), 1)
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_key_depends_on_sql_and_params(self):
+        self.assertEqual(query_key(TABLES_SQL, {'application': 'FTA'}), query_key(TABLES_SQL + "\n", {'application': 'FTA'}))
+        self.assertNotEqual(query_key(TABLES_SQL, {'application': 'FTA'}), query_key(TABLES_SQL, {'application': 'ATS'}))
+        self.assertNotEqual(query_key(TABLES_SQL, None), query_key(TABLES_SQL + " DESC", None))
+
+if __name__ == '__main__':
+    unittest.main()
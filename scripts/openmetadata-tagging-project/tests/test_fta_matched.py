@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import pandas as pd
+
+# Add src and the FTA scripts to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src', 'schema_tagging', 'fta_tagging'))
+
+from data_files import read_table, write_table
+from fta_matched import merge_fta_files
+
+class TestFtaMatched(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_keeps_every_application_and_flags_ambiguous_tables(self):
+        # THE dump streamed through SQLAlchemy (lower-case columns), ER/Studio list saved from a query tool
+        write_table(pd.DataFrame({'object_type': ['TABLE', 'VIEW', 'TABLE', 'TABLE'],
+                                  'object_name': ['HARVEST', 'V_PERMIT', 'OTHER', 'HARVEST']}),
+                    os.path.join(self.dir, 'THE_schema_dump.parquet'), categorical=['object_type'])
+        pd.DataFrame({'TABLE_NAME': ['HARVEST', 'V_PERMIT', 'HARVEST', 'HARVEST', 'NOT_IN_THE'],
+                      'APPLICATION': ['FTA', 'FTA', 'RRS', 'FTA', 'FTA'],
+                      'ASSET_TYPE': ['Table', 'View', 'Table', 'Table', 'Table']}).to_csv(
+            os.path.join(self.dir, 'er_studio_fta_tables_views.csv'), index=False)
+
+        merge_fta_files(self.dir, csv_export=True, chunksize=2)
+
+        matched = read_table(os.path.join(self.dir, 'matched_records_fta.parquet'))
+        self.assertEqual(list(zip(matched['TABLE_NAME'].astype(str), matched['APPLICATION'].astype(str),
+                                  matched['AMBIGUOUS'], matched['APPLICATION_COUNT'])),
+                         [('HARVEST', 'FTA', True, 2), ('HARVEST', 'RRS', True, 2), ('V_PERMIT', 'FTA', False, 1)])
+        self.assertNotIn('ASSET_TYPE', matched.columns)
+        self.assertIsInstance(matched['APPLICATION'].dtype, pd.CategoricalDtype)
+        self.assertEqual(len(pd.read_csv(os.path.join(self.dir, 'matched_records_fta.csv'))), 3)
+
+    def test_no_matches(self):
+        pd.DataFrame({'OBJECT_TYPE': ['TABLE'], 'OBJECT_NAME': ['OTHER']}).to_csv(
+            os.path.join(self.dir, 'THE_schema_dump.csv'), index=False)
+        pd.DataFrame({'TABLE_NAME': ['HARVEST'], 'APPLICATION': ['FTA'], 'ASSET_TYPE': ['Table']}).to_csv(
+            os.path.join(self.dir, 'er_studio_fta_tables_views.csv'), index=False)
+
+        self.assertTrue(merge_fta_files(self.dir).empty)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch, MagicMock
+
+# Add the FTA tagging script directory to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src', 'schema_tagging', 'fta_tagging'))
+
+from requests.exceptions import HTTPError
+from run_journal import RunJournal
+import fta_tagger_csv
+from fta_tagger_csv import apply_tag, get_table, process_tables, write_tag
+
+def response(status_code, body=None):
+    mock_response = MagicMock(status_code=status_code)
+    mock_response.json.return_value = body
+    if status_code >= 400:
+        mock_response.raise_for_status.side_effect = HTTPError(f"{status_code} error", response=mock_response)
+    return mock_response
+
+class TestFtaTaggerCsv(unittest.TestCase):
+
+    @patch.object(fta_tagger_csv.session, 'get')
+    def test_get_table(self, mock_get):
+        mock_get.return_value = response(200, {'tags': []})
+        self.assertEqual(get_table('base_url', {}, 'table_fqn'), {'tags': []})
+
+        mock_get.return_value = response(404)
+        self.assertIsNone(get_table('base_url', {}, 'table_fqn'))
+
+        mock_get.return_value = response(503)
+        with self.assertRaises(HTTPError):
+            get_table('base_url', {}, 'table_fqn')
+
+    @patch.object(fta_tagger_csv.session, 'get')
+    def test_lookup_errors_are_failed_and_not_journaled(self, mock_get):
+        mock_get.side_effect = lambda url, headers: response(404 if 'GONE' in url else 503)
+        tables = [{'fqn': 'S.D.the.GONE', 'application': 'A'}, {'fqn': 'S.D.the.BUSY', 'application': 'A'}]
+        catalog = MagicMock()
+        catalog.exists.return_value = True
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with RunJournal(os.path.join(tmp, 'journal.jsonl')) as journal:
+                result = process_tables('base_url', {}, tables, tag_catalog=catalog, journal=journal)
+
+                self.assertEqual(result, (0, 1, 0, 1))
+                self.assertTrue(journal.table_done('S.D.the.GONE', 'Application System.A'))
+                self.assertFalse(journal.table_done('S.D.the.BUSY', 'Application System.A'))
+
+    @patch.object(fta_tagger_csv, 'time')
+    @patch.object(fta_tagger_csv.session, 'patch')
+    def test_apply_tag_retries_server_errors_only(self, mock_patch, mock_time):
+        mock_patch.return_value = response(403)
+        self.assertFalse(apply_tag('base_url', {}, 'table_fqn', 'Application System.A', table_data={'tags': []}))
+        self.assertEqual(mock_patch.call_count, 1)
+        mock_time.sleep.assert_not_called()
+
+        mock_patch.reset_mock()
+        mock_patch.side_effect = [response(500), response(200)]
+        with patch.object(fta_tagger_csv.session, 'get', return_value=response(200, {'tags': []})):
+            self.assertTrue(apply_tag('base_url', {}, 'table_fqn', 'Application System.A',
+                                      table_data={'tags': []}, retry_delay=1))
+        self.assertEqual(mock_patch.call_count, 2)
+        mock_time.sleep.assert_called_once_with(1)
+
+    @patch.object(fta_tagger_csv, 'time')
+    @patch.object(fta_tagger_csv.session, 'get')
+    @patch.object(fta_tagger_csv.session, 'patch')
+    def test_write_tag_rereads_before_resending(self, mock_patch, mock_get, mock_time):
+        mock_patch.return_value = response(503)
+        mock_get.return_value = response(200, {'tags': [{'tagFQN': 'Application System.A'}]})
+
+        self.assertEqual(write_tag('base_url', {}, 'table_fqn', 'Application System.A'), (True, True))
+        self.assertEqual(mock_patch.call_count, 1)
+
+        mock_patch.reset_mock()
+        mock_patch.return_value = response(400)
+        self.assertEqual(write_tag('base_url', {}, 'table_fqn', 'Application System.A'), (True, True))
+        self.assertEqual(mock_patch.call_count, 1)
+        self.assertEqual(mock_patch.call_args.kwargs['json'][0], {"op": "test", "path": "/tags", "value": []})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,25 +3,24 @@ import sys
 import os
 from unittest.mock import patch, MagicMock
 
-# Add the project root to the Python path
+# Add the project root and src (for the flat imports used by main.py) to the Python path
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')))
 
-from src.main import check_table_exists, apply_tag, process_table_batch
+import tempfile
 
-class TestMainFunctions(unittest.TestCase):
+import pandas as pd
 
-    @patch('src.main.requests.get')
-    def test_check_table_exists(self, mock_get):
-        # Test when table exists
-        mock_get.return_value.status_code = 200
-        self.assertTrue(check_table_exists('base_url', {}, 'table_fqn'))
+from src.main import apply_tag, process_table_batch, get_table, write_tag
+from src.main import build_bulk_query, deduplicate_applications, fetch_application_tables, flush_change_buffer
+from change_buffer import ChangeBuffer
+from run_journal import RunJournal
+from requests.exceptions import RequestException
 
-        # Test when table doesn't exist
-        mock_get.return_value.status_code = 404
-        self.assertFalse(check_table_exists('base_url', {}, 'table_fqn'))
+class TestMainFunctions(unittest.TestCase):
 
-    @patch('src.main.requests.patch')
-    @patch('src.main.requests.get')
+    @patch('src.main.session.patch')
+    @patch('src.main.session.get')
     def test_apply_tag(self, mock_get, mock_patch):
         # Mock the GET request to return a table without the tag
         mock_get.return_value.json.return_value = {'tags': []}
@@ -33,10 +32,41 @@ class TestMainFunctions(unittest.TestCase):
         result = apply_tag('base_url', {}, 'table_fqn', 'tag_fqn')
         self.assertTrue(result)
 
-    @patch('src.main.check_table_exists')
+    @patch('src.main.session.patch')
+    @patch('src.main.session.get')
+    def test_apply_tag_reuses_table_data(self, mock_get, mock_patch):
+        mock_patch.return_value.status_code = 200
+
+        self.assertTrue(apply_tag('base_url', {}, 'table_fqn', 'tag_fqn', table_data={'tags': [{'tagFQN': 'tag_fqn'}]}))
+        self.assertTrue(apply_tag('base_url', {}, 'table_fqn', 'other_tag', table_data={'tags': []}))
+        mock_get.assert_not_called()
+        self.assertEqual(mock_patch.call_count, 1)
+
+    @patch('src.main.time.sleep')
+    @patch('src.main.session.patch')
+    @patch('src.main.session.get')
+    def test_apply_tag_rereads_before_resending(self, mock_get, mock_patch, mock_sleep):
+        # The first PATCH fails but lands, so the retry finds the tag and sends nothing
+        mock_patch.return_value.raise_for_status.side_effect = RequestException('503')
+        mock_get.return_value.json.return_value = {'tags': [{'tagFQN': 'tag_fqn'}]}
+
+        self.assertTrue(apply_tag('base_url', {}, 'table_fqn', 'tag_fqn', table_data={'tags': []}))
+        self.assertEqual(mock_patch.call_count, 1)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('src.main.session.get')
+    def test_get_table(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {'tags': []}
+        self.assertEqual(get_table('base_url', {}, 'table_fqn'), {'tags': []})
+
+        mock_get.return_value.status_code = 404
+        self.assertIsNone(get_table('base_url', {}, 'table_fqn'))
+
+    @patch('src.main.get_table')
     @patch('src.main.apply_tag')
-    def test_process_table_batch(self, mock_apply_tag, mock_check_table_exists):
-        mock_check_table_exists.return_value = True
+    def test_process_table_batch(self, mock_apply_tag, mock_get_table):
+        mock_get_table.return_value = {'tags': []}
         mock_apply_tag.return_value = True
 
         tables = [('table1', {'fqn': 'fqn1'}), ('table2', {'fqn': 'fqn2'})]
@@ -44,5 +74,103 @@ class TestMainFunctions(unittest.TestCase):
 
         self.assertEqual(result, (2, 0, 2, 0))  # 2 existing tables, 0 missing, 2 tags applied, 0 failed
 
+    @patch('src.main.get_table')
+    @patch('src.main.apply_tag')
+    def test_process_table_batch_resumes_from_journal(self, mock_apply_tag, mock_get_table):
+        mock_get_table.return_value = {'tags': []}
+        mock_apply_tag.return_value = True
+        tables = [('table1', {'fqn': 'fqn1'}), ('table2', {'fqn': 'fqn2'})]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'journal.jsonl')
+            with RunJournal(path) as journal:
+                journal.record_table('fqn1', 'tag_fqn', 'applied')
+            with RunJournal(path, resume=True) as journal:
+                result = process_table_batch('base_url', {}, tables, 'tag_fqn', True, journal=journal)
+
+        self.assertEqual(result, (1, 0, 1, 0))
+        self.assertEqual(mock_get_table.call_args.args[2], 'fqn2')
+
+    @patch('src.main.get_table')
+    @patch('src.main.session.patch')
+    def test_process_table_batch_write_only(self, mock_patch, mock_get_table):
+        missing = MagicMock(status_code=404)
+        applied = MagicMock(status_code=200)
+        mock_patch.side_effect = lambda url, **kwargs: missing if 'fqn2' in url else applied
+
+        tables = [('table1', {'fqn': 'fqn1'}), ('table2', {'fqn': 'fqn2'})]
+        result = process_table_batch('base_url', {}, tables, 'tag_fqn', True, write_only=True)
+
+        self.assertEqual(result, (1, 1, 1, 0))
+        mock_get_table.assert_not_called()
+
+    @patch('src.main.get_table')
+    @patch('src.main.session.patch')
+    def test_write_tag_rereads_before_resending(self, mock_patch, mock_get_table):
+        mock_patch.side_effect = RequestException("connection reset")
+        mock_get_table.return_value = {'tags': [{'tagFQN': 'tag_fqn'}]}
+
+        self.assertTrue(write_tag('base_url', {}, 'fqn1', 'tag_fqn'))
+        self.assertEqual(mock_patch.call_count, 1)
+
+    @patch('src.main.get_table')
+    @patch('src.main.session.patch')
+    def test_write_tag_only_patches_untagged_tables_blindly(self, mock_patch, mock_get_table):
+        mock_patch.return_value = MagicMock(status_code=400)
+        mock_get_table.return_value = {'tags': [{'tagFQN': 'tag_fqn'}]}
+
+        self.assertTrue(write_tag('base_url', {}, 'fqn1', 'tag_fqn'))
+        self.assertEqual(mock_patch.call_count, 1)
+        self.assertEqual(mock_patch.call_args.kwargs['json'][0], {"op": "test", "path": "/tags", "value": []})
+
+    @patch('change_buffer.get_session')
+    @patch('src.main.get_table')
+    @patch('src.main.session.patch')
+    def test_coalesced_tags_are_sent_once_per_table(self, mock_patch, mock_get_table, mock_get_session):
+        mock_get_table.return_value = {'tags': [{'tagFQN': 'Application System.B'}]}
+        mock_get_session.return_value.patch.return_value.status_code = 200
+        buffer = ChangeBuffer('base_url', {})
+        tables = [('table1', {'fqn': 'fqn1'}), ('table2', {'fqn': 'fqn2'})]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with RunJournal(os.path.join(tmp, 'journal.jsonl')) as journal:
+                for tag_fqn in ('Application System.A', 'Application System.B', 'Application System.C'):
+                    result = process_table_batch('base_url', {}, tables, tag_fqn, True, journal=journal, buffer=buffer)
+                    self.assertEqual(result, (2, 0, 2, 0))
+                # Queued tags are journaled once the buffer is flushed, existing ones straight away
+                self.assertFalse(journal.table_done('fqn1', 'Application System.A'))
+                self.assertTrue(journal.table_done('fqn1', 'Application System.B'))
+                self.assertEqual(flush_change_buffer(buffer, journal=journal), 0)
+                self.assertTrue(journal.table_done('fqn1', 'Application System.C'))
+
+        mock_patch.assert_not_called()
+        sent = mock_get_session.return_value.patch.call_args_list
+        self.assertEqual(len(sent), 2)
+        self.assertEqual([op['value']['tagFQN'] for op in sent[0].kwargs['json']],
+                         ['Application System.A', 'Application System.C'])
+
+    def test_deduplicate_applications(self):
+        self.assertEqual(deduplicate_applications(['ATS', 'ITVR', 'ITVR', 'ACS']), ['ATS', 'ITVR', 'ACS'])
+
+    def test_build_bulk_query(self):
+        sql, params = build_bulk_query("SELECT 1 FROM t WHERE DiagVer.Name = :application ORDER BY 1", ['ATS', 'ACS'])
+
+        self.assertIn("DiagVer.Name IN (:app_0, :app_1)", sql)
+        self.assertEqual(params, {'app_0': 'ATS', 'app_1': 'ACS'})
+
+    @patch('src.main.run_cached_queries')
+    def test_fetch_application_tables_groups_by_application(self, mock_execute):
+        mock_execute.return_value = {0: pd.DataFrame({
+            'application': ['ATS', 'ATS', 'ACS'],
+            'table_name': ['T1', 'T2', 'T3']
+        })}
+
+        result = fetch_application_tables("WHERE DiagVer.Name = :application", None, ['ATS', 'ACS', 'CMS'])
+
+        mock_execute.assert_called_once()
+        self.assertEqual(list(result['ATS']['table_name']), ['T1', 'T2'])
+        self.assertEqual(list(result['ACS']['table_name']), ['T3'])
+        self.assertNotIn('CMS', result)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from omd_client import configure_session
+from fake_openmetadata_server import FakeOpenMetadataServer
+from metadata_snapshot import MetadataSnapshot
+from openmetadata_table_list_processor import build_table_index
+
+FTA = "Application System.FTA"
+
+class TestMetadataSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        configure_session({'requests_per_second': 0})
+        self.server = FakeOpenMetadataServer()
+        self.server.add_tag('Application System', 'FTA')
+        self.server.add_tables((f"DBQ01.DBQ01.the.TABLE_{i}" for i in range(20)), tags=[FTA])
+        self.server.add_tables(f"DBQ01.DBQ01.consep.TABLE_{i}" for i in range(5))
+        self.base_url = self.server.start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.snapshot = MetadataSnapshot(os.path.join(self.tmp.name, 'snapshot.db'))
+
+    def tearDown(self):
+        self.snapshot.close()
+        self.tmp.cleanup()
+        self.server.stop()
+
+    def test_first_refresh_lists_everything(self):
+        stats = self.snapshot.refresh(self.base_url)
+
+        self.assertEqual(stats['mode'], 'full')
+        self.assertEqual(len(self.snapshot), 25)
+        tables = self.snapshot.tables('DBQ01.DBQ01.the')
+        self.assertEqual(len(tables), 20)
+        self.assertEqual(tables[0]['tags'], [{'tagFQN': FTA}])
+        self.assertIn('id', tables[0])
+
+    def test_partitioned_full_refresh(self):
+        stats = self.snapshot.refresh(self.base_url, max_workers=4)
+
+        self.assertEqual((stats['mode'], stats['updated']), ('full', 25))
+        self.assertEqual(self.server.request_counts[('GET', 'schemas.list', 200)], 1)
+
+    def test_incremental_refresh_fetches_only_changes(self):
+        self.snapshot.refresh(self.base_url)
+        self.server.add_tables(['DBQ01.DBQ01.the.NEW'])
+        self.server.patch_table('DBQ01.DBQ01.consep.TABLE_1', [{'op': 'add', 'path': '/tags/-', 'value': {'tagFQN': FTA}}])
+        self.server.delete_table('DBQ01.DBQ01.the.TABLE_0')
+        self.server.reset_counts()
+
+        stats = self.snapshot.refresh(self.base_url)
+
+        self.assertEqual((stats['mode'], stats['updated'], stats['deleted']), ('incremental', 2, 1))
+        self.assertEqual(self.server.request_counts[('GET', 'tables.list', 200)], 0)
+        self.assertEqual(self.server.request_counts[('GET', 'tables.get', 200)], 2)
+        state = self.snapshot.current_state(['DBQ01.DBQ01.consep'])
+        self.assertEqual(state['DBQ01.DBQ01.consep.TABLE_1'], [FTA])
+        self.assertNotIn('DBQ01.DBQ01.the.TABLE_0', self.snapshot.fqns())
+        self.assertIn('DBQ01.DBQ01.the.NEW', self.snapshot.fqns())
+
+    def test_snapshot_persists_between_runs(self):
+        self.snapshot.refresh(self.base_url)
+        self.snapshot.close()
+
+        self.snapshot = MetadataSnapshot(os.path.join(self.tmp.name, 'snapshot.db'))
+
+        self.assertIsNotNone(self.snapshot.last_sync)
+        found = self.snapshot.tables_by_fqn(['DBQ01.DBQ01.the.TABLE_3', 'missing.table'])
+        self.assertEqual(list(found), ['DBQ01.DBQ01.the.TABLE_3'])
+        self.assertIn('table_3', build_table_index(self.snapshot.fqns()))
+
+if __name__ == '__main__':
+    unittest.main()
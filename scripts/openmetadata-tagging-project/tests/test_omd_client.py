@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import time
+from unittest.mock import patch, MagicMock
+
+# Add src to the Python path for the flat module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')))
+
+import omd_client
+from omd_client import OpenMetadataSession, configure_session, get_session
+from rate_limiter import RateLimiter, parse_retry_after
+
+class TestOmdClient(unittest.TestCase):
+
+    def test_get_session_is_shared(self):
+        self.assertIs(get_session(), get_session())
+
+    def test_configure_session_sets_pool_timeout_and_auth(self):
+        session = configure_session({'jwt_token': 'abc', 'pool_size': 7, 'timeout': [2, 30]})
+
+        self.assertEqual(session.pool_size, 7)
+        self.assertEqual(session.timeout, (2, 30))
+        self.assertEqual(session.headers['Authorization'], 'Bearer abc')
+        self.assertEqual(session.get_adapter('https://example.com')._pool_maxsize, 7)
+
+    @patch('requests.Session.request')
+    def test_default_timeout_applied(self, mock_request):
+        mock_request.return_value.status_code = 200
+        session = OpenMetadataSession(pool_size=2, timeout=9)
+        session.get('https://example.com/api/v1/tables')
+
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], 9)
+
+    @patch('requests.Session.request')
+    def test_throttled_request_is_retried_after_retry_after(self, mock_request):
+        throttled = MagicMock(status_code=429, headers={'Retry-After': '0'})
+        ok = MagicMock(status_code=200, headers={})
+        mock_request.side_effect = [throttled, ok]
+        session = OpenMetadataSession(rate_limiter=RateLimiter(rate=100))
+
+        response = session.get('https://example.com/api/v1/tables')
+
+        self.assertIs(response, ok)
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertLess(session.rate_limiter.rate, 100)
+
+    @patch('requests.Session.request')
+    def test_unavailable_is_retried_only_for_idempotent_methods(self, mock_request):
+        unavailable = MagicMock(status_code=503, headers={'Retry-After': '0'})
+        ok = MagicMock(status_code=200, headers={})
+        session = OpenMetadataSession(rate_limiter=RateLimiter(rate=100))
+
+        mock_request.side_effect = [unavailable, ok]
+        self.assertIs(session.get('https://example.com/api/v1/tables'), ok)
+
+        mock_request.side_effect = [unavailable, ok]
+        self.assertIs(session.patch('https://example.com/api/v1/tables/id', json=[]), unavailable)
+        self.assertEqual(mock_request.call_count, 3)
+
+    def tearDown(self):
+        omd_client.close_session()
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('3'), 3.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+
+    def test_token_bucket_limits_rate(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_success_recovers_rate(self):
+        limiter = RateLimiter(rate=10)
+        limiter.backoff(0)
+        self.assertEqual(limiter.rate, 5)
+        for _ in range(100):
+            limiter.success()
+        self.assertEqual(limiter.rate, 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add src to the Python path for the flat module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')))
+
+from run_journal import RunJournal, outcome_from_counters
+
+class TestRunJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'journal.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_skips_completed_work_and_retries_failures(self):
+        with RunJournal(self.path) as journal:
+            journal.record_table('t1', 'tag', 'applied')
+            journal.record_table('t2', 'tag', 'failed')
+            journal.record_application('APP')
+        with open(self.path, 'a') as f:
+            f.write('{"type": "table", "tab')  # partial line left by a crash
+
+        with RunJournal(self.path, resume=True) as journal:
+            self.assertTrue(journal.table_done('t1', 'tag'))
+            self.assertFalse(journal.table_done('t2', 'tag'))
+            self.assertFalse(journal.table_done('t1', 'other tag'))
+            self.assertTrue(journal.application_done('APP'))
+            self.assertEqual(journal.skipped_tables, 1)
+
+    def test_finished_run_is_not_resumed(self):
+        with RunJournal(self.path) as journal:
+            journal.record_table('t1', 'tag', 'applied')
+            journal.finish()
+
+        with RunJournal(self.path, resume=True) as journal:
+            self.assertFalse(journal.table_done('t1', 'tag'))
+
+    def test_new_run_without_resume_starts_over(self):
+        with RunJournal(self.path) as journal:
+            journal.record_table('t1', 'tag', 'applied')
+
+        with RunJournal(self.path) as journal:
+            self.assertFalse(journal.table_done('t1', 'tag'))
+
+    def test_outcome_from_counters(self):
+        self.assertEqual(outcome_from_counters(1, 0, 1, 0), 'applied')
+        self.assertEqual(outcome_from_counters(0, 1, 0, 0), 'missing')
+        self.assertEqual(outcome_from_counters(1, 0, 0, 1), 'failed')
+        self.assertEqual(outcome_from_counters(1, 0, 0, 0), 'skipped')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from omd_client import configure_session
+from fake_openmetadata_server import FakeOpenMetadataServer
+from schema_operations import run_operations, format_summary
+
+OWNER = {'id': 'user-1', 'type': 'user'}
+
+class TestSchemaOperations(unittest.TestCase):
+
+    def setUp(self):
+        configure_session({'requests_per_second': 0})
+        self.server = FakeOpenMetadataServer()
+        self.server.add_tag('Application System', 'A4CA')
+        self.server.add_tag('Test Classification', 'Ignore this tag')
+        self.server.add_tables(f"ODS.odsdev.ats.TABLE_{i}" for i in range(4))
+        self.server.add_tables(['ODS.odsdev.ats.TAGGED'], tags=['Application System.A4CA', 'Test Classification.Ignore this tag'])
+        self.server.add_tables(f"ODS.odsdev.fta.TABLE_{i}" for i in range(3))
+        self.base_url = self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_all_operations_share_one_listing_and_one_patch_per_table(self):
+        operations = [
+            ('apply_tag', 'Application System.A4CA'),
+            ('remove_tag', 'Test Classification.Ignore this tag'),
+            ('set_owner', OWNER),
+        ]
+        summary = run_operations(self.base_url, {}, ['ODS.odsdev.ats', 'ODS.odsdev.fta'], operations)
+
+        self.assertEqual((summary['schemas'], summary['tables'], summary['requests']), (2, 8, 8))
+        self.assertEqual(self.server.request_counts[('GET', 'tables.list', 200)], 2)
+        self.assertEqual(self.server.request_counts[('PATCH', 'tables.patch', 200)], 8)
+        results = summary['operations']
+        self.assertEqual(results['apply_tag Application System.A4CA'], {'applied': 7, 'unchanged': 1, 'failed': 0})
+        self.assertEqual(results['remove_tag Test Classification.Ignore this tag'],
+                         {'applied': 1, 'unchanged': 7, 'failed': 0})
+        self.assertEqual(results['set_owner user:user-1']['applied'], 8)
+
+        tagged = self.server.tables['ODS.odsdev.ats.TAGGED']
+        self.assertEqual(tagged['tags'], [{'tagFQN': 'Application System.A4CA'}])
+        self.assertEqual(tagged['owners'], [OWNER])
+
+    def test_dry_run_and_unknown_operation(self):
+        summary = run_operations(self.base_url, {}, ['ODS.odsdev.fta'], [('remove_owner', None)], dry_run=True)
+        self.assertEqual(summary['operations']['remove_owner'], {'applied': 0, 'unchanged': 3, 'failed': 0})
+        self.assertEqual(self.server.request_counts[('PATCH', 'tables.patch', 200)], 0)
+        self.assertIn('remove_owner: would apply 0, unchanged 3', format_summary(summary, dry_run=True))
+
+        with self.assertRaises(ValueError):
+            run_operations(self.base_url, {}, ['ODS.odsdev.fta'], [('rename', 'x')])
+
+    def test_contradictory_operations_are_rejected(self):
+        for operations in ([('set_owner', OWNER), ('remove_owner', None)],
+                           [('set_owner', OWNER), ('set_owner', {'id': 'user-2', 'type': 'user'})],
+                           [('apply_tag', 'Application System.A4CA'), ('remove_tag', 'Application System.A4CA')]):
+            with self.assertRaises(ValueError):
+                run_operations(self.base_url, {}, ['ODS.odsdev.fta'], operations)
+        self.assertEqual(self.server.total_requests, 0)
+
+if __name__ == '__main__':
+    unittest.main()
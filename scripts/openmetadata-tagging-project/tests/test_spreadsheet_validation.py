@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+import pandas as pd
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from omd_client import configure_session
+from fake_openmetadata_server import FakeOpenMetadataServer
+from spreadsheet_validation import catalogue_columns, validate_spreadsheet, format_report
+
+class TestSpreadsheetValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.catalogue = pd.DataFrame({
+            'Table': ['permit', 'permit', 'permit', 'harvest', 'harvest', 'empty'],
+            'Column': ['permit_id', 'status', None, 'harvest_id', None, None],
+        })
+        self.spreadsheet = pd.DataFrame({
+            'Table': ['PERMIT', 'Permit', 'HARVEST', 'HARVEST', 'GONE', 'EMPTY', None],
+            'Column': ['PERMIT_ID', ' status ', 'HARVEST_ID', 'VOLUME', 'X', 'Y', 'Z'],
+            'Classification': ['Public', 'Public', 'Public', 'Protected', 'Public', 'Public', 'Public'],
+        })
+
+    def test_keeps_only_tables_whose_columns_all_exist(self):
+        kept, report = validate_spreadsheet(self.spreadsheet, self.catalogue)
+
+        self.assertEqual(kept['Table'].tolist(), ['permit', 'permit'])
+        self.assertEqual(kept['Column'].tolist(), ['permit_id', 'status'])
+        self.assertEqual(kept['Classification'].tolist(), ['Public', 'Public'])
+        self.assertEqual(report['missing_tables'], ['gone'])
+        self.assertEqual(report['missing_columns'], {'empty': ['y'], 'harvest': ['volume']})
+        self.assertEqual(report['dropped_tables'], ['empty', 'harvest'])
+        self.assertEqual((report['rows'], report['kept_rows'], report['incomplete_rows']), (7, 2, 1))
+        # The caller's frame is left as it was
+        self.assertEqual(self.spreadsheet['Table'][0], 'PERMIT')
+
+    def test_matching_rows_of_incomplete_tables_can_be_kept(self):
+        kept, report = validate_spreadsheet(self.spreadsheet, self.catalogue, drop_incomplete_tables=False)
+
+        self.assertEqual(kept['Column'].tolist(), ['permit_id', 'status', 'harvest_id'])
+        self.assertEqual(report['dropped_tables'], [])
+        self.assertIn("table 'harvest' is missing columns: volume", format_report(report))
+
+    def test_catalogue_reads_every_page(self):
+        configure_session({'requests_per_second': 0})
+        server = FakeOpenMetadataServer()
+        server.add_tables(f"geobc.GEOTST.ats.TABLE_{i}" for i in range(450))
+        for table in server.tables.values():
+            table['columns'] = [{'name': 'ID'}, {'name': 'NAME'}]
+        base_url = server.start()
+        try:
+            catalogue = catalogue_columns(base_url, None, 'geobc.GEOTST.ats')
+        finally:
+            server.stop()
+
+        self.assertEqual(catalogue['Table'].nunique(), 450)
+        self.assertGreater(server.request_counts[('GET', 'tables.list', 200)], 1)
+        self.assertEqual(int(catalogue['Column'].notna().sum()), 900)
+        self.assertIn(('table_449', 'name'), set(catalogue.itertuples(index=False, name=None)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from omd_client import configure_session
+from fake_openmetadata_server import FakeOpenMetadataServer
+from table_iterator import iter_tables, iter_table_partitions, AdaptivePageSize
+
+class TestTableIterator(unittest.TestCase):
+
+    def setUp(self):
+        configure_session({'requests_per_second': 0})
+        self.server = FakeOpenMetadataServer()
+        self.server.add_tables(f"DBQ01.DBQ01.consep.TABLE_{i}" for i in range(130))
+        self.server.add_tables(f"DBQ01.DBQ01.other.TABLE_{i}" for i in range(5))
+        self.base_url = self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_walks_every_page_of_a_schema(self):
+        page_size = AdaptivePageSize(initial=50, minimum=50, maximum=50)
+        tables = list(iter_tables(self.base_url, database_schema='DBQ01.DBQ01.consep', page_size=page_size))
+
+        self.assertEqual(len(tables), 130)
+        self.assertEqual(len({t['fullyQualifiedName'] for t in tables}), 130)
+        self.assertEqual(self.server.request_counts[('GET', 'tables.list', 200)], 3)
+
+    def test_only_requested_fields_are_returned(self):
+        tables = list(iter_tables(self.base_url, database_schema='DBQ01.DBQ01.other'))
+        self.assertNotIn('tags', tables[0])
+
+        tables = list(iter_tables(self.base_url, database_schema='DBQ01.DBQ01.other', fields='tags'))
+        self.assertIn('tags', tables[0])
+
+    def test_partitions_cover_every_schema(self):
+        partitions = dict(iter_table_partitions(self.base_url, max_workers=4))
+
+        self.assertEqual(sorted(partitions), ['DBQ01.DBQ01.consep', 'DBQ01.DBQ01.other'])
+        self.assertEqual(len(partitions['DBQ01.DBQ01.consep']), 130)
+        self.assertEqual(self.server.request_counts[('GET', 'schemas.list', 200)], 1)
+
+    def test_partitions_match_the_sequential_listing(self):
+        self.server.add_tables(f"AAA.DB.first.T{i}" for i in range(3))
+        partitioned = [table['fullyQualifiedName'] for _, tables in iter_table_partitions(self.base_url, max_workers=4)
+                       for table in tables]
+
+        self.assertEqual(sorted(partitioned), sorted(table['fullyQualifiedName'] for table in iter_tables(self.base_url)))
+
+    def test_adaptive_page_size(self):
+        page_size = AdaptivePageSize(initial=200, minimum=50, maximum=1000, target_latency=2.0)
+
+        self.assertEqual(page_size.update(3.0), 100)
+        self.assertEqual(page_size.update(0.1), 200)
+        self.assertEqual(page_size.update(1.5), 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add src to the Python path for the flat module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')))
+
+from openmetadata_table_list_processor import TableIndex, split_fqn, load_openmetadata_tables
+
+class TestTableIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TableIndex.from_fqns([
+            'DBP01.DBP01.fta.HARVEST',
+            'DBQ01.DBQ01.fta.HARVEST',
+            'DBP01.DBP01.rrs.PERMIT',
+            'svc.sub."my.db".schema.QUOTED',
+            'too.short',
+        ])
+
+    def test_split_fqn_respects_quotes(self):
+        self.assertEqual(split_fqn('svc."my.db".schema.T'), ['svc', 'my.db', 'schema', 'T'])
+
+    def test_same_name_in_two_services_is_kept_and_reported(self):
+        self.assertEqual(len(self.index.find('harvest')), 2)
+        self.assertIsNone(self.index.resolve('HARVEST'))
+        self.assertEqual(sorted(self.index.ambiguous['HARVEST']), ['DBP01.DBP01.fta.HARVEST', 'DBQ01.DBQ01.fta.HARVEST'])
+
+    def test_repeated_fqn_is_indexed_once(self):
+        self.assertFalse(self.index.add('DBP01.DBP01.rrs.PERMIT'))
+
+        self.assertEqual(self.index.resolve('PERMIT')['fqn'], 'DBP01.DBP01.rrs.PERMIT')
+        self.assertEqual((len(self.index), self.index.duplicates), (4, 1))
+
+    def test_scope_resolves_ambiguity(self):
+        match = self.index.resolve('HARVEST', service='dbq01')
+
+        self.assertEqual(match['fqn'], 'DBQ01.DBQ01.fta.HARVEST')
+        self.assertEqual(self.index.ambiguous, {})
+
+    def test_five_part_and_quoted_fqns_are_indexed(self):
+        match = self.index.resolve('quoted')
+
+        self.assertEqual(match['service'], 'svc.sub')
+        self.assertEqual(match['database'], 'my.db')
+        self.assertEqual(match['fqn'], 'svc.sub."my.db".schema.QUOTED')
+        self.assertEqual(self.index.skipped, 1)
+
+    def test_tables_in_schema(self):
+        self.assertEqual([t['table'] for t in self.index.tables_in(service='DBP01', schema='rrs')], ['PERMIT'])
+        self.assertEqual(len(self.index.tables_in(schema='fta')), 2)
+
+    def test_load_from_csv(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('fqn\nDBP01.DBP01.rrs.PERMIT\n\n')
+        try:
+            index = load_openmetadata_tables(f.name)
+        finally:
+            os.unlink(f.name)
+
+        self.assertIn('permit', index)
+        self.assertEqual(len(index), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import requests
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Add src to the Python path for the flat module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')))
+
+from tag_catalog import TagCatalog
+
+def page(fqns, after=None):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        'data': [{'fullyQualifiedName': fqn} for fqn in fqns],
+        'paging': {'after': after} if after else {}
+    }
+    return response
+
+class TestTagCatalog(unittest.TestCase):
+
+    @patch('tag_catalog.get_session')
+    def test_load_walks_pages_and_answers_from_memory(self, mock_get_session):
+        session = mock_get_session.return_value
+        session.get.side_effect = [
+            page(['Application System.FTA'], after='cursor'),
+            page(['Application System.ATS'])
+        ]
+
+        catalog = TagCatalog('base_url').load()
+
+        self.assertEqual(len(catalog), 2)
+        self.assertTrue(catalog.exists('Application System.FTA'))
+        self.assertTrue(catalog.exists('Application System.ATS'))
+        self.assertEqual(session.get.call_count, 2)
+
+    @patch('tag_catalog.get_session')
+    def test_miss_refreshes_classification(self, mock_get_session):
+        session = mock_get_session.return_value
+        session.get.side_effect = [
+            page(['Application System.FTA']),
+            page(['Application System.FTA', 'Application System.NEW'])
+        ]
+
+        catalog = TagCatalog('base_url', refresh_interval=0).load()
+
+        self.assertTrue(catalog.exists('Application System.NEW'))
+        self.assertEqual(session.get.call_count, 2)
+
+    @patch('tag_catalog.get_session')
+    def test_miss_within_refresh_interval_does_not_refetch(self, mock_get_session):
+        session = mock_get_session.return_value
+        session.get.side_effect = [page(['Application System.FTA'])]
+
+        catalog = TagCatalog('base_url').load()
+
+        self.assertFalse(catalog.exists('Application System.MISSING'))
+        self.assertFalse(catalog.exists('Application System.MISSING'))
+        self.assertEqual(session.get.call_count, 1)
+
+    @patch('tag_catalog.get_session')
+    def test_load_failure_is_raised(self, mock_get_session):
+        mock_get_session.return_value.get.side_effect = requests.exceptions.ConnectionError('unreachable')
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            TagCatalog('base_url').load()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add benchmarks and src to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'benchmarks'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from omd_client import configure_session
+from fake_openmetadata_server import FakeOpenMetadataServer
+from tag_planner import TagPlan, build_plan, build_patch, current_state, apply_plan, reconcile, schemas_for
+
+FTA = "Application System.FTA"
+RRS = "Application System.RRS"
+
+class TestBuildPlan(unittest.TestCase):
+
+    def test_only_missing_tags_are_planned(self):
+        desired = {'s.d.x.A': {FTA}, 's.d.x.B': {FTA}, 's.d.x.C': {FTA}}
+        current = {'s.d.x.A': [FTA], 's.d.x.B': ['PII.Sensitive']}
+
+        plan = build_plan(desired, current)
+
+        self.assertEqual(plan.changes, {'s.d.x.B': {'add': [FTA], 'remove': []}})
+        self.assertEqual(plan.missing, ['s.d.x.C'])
+        self.assertEqual(plan.unchanged, 1)
+        self.assertEqual(plan.estimated_requests, 1)
+
+    def test_prune_removes_only_managed_tags(self):
+        desired = {'s.d.x.A': {FTA}}
+        current = {'s.d.x.A': ['PII.Sensitive', RRS, FTA], 's.d.x.B': [RRS]}
+
+        plan = build_plan(desired, current, prune=True)
+
+        self.assertEqual(plan.changes['s.d.x.A'], {'add': [], 'remove': [[1, RRS]]})
+        self.assertEqual(plan.changes['s.d.x.B'], {'add': [], 'remove': [[0, RRS]]})
+
+    def test_patch_removes_from_highest_index_with_guards(self):
+        patch = build_patch({'add': [FTA], 'remove': [[0, RRS], [2, RRS]]})
+
+        self.assertEqual([op['path'] for op in patch], ['/tags/2/tagFQN', '/tags/2', '/tags/0/tagFQN', '/tags/0', '/tags/-'])
+        self.assertEqual(patch[0]['op'], 'test')
+
+    def test_plan_round_trips_through_json(self):
+        plan = build_plan({'s.d.x.A': {FTA}}, {'s.d.x.A': []})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'plan.json')
+            plan.save(path)
+            loaded = TagPlan.load(path)
+
+        self.assertEqual(loaded.changes, plan.changes)
+        self.assertIn('Estimated requests to apply: 1', loaded.summary())
+
+    def test_schemas_for(self):
+        self.assertEqual(schemas_for(['s.d.x.A', 's.d.y.B', 's.d.x.C']), ['s.d.x', 's.d.y'])
+
+class TestApplyPlan(unittest.TestCase):
+
+    def setUp(self):
+        configure_session({'requests_per_second': 0})
+        self.server = FakeOpenMetadataServer()
+        self.server.add_tag('Application System', 'FTA')
+        self.server.add_tag('Application System', 'RRS')
+        self.server.add_tables(f"DBQ01.DBQ01.the.TABLE_{i}" for i in range(10))
+        self.server.add_tables(['DBQ01.DBQ01.the.OLD'], tags=[RRS])
+        self.base_url = self.server.start()
+        self.desired = {f"DBQ01.DBQ01.the.TABLE_{i}": {FTA} for i in range(10)}
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_steady_state_run_writes_nothing(self):
+        reconcile(self.base_url, {}, self.desired, apply=True, prune=True)
+        self.assertEqual(self.server.tables['DBQ01.DBQ01.the.OLD']['tags'], [])
+        self.assertEqual(self.server.tables['DBQ01.DBQ01.the.TABLE_3']['tags'], [{'tagFQN': FTA}])
+
+        self.server.reset_counts()
+        plan = reconcile(self.base_url, {}, self.desired, apply=True, prune=True)
+
+        self.assertEqual(len(plan), 0)
+        self.assertEqual(self.server.total_requests, 1)  # one listing page, no PATCH
+
+    def test_stale_remove_is_rejected(self):
+        plan = build_plan(self.desired, current_state(self.base_url, {}, ['DBQ01.DBQ01.the']), prune=True)
+        self.server.tables['DBQ01.DBQ01.the.OLD']['tags'].insert(0, {'tagFQN': FTA})
+
+        applied, failed = apply_plan(self.base_url, {}, plan)
+
+        self.assertEqual((applied, failed), (10, 1))
+        self.assertEqual(len(self.server.tables['DBQ01.DBQ01.the.OLD']['tags']), 2)
+
+if __name__ == '__main__':
+    unittest.main()
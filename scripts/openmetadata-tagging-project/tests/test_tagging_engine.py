@@ -0,0 +1,47 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add src to the Python path for the flat module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')))
+
+from tagging_engine import run_concurrently, sum_counters
+
+class TestTaggingEngine(unittest.TestCase):
+
+    def test_in_flight_limit(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def work(item):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+            return item * 2
+
+        results = dict(run_concurrently(work, range(50), max_workers=4))
+
+        self.assertEqual(results, {i: i * 2 for i in range(50)})
+        self.assertLessEqual(state['peak'], 4)
+
+    def test_worker_exception_is_yielded(self):
+        def work(item):
+            if item == 3:
+                raise ValueError('boom')
+            return item
+
+        results = dict(run_concurrently(work, range(5), max_workers=2))
+
+        self.assertIsInstance(results[3], ValueError)
+        self.assertEqual(results[4], 4)
+
+    def test_sum_counters(self):
+        self.assertEqual(sum_counters([(1, 0, 1, 0), (0, 1, 0, 0), (1, 0, 0, 1)], 4), (2, 1, 1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
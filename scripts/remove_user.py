@@ -1,60 +1,32 @@
 from config import *
 
-#Schema Method - list all tables in a schema
+session = open_session()
 
-# Endpoint for retrieving tables filtered by database schema, set a high limit to get them all
-endpoint1 = f"/tables?databaseSchema={database_schema}&limit=9999"
+#Schema Method - list all tables in a schema, with their current owners
+tables = list_schema_tables(fields='owners')
 
-# Full URL
-url = base_url + endpoint1
 
-# Make the GET request to retrieve all tables in the given schema
-response = requests.get(url, headers=headers_get)
 
-# Check the response status
-if response.status_code == 200:
-    print("Raw Response Content:", response.text)  # Print the raw content of the response
-    try:
-        tables = response.json().get('data', [])  # Attempt to parse JSON response
-        print("Tables retrieved successfully!")
-        for table in tables:
-            print(f"Table Name: {table['name']}, ID: {table['id']}")
-            time.sleep(0.5)
-    except ValueError as e:
-        print("Failed to parse JSON response:", e)
-else:
-    print(f"Failed to retrieve tables: {response.status_code}")
-    print(response.text)
 
-table_id_list = []
-for table in tables:
-    table_id_list.append(table['id'])
-
-
-
-
-# Function to apply user to a table
-def remove_user_from_table(table_id):
+# Function to remove user from a table
+def remove_user_from_table(table_id, owners):
     # Endpoint for updating a table
     table_endpoint = f"/tables/{table_id}"
 
     # Full URL
     table_url = base_url + table_endpoint
 
-    # Data payload for applying the user
+    # Data payload for removing the user; the owners list is replaced as a whole, as in apply_user.py
     data = [
         {
-            "op": "remove",
-            "path": "/owner",
-            "value": {
-                "id": selected_user_id,
-                "type": "user"
-            }
+            "op": "add",
+            "path": "/owners",
+            "value": [owner for owner in owners if owner.get('id') != selected_user_id]
         }
     ]
 
     # Make the PATCH request
-    response = requests.patch(table_url, headers=headers_patch, json=data)
+    response = session.patch(table_url, headers=headers_patch, json=data)
 
     # Check the response status
     if response.status_code == 200:
@@ -63,7 +35,10 @@ def remove_user_from_table(table_id):
         print(f"Failed to remove user from table {table_id}: {response.status_code}")
         print(response.text)
 
-# Apply user to all tables in the schema
+# Remove user from all tables in the schema that it owns
 for table in tables:
-    remove_user_from_table(table['id'])
-    time.sleep(5)
\ No newline at end of file
+    owners = table.get('owners') or []
+    if selected_user_id not in [owner.get('id') for owner in owners]:
+        print(f"Table {table['id']} is not owned by the user")
+        continue
+    remove_user_from_table(table['id'], owners)
@@ -1,33 +1,10 @@
 from config import *
 
-#Schema Method - list all tables in a schema
-
-# Endpoint for retrieving tables filtered by database schema, set a high limit to get them all
-endpoint1 = f"/tables?databaseSchema={database_schema}&limit=9999"
-
-# Full URL
-url = base_url + endpoint1
-
-# Make the GET request to retrieve tables
-response = requests.get(url, headers=headers_get)
+session = open_session()
 
-# Check the response status
-if response.status_code == 200:
-    print("Raw Response Content:", response.text)  # Print the raw content of the response
-    try:
-        tables = response.json().get('data', [])  # Attempt to parse JSON response
-        print("Tables retrieved successfully!")
-        for table in tables:
-            print(f"Table Name: {table['name']}, ID: {table['id']}")
-    except ValueError as e:
-        print("Failed to parse JSON response:", e)
-else:
-    print(f"Failed to retrieve tables: {response.status_code}")
-    print(response.text)
-
-table_id_list = []
-for table in tables:
-    table_id_list.append(table['id'])
+#Schema Method - list all tables in a schema
+tables = list_schema_tables()
+table_id_list = [table['id'] for table in tables]
 
 
 # Iterate over each table ID and remove the tag
@@ -52,7 +29,7 @@ for table_id in table_id_list:
     ]
 
     # Make the PATCH request
-    response = requests.patch(url, headers=headers_patch, json=data)
+    response = session.patch(url, headers=headers_patch, json=data)
 
     # Check the response status
     if response.status_code == 200:
@@ -61,13 +38,12 @@ for table_id in table_id_list:
     else:
         print(f"Failed to remove tag from table {table_id}: {response.status_code}")
         print(response.text) 
-    time.sleep(2)
 
 # Finally, tag the schema itself
 endpoint3 = f"/schemas/{database_schema}"  # Assuming database_schema is the fully qualified name (FQN)
 url = base_url + endpoint3
 
-response = requests.patch(url, headers=headers_patch, json=data)
+response = session.patch(url, headers=headers_patch, json=data)
 
 if response.status_code == 200:
     print(f"Tag removed to schema {database_schema} successfully!")
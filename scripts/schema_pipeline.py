@@ -0,0 +1,44 @@
+# Run several table operations over one or more schemas with a single listing
+# per schema and at most one PATCH per table, e.g.
+#
+#   python schema_pipeline.py --apply-tag "Application System.A4CA" --set-owner
+#   python schema_pipeline.py --schema ODS.odsdev.ats_replication --schema ODS.odsdev.fta \
+#       --remove-tag "Test Classification.Ignore this tag" --remove-owner --dry-run
+#
+# Replaces running apply_user.py, remove_user.py, tagging_object.py and
+# removing_tags.py one after another. Defaults come from config.py.
+import argparse
+
+from config import *
+from schema_operations import run_operations, validate_operations, format_summary
+from tagging_engine import DEFAULT_MAX_WORKERS
+
+parser = argparse.ArgumentParser(description='Apply tag and owner operations to every table of one or more schemas.')
+parser.add_argument('--schema', action='append', help=f'Database schema FQN, repeatable (default: {database_schema})')
+parser.add_argument('--apply-tag', action='append', default=[], metavar='TAG_FQN', help='Add a tag to every table')
+parser.add_argument('--remove-tag', action='append', default=[], metavar='TAG_FQN', help='Remove a tag from every table')
+owner = parser.add_mutually_exclusive_group()
+owner.add_argument('--set-owner', nargs='?', const=selected_user_id, metavar='USER_ID',
+                   help='Make a user the owner of every table (default: selected_user_id in config.py)')
+owner.add_argument('--remove-owner', action='store_true', help='Remove the owner of every table')
+parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS, help='Maximum concurrent PATCH requests')
+parser.add_argument('--dry-run', action='store_true', help='Report what would change without sending PATCHes')
+args = parser.parse_args()
+
+operations = [('apply_tag', tag) for tag in args.apply_tag]
+operations += [('remove_tag', tag) for tag in args.remove_tag]
+if args.set_owner:
+    operations.append(('set_owner', {"id": args.set_owner, "type": "user"}))
+if args.remove_owner:
+    operations.append(('remove_owner', None))
+if not operations:
+    parser.error('Give at least one of --apply-tag, --remove-tag, --set-owner or --remove-owner')
+try:
+    validate_operations(operations)
+except ValueError as e:
+    parser.error(str(e))
+
+open_session()
+summary = run_operations(api_url, headers_get, args.schema or [database_schema], operations,
+                         max_workers=args.max_workers, dry_run=args.dry_run)
+print(format_summary(summary, args.dry_run))
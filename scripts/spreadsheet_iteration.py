@@ -1,8 +1,12 @@
 import os
-import requests
+import sys
 import pandas as pd
 import boto3
 
+# Shared pooled HTTP client and spreadsheet validation live with the tagging project
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openmetadata-tagging-project', 'src'))
+from spreadsheet_validation import catalogue_columns, validate_spreadsheet, format_report
+
 objbucket='' # find in Vault
 objid='' # find in Vault
 objkey='' # find in Vault
@@ -22,27 +26,17 @@ def create_dir():
     except Exception as e:
         raise Exception(f"Directory Error: {str(e)}")
 
-# Call v1/tables to create a list of the tables & dictionary of columns within the schema
+# Call v1/tables to create a (Table, Column) frame of every column within the schema
+# Every page of the schema is read, not just the first 100 tables
 def call_api(database_schema, api_token):
     try:
-        base_url = "https://nr-data-catalogue-dev.apps.emerald.devops.gov.bc.ca/api/v1"
+        base_url = "https://nr-data-catalogue-dev.apps.emerald.devops.gov.bc.ca/api"
         headers = {
             "Authorization": api_token,
             "Content-Type": "application/json"}
-        endpoint = f"/tables?databaseSchema={database_schema}&includeEmptyTestSuite=true&limit=100&include=non-deleted"
-        response = requests.get(f"{base_url}{endpoint}", headers=headers)
-        if response.status_code == 200:
-            api_data = response.json().get('data', [])
-            if isinstance(api_data, list):
-                table_list = [table['name'].lower() for table in api_data]
-                print("Extracted API tables:", table_list)
-                column_dict = {}
-                for table in api_data:
-                    table_name = table['name'].lower()
-                    column_names = [column['name'].lower() for column in table['columns']]
-                    column_dict[table_name] = column_names
-                print("Extracted API Columns:", column_dict)
-            return table_list, column_dict
+        catalogue = catalogue_columns(base_url, headers, database_schema)
+        print(f"Extracted {catalogue['Table'].nunique()} API tables and {catalogue['Column'].notna().sum()} columns")
+        return catalogue
     except Exception as e:
         raise Exception(f"API Error: {str(e)}")
 
@@ -59,34 +53,17 @@ def get_s3(objbucket, objid, objkey, objurl, objfile_key, download_path):
         raise Exception(f"S3 Error: {str(e)}")
 
 # Filter df to keep only columns and tables that exist in OMD
-def filter_df(df, table_list, column_dict):
-    # Set everything to lower case to match output of api_call()
-    df['Table'] = df['Table'].str.lower()
-    df['Column'] = df['Column'].str.lower()
-    # Remove lines in the 'df' that have tables which do not exist in output of api_call()
-    filtered_df = df[df['Table'].isin(table_list)]
-    # Iterate through columns to find mismatches between Excel and output of api_call()
-    columns_to_keep = []
-    for table_name in filtered_df['Table'].unique():
-        expected_columns = column_dict.get(table_name, [])
-        current_table_rows = filtered_df[filtered_df['Table'] == table_name]
-        missing_columns = []
-        for index, row in current_table_rows.iterrows():
-            if row['Column'] not in expected_columns:
-                missing_columns.append(row['Column'])
-        if missing_columns:
-            print(f"Table '{table_name}' is missing columns: {set(missing_columns)}")
-        else:
-            columns_to_keep.extend(expected_columns)
-    # Remove lines in the 'df' that have columns which do not exist in output of api_call()
-    filtered_df = filtered_df[filtered_df['Column'].isin(columns_to_keep)]
-    return filtered_df
+# Tables with any column missing from OMD are reported and left out
+def filter_df(df, catalogue):
+    filtered_df, report = validate_spreadsheet(df, catalogue)
+    print(format_report(report))
+    return filtered_df, report
 
 def main():
-    table_list, column_dict = call_api(database_schema, api_token)
+    catalogue = call_api(database_schema, api_token)
     download_path = create_dir()
     get_s3(objbucket, objid, objkey, objurl, objfile_key, download_path)
     df = pd.read_excel(download_path)
-    filter_df(df, table_list, column_dict)
+    filter_df(df, catalogue)
 
 main()